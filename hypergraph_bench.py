@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Sync throughput benchmarks against a local database
+Generates synthetic hypergraphs in the hypergraph_data.json layout and
+runs each sync strategy against a local Postgres or SQLite stand-in,
+reporting rows/sec, peak RSS and where the time went
+
+Strategies:
+    per-row   one statement and one round trip per row, the way the sync
+              scripts originally wrote
+    populate  populate_neon_db.insert_nodes/insert_edges (grouped batches)
+    batched   sync_neon_nov2025's path: 50-row batches through SyncPipeline
+    staged    sync_neon_mcp_nov18_2025's path: staging tables, then one
+              publish transaction
+    copy      hypergraph_bulk_load: COPY into load tables and merge
+              (postgres only)
+    sync      sync_hypergraph.sync with --full (reconcile plus diff)
+
+Each (size, target, strategy) runs in its own child process, so peak RSS
+is that strategy's alone, and each starts from empty tables. Phase times
+for work done by the pipeline threads are summed over the threads and can
+exceed the wall time:
+
+    load     reading and parsing the snapshot
+    encode   node_row/edge_row
+    build    building statements (SQLDriver.statement and friends)
+    render   inlining parameters as SQL text (mcp only)
+    execute  backend calls; for mcp, 'cli' estimates the share of that
+             spent starting manus-mcp-cli and connecting, from the
+             calls made times the cost of a 'SELECT 1' call
+
+The benchmark truncates nodes and edges (and everything that references
+them) in the target database, so postgres needs an explicit --database
+and is never taken from the environment, and the mcp target only runs
+with --local-mcp, i.e. when manus-mcp-cli on PATH is a local stand-in.
+
+Usage:
+    python3 hypergraph_bench.py generate --size 100k [--output PATH]
+    python3 hypergraph_bench.py run [--sizes 1k,100k] [--targets sqlite,postgres]
+                                    [--strategies batched,copy] [--database DSN]
+                                    [--workdir DIR] [--repeat N] [--timeout SECONDS]
+                                    [--output results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from hypergraph_db import DatabaseError, create_backend, render_statement
+from hypergraph_diff import edge_row, node_row
+from hypergraph_drivers import SQLDriver, SQLiteDriver
+from hypergraph_pipeline import SyncPipeline
+from hypergraph_stream import HypergraphWriter, batched, iter_edges, iter_nodes, read_metadata
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+DEFAULT_SIZES = ('1k', '100k')
+DEFAULT_WORKDIR = os.path.join(tempfile.gettempdir(), 'hypergraph-bench')
+DEFAULT_TIMEOUT = 1800
+SEED = 2025
+
+TARGETS = ('postgres', 'sqlite', 'mcp')
+SQL_TARGETS = ('postgres', 'mcp')
+
+# Node type mix, roughly the live graph's: mostly ingredients, salons,
+# professionals and services with a long tail of reference types
+NODE_TYPES = [
+    ('ingredient', 0.35), ('salon', 0.15), ('professional', 0.15), ('service', 0.10),
+    ('supplier', 0.05), ('skin_concern', 0.05), ('category', 0.03), ('platform', 0.03),
+    ('feature', 0.03), ('ai_platform', 0.02), ('ai_technology', 0.02), ('certification', 0.02),
+]
+
+# (source type, edge type, target type, share of edges)
+EDGE_TYPES = [
+    ('supplier', 'supplies', 'ingredient', 0.25),
+    ('ingredient', 'belongs_to', 'category', 0.10),
+    ('ingredient', 'treats', 'skin_concern', 0.10),
+    ('salon', 'offers_service', 'service', 0.10),
+    ('professional', 'performs_service', 'service', 0.10),
+    ('salon', 'purchases_from', 'supplier', 0.07),
+    ('service', 'uses_ingredient', 'ingredient', 0.07),
+    ('platform', 'serves_professional', 'professional', 0.06),
+    ('platform', 'offers_feature', 'feature', 0.04),
+    ('supplier', 'certified_by', 'certification', 0.03),
+    ('ai_platform', 'offers_technology', 'ai_technology', 0.03),
+    ('ai_technology', 'detects', 'skin_concern', 0.02),
+    ('platform', 'enables_booking', 'service', 0.03),
+]
+
+AVAILABILITY = ('in_stock', 'limited', 'backorder')
+
+
+def _type_counts(node_count):
+    counts = {node_type: max(1, int(node_count * share)) for node_type, share in NODE_TYPES}
+    counts['ingredient'] += node_count - sum(counts.values())
+    return counts
+
+
+def _node(rng, node_type, i):
+    node = {'id': f"{node_type}_{i}", 'type': node_type, 'name': f"{node_type.replace('_', ' ').title()} {i}"}
+    if node_type == 'ingredient':
+        node.update(category=rng.choice(('humectant', 'emollient', 'active', 'antioxidant')),
+                    purity_range=f"{rng.randint(90, 98)}-99.5%")
+    elif node_type == 'supplier':
+        node.update(website=f"https://supplier{i}.example.com/", founded=rng.randint(1950, 2020),
+                    certifications=rng.sample(['ISO', 'GMP', 'FDA', 'USDA_Organic'], 2),
+                    processing_time_days=rng.randint(1, 10))
+    elif node_type == 'service':
+        node.update(duration_minutes=rng.choice((30, 45, 60, 90)),
+                    price_range_usd=f"{rng.randint(20, 80)}-{rng.randint(100, 300)}")
+    elif node_type == 'platform':
+        node.update(pricing_start_usd=rng.randint(0, 50),
+                    pricing_tiers={'standard': {'monthly': rng.randint(20, 40)},
+                                   'gold': {'monthly': rng.randint(40, 80)}})
+    elif node_type in ('salon', 'skin_concern', 'category', 'ai_technology'):
+        node['category'] = rng.choice(('spa', 'clinical', 'inflammatory', 'diagnostic'))
+    return node
+
+
+def _edge(rng, source, edge_type, target):
+    edge = {'source': source, 'target': target, 'type': edge_type}
+    if edge_type == 'supplies':
+        edge.update(price_per_kg_usd=round(rng.uniform(5, 900), 2), availability=rng.choice(AVAILABILITY))
+    elif edge_type == 'treats':
+        edge.update(efficacy=rng.randint(50, 99))
+    elif edge_type == 'enables_booking':
+        # The nov18 shape: nested metadata and an explicit weight
+        edge.update(metadata={'integration_type': 'booking_management', 'last_updated': '2025-11-18'},
+                    weight=round(rng.uniform(0.5, 1.0), 2))
+    return edge
+
+
+def generate_hypergraph(f, node_count, edge_count, seed=SEED):
+    """Write a synthetic hypergraph with node_count nodes and edge_count edges
+
+    The output is deterministic for a seed, valid (no dangling or
+    duplicate edges) and written incrementally, so 1M rows need only the
+    edge key set in memory.
+    """
+    rng = random.Random(seed)
+    counts = _type_counts(node_count)
+    metadata = {'version': 'bench', 'description': f"Synthetic benchmark hypergraph (seed {seed})",
+                'node_count': node_count, 'edge_count': edge_count}
+    rules = [(s, e, t) for s, e, t, _ in EDGE_TYPES]
+    weights = [share for *_, share in EDGE_TYPES]
+    capacity = sum(counts[s] * counts[t] for s, _, t in rules)
+    if edge_count > capacity:
+        raise ValueError(f"{node_count} nodes allow at most {capacity} distinct edges")
+
+    with HypergraphWriter(f) as writer:
+        writer.write_metadata(metadata)
+        for node_type, count in counts.items():
+            for i in range(count):
+                writer.write_node(_node(rng, node_type, i))
+        seen = set()
+        while len(seen) < edge_count:
+            source_type, edge_type, target_type = rng.choices(rules, weights)[0]
+            key = (rng.randrange(counts[source_type]), edge_type, rng.randrange(counts[target_type]))
+            if key in seen:
+                continue
+            seen.add(key)
+            writer.write_edge(_edge(rng, f"{source_type}_{key[0]}", edge_type, f"{target_type}_{key[2]}"))
+    return metadata
+
+
+def snapshot_for(workdir, size, seed=SEED):
+    """Path of the generated snapshot for size, generating it on first use"""
+    path = os.path.join(workdir, f"hypergraph-{size}-{seed}.json")
+    if not os.path.exists(path):
+        os.makedirs(workdir, exist_ok=True)
+        print(f"Generating {size} hypergraph...", flush=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            generate_hypergraph(f, SIZES[size], SIZES[size], seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+class PhaseTimer:
+    """Seconds per phase, safe to add to from pipeline threads"""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.seconds[phase] += seconds
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+
+class TimedBackend:
+    """A hypergraph_db backend that times execution and MCP rendering"""
+
+    def __init__(self, backend, timer):
+        self.backend = backend
+        self.timer = timer
+        self.name = backend.name
+
+    def _render(self, statements):
+        if self.name != 'mcp':
+            return list(statements)
+        with self.timer.phase('render'):
+            return [render_statement(statement) for statement in statements]
+
+    def execute_transaction(self, statements):
+        statements = self._render(statements)
+        with self.timer.phase('execute'):
+            return self.backend.execute_transaction(statements)
+
+    def execute_many(self, statements):
+        statements = self._render(statements)
+        with self.timer.phase('execute'):
+            return self.backend.execute_many(statements)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+class TimedSQLDriver(SQLDriver):
+    """SQLDriver that also times statement building"""
+
+    def __init__(self, backend, timer):
+        super().__init__(TimedBackend(backend, timer))
+        self.timer = timer
+
+    def statement(self, operation, items):
+        with self.timer.phase('build'):
+            return super().statement(operation, items)
+
+
+class TimedSQLiteDriver(SQLiteDriver):
+    """SQLiteDriver that times the executemany calls"""
+
+    def __init__(self, path, timer):
+        super().__init__(path)
+        self.timer = timer
+
+    def _executemany(self, sql, params):
+        with self.timer.phase('execute'):
+            super()._executemany(sql, params)
+
+
+class BenchRun:
+    """One strategy against one target: snapshot, database and timings"""
+
+    def __init__(self, target, snapshot, database, timer):
+        self.target = target
+        self.snapshot = snapshot
+        self.database = database
+        self.timer = timer
+        self.backend = None
+
+    def sql_backend(self):
+        if self.backend is None:
+            kind = 'mcp' if self.target == 'mcp' else 'postgres'
+            self.backend = create_backend(kind, dsn=self.database)
+        return self.backend
+
+    def driver(self):
+        if self.target == 'sqlite':
+            return TimedSQLiteDriver(self.database, self.timer)
+        return TimedSQLDriver(self.sql_backend(), self.timer)
+
+    def load(self):
+        with self.timer.phase('load'):
+            with open(self.snapshot, 'r') as f:
+                data = json.load(f)
+        with self.timer.phase('encode'):
+            nodes = [node_row(node) for node in data['nodes']]
+            edges = [edge_row(edge) for edge in data['edges']]
+        return nodes, edges
+
+    def reset(self):
+        """Empty the target so every strategy starts from the same state"""
+        if self.target == 'sqlite':
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(self.database + suffix):
+                    os.remove(self.database + suffix)
+            driver = SQLiteDriver(self.database)
+            driver.prepare()
+            driver.close()
+            return
+        backend = self.sql_backend()
+        tables = str(backend.list_tables())
+        if 'nodes' not in tables or 'edges' not in tables:
+            raise DatabaseError("nodes and edges tables not found; create the schema first")
+        backend.execute_transaction(["TRUNCATE nodes, edges CASCADE;"])
+
+    def counts(self):
+        driver = SQLiteDriver(self.database) if self.target == 'sqlite' else SQLDriver(self.sql_backend())
+        try:
+            return driver.counts()[:2]
+        finally:
+            if self.target == 'sqlite':
+                driver.close()
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+
+
+def run_per_row(run):
+    nodes, edges = run.load()
+    driver = run.driver()
+    with run.timer.phase('send'):
+        for row in nodes:
+            driver.upsert_nodes([row])
+        for row in edges:
+            driver.insert_edges([row])
+    if run.target == 'sqlite':
+        driver.close()
+
+
+def run_populate(run):
+    import populate_neon_db
+    with run.timer.phase('load'):
+        with open(run.snapshot, 'r') as f:
+            data = json.load(f)
+    # populate_neon_db looks its backend up through get_backend()
+    backend = TimedBackend(run.sql_backend(), run.timer)
+    populate_neon_db.get_backend = lambda: backend
+    with run.timer.phase('send'):
+        if not (populate_neon_db.insert_nodes(data['nodes']) and populate_neon_db.insert_edges(data['edges'])):
+            raise DatabaseError("populate_neon_db insert failed")
+
+
+def run_batched(run, batch_size=50):
+    nodes, edges = run.load()
+    driver = run.driver()
+    with run.timer.phase('send'):
+        with SyncPipeline(lambda payload: getattr(driver, payload[0])(payload[1])) as pipeline:
+            for operation, rows in (('upsert_nodes', nodes), ('insert_edges', edges)):
+                pipeline.run_phase(operation, (((operation, batch), len(batch))
+                                               for batch in batched(rows, batch_size)))
+    if run.target == 'sqlite':
+        driver.close()
+
+
+def run_staged(run, batch_size=50, batches_per_call=10):
+    from hypergraph_staging import (CLEAR_STAGING, PREPARE_STAGING, publish_statements,
+                                    staging_batches, staging_edge_sql, staging_node_sql)
+    nodes, edges = run.load()
+    backend = TimedBackend(run.sql_backend(), run.timer)
+    timer = run.timer
+
+    def grouped(rows, to_sql):
+        for group in batched(staging_batches(rows, to_sql, batch_size), batches_per_call):
+            with timer.phase('build'):
+                statements = [statement for statement, _ in group]
+            yield statements, sum(count for _, count in group)
+
+    backend.execute_transaction(PREPARE_STAGING)
+    with timer.phase('send'):
+        with SyncPipeline(backend.execute_transaction) as pipeline:
+            pipeline.run_phase('nodes', grouped(nodes, staging_node_sql))
+            pipeline.run_phase('edges', grouped(edges, staging_edge_sql))
+    with timer.phase('publish'):
+        backend.execute_transaction(publish_statements(len(nodes), len(edges)))
+    backend.execute_transaction([CLEAR_STAGING])
+
+
+def run_copy(run):
+    from hypergraph_bulk_load import bulk_load
+    # Streams straight from the file; nothing is held in memory
+    stats = bulk_load(run.sql_backend(), iter_nodes(run.snapshot), iter_edges(run.snapshot))
+    for phase, seconds in stats['timings'].items():
+        run.timer.add(phase, seconds)
+
+
+def run_sync(run):
+    import sync_hypergraph
+    with tempfile.TemporaryDirectory() as tmp:
+        with run.timer.phase('send'):
+            ok = sync_hypergraph.sync(run.target, run.snapshot, run.database, os.path.join(tmp, 'state.json'),
+                                      full=True, driver=run.driver())
+    if not ok:
+        raise DatabaseError("sync_hypergraph.sync failed")
+
+
+STRATEGIES = {
+    'per-row': (run_per_row, TARGETS),
+    'populate': (run_populate, SQL_TARGETS),
+    'batched': (run_batched, TARGETS),
+    'staged': (run_staged, SQL_TARGETS),
+    'copy': (run_copy, ('postgres',)),
+    'sync': (run_sync, TARGETS),
+}
+
+
+def call_overhead(backend, calls=10):
+    """Seconds per MCP call for a trivial query: CLI start-up plus connect"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        backend.execute("SELECT 1")
+    return (time.perf_counter() - start) / calls
+
+
+def run_one(strategy, target, snapshot, database):
+    """Run one strategy in this process; return the result dict"""
+    metadata = read_metadata(snapshot)
+    rows = metadata['node_count'] + metadata['edge_count']
+    timer = PhaseTimer()
+    run = BenchRun(target, snapshot, database, timer)
+    try:
+        run.reset()
+        # The sync code reports progress on stdout; only the result is wanted
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            STRATEGIES[strategy][0](run)
+            seconds = time.perf_counter() - start
+        result = {'seconds': seconds, 'rows': rows, 'rows_per_sec': rows / seconds,
+                  'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'phases': dict(timer.seconds)}
+        result['stored'] = list(run.counts())
+        if target == 'mcp':
+            calls = run.backend.calls
+            result['calls'] = calls
+            estimate = calls * call_overhead(run.backend)
+            result['phases']['cli'] = min(estimate, result['phases'].get('execute', estimate))
+        return result
+    finally:
+        run.close()
+
+
+def format_phases(phases):
+    return ', '.join(f"{name} {seconds:.2f}s" for name, seconds in phases.items())
+
+
+def print_results(results):
+    print(f"\n{'size':>6} {'target':<9} {'strategy':<9} {'seconds':>9} {'rows/s':>10} "
+          f"{'RSS MB':>8}  phases")
+    for r in results:
+        prefix = f"{r['size']:>6} {r['target']:<9} {r['strategy']:<9}"
+        if 'error' in r:
+            print(f"{prefix} ✗ {r['error']}")
+            continue
+        print(f"{prefix} {r['seconds']:>9.2f} {r['rows_per_sec']:>10.0f} {r['peak_rss_mb']:>8.0f}  "
+              f"{format_phases(r['phases'])}")
+
+
+def _csv(value, choices):
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    unknown = [item for item in items if item not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(choices)})")
+    return items
+
+
+def run_child(strategy, target, snapshot, database, repeat=1, timeout=DEFAULT_TIMEOUT):
+    """Run one strategy repeat times in child processes; return the median run"""
+    cmd = [sys.executable, os.path.abspath(__file__), 'run-one', strategy, target, snapshot]
+    if database:
+        cmd += ['--database', database]
+    runs = []
+    for _ in range(repeat):
+        try:
+            child = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {'error': f"timed out after {timeout}s"}
+        if child.returncode != 0:
+            lines = child.stderr.strip().splitlines() or ['failed']
+            return {'error': lines[-1]}
+        runs.append(json.loads(child.stdout.strip().splitlines()[-1]))
+    runs.sort(key=lambda r: r['seconds'])
+    return dict(runs[len(runs) // 2], runs=len(runs))
+
+
+def run_suite(args):
+    """Run every requested (size, target, strategy) in a child process"""
+    if 'postgres' in args.targets and not args.database:
+        print("✗ The postgres target needs --database (its tables are truncated)")
+        return 1
+    if 'mcp' in args.targets and not args.local_mcp:
+        print("✗ The mcp target truncates tables; pass --local-mcp if manus-mcp-cli is a local stand-in")
+        return 1
+
+    results = []
+    for size in args.sizes:
+        snapshot = snapshot_for(args.workdir, size, args.seed)
+        for target in args.targets:
+            database = args.database if target != 'sqlite' else os.path.join(args.workdir, 'bench.db')
+            for strategy in args.strategies:
+                if target not in STRATEGIES[strategy][1]:
+                    continue
+                print(f"Running {strategy} on {target} ({size})...", flush=True)
+                entry = {'size': size, 'target': target, 'strategy': strategy}
+                entry.update(run_child(strategy, target, snapshot, database, args.repeat, args.timeout))
+                if 'error' in entry:
+                    print(f"  ✗ {entry['error']}")
+                else:
+                    print(f"  ✓ {entry['rows_per_sec']:.0f} rows/s")
+                results.append(entry)
+
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    return 0 if all('error' not in r for r in results) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the hypergraph sync strategies')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Write a synthetic hypergraph')
+    generate.add_argument('--size', choices=SIZES, default='1k')
+    generate.add_argument('--seed', type=int, default=SEED)
+    generate.add_argument('--output', help='Output file (default: hypergraph-<size>-<seed>.json)')
+
+    run = commands.add_parser('run', help='Run the benchmark suite')
+    run.add_argument('--sizes', type=lambda v: _csv(v, SIZES), default=list(DEFAULT_SIZES))
+    run.add_argument('--targets', type=lambda v: _csv(v, TARGETS), default=['sqlite'])
+    run.add_argument('--strategies', type=lambda v: _csv(v, STRATEGIES), default=list(STRATEGIES))
+    run.add_argument('--database', help='Postgres DSN for the postgres and mcp targets')
+    run.add_argument('--local-mcp', action='store_true',
+                     help='manus-mcp-cli on PATH is a local stand-in that may be truncated')
+    run.add_argument('--workdir', default=DEFAULT_WORKDIR, help='Where snapshots and the SQLite file go')
+    run.add_argument('--seed', type=int, default=SEED)
+    run.add_argument('--repeat', type=int, default=1, help='Runs per case; the median is reported')
+    run.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT, help='Seconds per run')
+    run.add_argument('--output', help='Also write the results as JSON')
+
+    run_one_parser = commands.add_parser('run-one', help='Run one strategy (used by run)')
+    run_one_parser.add_argument('strategy', choices=STRATEGIES)
+    run_one_parser.add_argument('target', choices=TARGETS)
+    run_one_parser.add_argument('snapshot')
+    run_one_parser.add_argument('--database')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        output = args.output or f"hypergraph-{args.size}-{args.seed}.json"
+        with open(output, 'w') as f:
+            generate_hypergraph(f, SIZES[args.size], SIZES[args.size], args.seed)
+        print(f"✓ Wrote {output}")
+        return 0
+    if args.command == 'run':
+        return run_suite(args)
+    print(json.dumps(run_one(args.strategy, args.target, args.snapshot, args.database)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
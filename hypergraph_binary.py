@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Compact binary snapshot format for the Skin Zone hypergraph (.hgb)
+Ids, types and names are interned into one string table, nodes and edges
+are stored as columnar integer arrays, and the remaining per-entity fields
+are stored as packed JSON blobs with an offset index
+
+File layout (all integers little-endian):
+
+    header      '<4sIIIIQQQQ': magic b'HGB1', format version, string count,
+                node count, edge count, then byte lengths of the string
+                table, graph metadata, node blobs and edge blobs
+    strings     JSON array of every interned string
+    metadata    JSON object (the hypergraph 'metadata' section)
+    node_id     uint32[nodes]    string index
+    node_type   uint32[nodes]    string index
+    node_name   uint32[nodes]    string index, ABSENT if the node has no name
+    node_offs   uint64[nodes+1]  offsets into node blobs
+    node blobs  comma-separated JSON objects with the remaining node fields
+    edge_src    uint32[edges]    string index of source id
+    edge_tgt    uint32[edges]    string index of target id
+    edge_type   uint32[edges]    string index
+    edge_weight float64[edges]   NaN if the edge has no float 'weight'
+    edge_offs   uint64[edges+1]  offsets into edge blobs
+    edge blobs  comma-separated JSON objects with the remaining edge fields
+
+Because blobs are comma-separated, a full load decodes all of them with a
+single json.loads call; a single blob can still be sliced out by offset.
+
+Usage:
+    python3 hypergraph_binary.py to-binary hypergraph_data.json hypergraph_data.hgb
+    python3 hypergraph_binary.py to-json hypergraph_data.hgb hypergraph_data.json
+    python3 hypergraph_binary.py verify hypergraph_data.json
+"""
+
+import argparse
+import gc
+import json
+import math
+import struct
+import sys
+import time
+from array import array
+from contextlib import contextmanager
+
+from hypergraph_store import HypergraphStore
+
+MAGIC = b'HGB1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIIIIQQQQ')
+ABSENT = 0xFFFFFFFF
+NODE_FIELDS = ('id', 'type', 'name')
+EDGE_FIELDS = ('source', 'target', 'type')
+
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+@contextmanager
+def gc_paused():
+    """Suspend cyclic GC while building many small objects
+
+    Building millions of dicts otherwise triggers repeated GC passes that
+    cost more than the decoding itself.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def _pack(arr):
+    if _BIG_ENDIAN:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpack(typecode, buf, offset, count):
+    arr = array(typecode)
+    end = offset + count * arr.itemsize
+    arr.frombytes(buf[offset:end])
+    if _BIG_ENDIAN:
+        arr.byteswap()
+    return arr, end
+
+
+class _Interner:
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def __call__(self, value):
+        idx = self.index.get(value)
+        if idx is None:
+            idx = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+
+def _pack_blobs(dicts):
+    offsets = array('Q', [0])
+    parts = []
+    total = 0
+    for extra in dicts:
+        blob = _dumps(extra).encode('utf-8')
+        parts.append(blob)
+        total += len(blob) + 1
+        offsets.append(total)
+    return offsets, b','.join(parts)
+
+
+def encode(data):
+    """Encode a {'metadata', 'nodes', 'edges'} dict into .hgb bytes"""
+    intern = _Interner()
+    nodes = data.get('nodes', [])
+    edges = data.get('edges', [])
+
+    node_id = array('I')
+    node_type = array('I')
+    node_name = array('I')
+    node_extras = []
+    for node in nodes:
+        node_id.append(intern(node['id']))
+        node_type.append(intern(node['type']))
+        node_name.append(intern(node['name']) if 'name' in node else ABSENT)
+        node_extras.append({k: v for k, v in node.items() if k not in NODE_FIELDS})
+
+    edge_src = array('I')
+    edge_tgt = array('I')
+    edge_type = array('I')
+    edge_weight = array('d')
+    edge_extras = []
+    for edge in edges:
+        edge_src.append(intern(edge['source']))
+        edge_tgt.append(intern(edge['target']))
+        edge_type.append(intern(edge['type']))
+        weight = edge.get('weight')
+        # Only floats go in the column so ints keep their JSON type
+        if isinstance(weight, float) and not math.isnan(weight):
+            edge_weight.append(weight)
+            skip = EDGE_FIELDS + ('weight',)
+        else:
+            edge_weight.append(math.nan)
+            skip = EDGE_FIELDS
+        edge_extras.append({k: v for k, v in edge.items() if k not in skip})
+
+    node_offs, node_blobs = _pack_blobs(node_extras)
+    edge_offs, edge_blobs = _pack_blobs(edge_extras)
+    strings = _dumps(intern.strings).encode('utf-8')
+    metadata = _dumps(data.get('metadata', {})).encode('utf-8')
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(intern.strings), len(nodes), len(edges),
+        len(strings), len(metadata), len(node_blobs), len(edge_blobs),
+    )
+    return b''.join([
+        header, strings, metadata,
+        _pack(node_id), _pack(node_type), _pack(node_name), _pack(node_offs), node_blobs,
+        _pack(edge_src), _pack(edge_tgt), _pack(edge_type), _pack(edge_weight), _pack(edge_offs), edge_blobs,
+    ])
+
+
+class BinarySnapshot:
+    """Parsed .hgb columns, before any per-entity dicts are built"""
+
+    def __init__(self, buf):
+        buf = memoryview(buf)
+        (magic, version, n_strings, n_nodes, n_edges,
+         strings_len, metadata_len, node_blobs_len, edge_blobs_len) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a hypergraph binary snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version: {version}")
+
+        pos = HEADER.size
+        self.strings = json.loads(bytes(buf[pos:pos + strings_len]))
+        pos += strings_len
+        self.metadata = json.loads(bytes(buf[pos:pos + metadata_len]))
+        pos += metadata_len
+        if len(self.strings) != n_strings:
+            raise ValueError("Corrupt snapshot: string table size mismatch")
+
+        self.node_id, pos = _unpack('I', buf, pos, n_nodes)
+        self.node_type, pos = _unpack('I', buf, pos, n_nodes)
+        self.node_name, pos = _unpack('I', buf, pos, n_nodes)
+        self.node_offsets, pos = _unpack('Q', buf, pos, n_nodes + 1)
+        self.node_blobs = buf[pos:pos + node_blobs_len]
+        pos += node_blobs_len
+
+        self.edge_source, pos = _unpack('I', buf, pos, n_edges)
+        self.edge_target, pos = _unpack('I', buf, pos, n_edges)
+        self.edge_type, pos = _unpack('I', buf, pos, n_edges)
+        self.edge_weight, pos = _unpack('d', buf, pos, n_edges)
+        self.edge_offsets, pos = _unpack('Q', buf, pos, n_edges + 1)
+        self.edge_blobs = buf[pos:pos + edge_blobs_len]
+
+    @property
+    def node_count(self):
+        return len(self.node_id)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_source)
+
+    def node_blob(self, i):
+        """Return the raw JSON bytes of node i's extra fields"""
+        return bytes(self.node_blobs[self.node_offsets[i]:self.node_offsets[i + 1] - 1])
+
+    def edge_blob(self, i):
+        """Return the raw JSON bytes of edge i's extra fields"""
+        return bytes(self.edge_blobs[self.edge_offsets[i]:self.edge_offsets[i + 1] - 1])
+
+    def node_extras(self):
+        """Decode every node blob with one json.loads call"""
+        return json.loads(b'[' + bytes(self.node_blobs) + b']')
+
+    def edge_extras(self):
+        """Decode every edge blob with one json.loads call"""
+        return json.loads(b'[' + bytes(self.edge_blobs) + b']')
+
+    def nodes(self):
+        strings = self.strings
+        nodes = [
+            {'id': strings[i], 'type': strings[t], 'name': strings[n], **extra}
+            if n != ABSENT else {'id': strings[i], 'type': strings[t], **extra}
+            for i, t, n, extra in zip(self.node_id, self.node_type, self.node_name, self.node_extras())
+        ]
+        return nodes
+
+    def edges(self):
+        strings = self.strings
+        edges = [
+            {'source': strings[s], 'target': strings[t], 'type': strings[k], **extra}
+            for s, t, k, extra in zip(self.edge_source, self.edge_target, self.edge_type, self.edge_extras())
+        ]
+        for i, weight in enumerate(self.edge_weight):
+            if weight == weight:
+                edges[i]['weight'] = weight
+        return edges
+
+    def to_dict(self):
+        with gc_paused():
+            return {'metadata': self.metadata, 'nodes': self.nodes(), 'edges': self.edges()}
+
+
+def decode(buf):
+    """Decode .hgb bytes back into a {'metadata', 'nodes', 'edges'} dict"""
+    return BinarySnapshot(buf).to_dict()
+
+
+def write_binary(data, filepath):
+    """Write a hypergraph dict as a binary snapshot"""
+    with open(filepath, 'wb') as f:
+        f.write(encode(data))
+
+
+def read_binary(filepath):
+    """Read a binary snapshot into a hypergraph dict"""
+    with open(filepath, 'rb') as f:
+        return decode(f.read())
+
+
+def load_store(filepath):
+    """Load a binary snapshot into a HypergraphStore"""
+    data = read_binary(filepath)
+    with gc_paused():
+        return HypergraphStore(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert hypergraph snapshots between JSON and .hgb')
+    sub = parser.add_subparsers(dest='command', required=True)
+    to_binary = sub.add_parser('to-binary', help='Convert JSON to a binary snapshot')
+    to_binary.add_argument('source')
+    to_binary.add_argument('dest')
+    to_json = sub.add_parser('to-json', help='Convert a binary snapshot to JSON')
+    to_json.add_argument('source')
+    to_json.add_argument('dest')
+    verify = sub.add_parser('verify', help='Check a lossless JSON -> binary -> JSON round trip')
+    verify.add_argument('source')
+    args = parser.parse_args()
+
+    if args.command == 'to-binary':
+        with open(args.source, 'r') as f:
+            data = json.load(f)
+        write_binary(data, args.dest)
+        print(f"✓ Wrote {args.dest} ({len(data['nodes'])} nodes, {len(data['edges'])} edges)")
+    elif args.command == 'to-json':
+        data = read_binary(args.source)
+        with open(args.dest, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"✓ Wrote {args.dest} ({len(data['nodes'])} nodes, {len(data['edges'])} edges)")
+    else:
+        with open(args.source, 'rb') as f:
+            raw_json = f.read()
+        start = time.perf_counter()
+        data = json.loads(raw_json)
+        json_secs = time.perf_counter() - start
+        raw_binary = encode(data)
+        start = time.perf_counter()
+        snapshot = BinarySnapshot(raw_binary)
+        column_secs = time.perf_counter() - start
+        round_trip = snapshot.to_dict()
+        binary_secs = time.perf_counter() - start
+        if round_trip != data:
+            print("✗ Round trip mismatch")
+            return 1
+        print("✓ Lossless round trip")
+        print(f"  JSON:   {len(raw_json):>10} bytes, load {json_secs * 1000:.2f} ms")
+        print(f"  Binary: {len(raw_binary):>10} bytes, load {binary_secs * 1000:.2f} ms"
+              f" (columns only {column_secs * 1000:.2f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
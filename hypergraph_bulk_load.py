@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+COPY-based bulk loader for the nodes and edges tables
+Rows are streamed with COPY FROM STDIN into temporary load tables, then
+merged into nodes and edges with one statement per table. psycopg does the
+value encoding, so there is no SQL string building or quote escaping on
+the Python side
+
+The merge upserts in place rather than clearing the tables: unchanged rows
+are not touched and rows referencing them (hypergraph_metrics,
+recommendations) survive. With prune (the default for the CLI) rows missing
+from the snapshot are deleted afterwards, so the database ends up matching
+the snapshot exactly.
+
+COPY needs a direct connection, so this uses the postgres backend
+(NEON_DATABASE_URL or DATABASE_URL).
+
+Usage:
+    python3 hypergraph_bulk_load.py [hypergraph_data.json] [--no-prune] [--write-state]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from hypergraph_db import PostgresBackend, create_backend
+from hypergraph_diff import SyncState, compute_diff, edge_row, node_row
+from hypergraph_store import DEFAULT_HYPERGRAPH_PATH
+from hypergraph_validate import load_valid
+
+CREATE_LOAD_TABLES = [
+    """CREATE TEMP TABLE IF NOT EXISTS nodes_load (
+        id TEXT, type TEXT, name TEXT, metadata JSONB
+    ) ON COMMIT DROP""",
+    """CREATE TEMP TABLE IF NOT EXISTS edges_load (
+        source TEXT, target TEXT, type TEXT, metadata JSONB, weight FLOAT
+    ) ON COMMIT DROP""",
+]
+
+# DISTINCT ON keeps ON CONFLICT from touching a row twice; unchanged rows
+# are skipped so their updated_at and dependent rows stay as they are
+MERGE_NODES = """INSERT INTO nodes (id, type, name, metadata)
+SELECT DISTINCT ON (id) id, type, name, metadata FROM {nodes}
+ON CONFLICT (id) DO UPDATE
+SET type = EXCLUDED.type,
+    name = EXCLUDED.name,
+    metadata = EXCLUDED.metadata,
+    updated_at = NOW()
+WHERE (nodes.type, nodes.name, nodes.metadata)
+    IS DISTINCT FROM (EXCLUDED.type, EXCLUDED.name, EXCLUDED.metadata)"""
+
+# edges has no unique key on (source, target, type), so update and insert
+# run as one statement through a writable CTE; both parts see the table as
+# it was before the statement, and edges whose endpoints are missing are
+# left out instead of failing the foreign key.
+# The ORDER BY keeps the anti-join from rescanning edges. When edges is
+# empty and analyzed (a first publish after TRUNCATE) the planner otherwise
+# picks a nested loop that seq-scans edges once per incoming row while this
+# statement keeps growing it, which is quadratic in the number of edges
+MERGE_EDGES = """WITH incoming AS (
+    SELECT DISTINCT ON (l.source, l.target, l.type) l.*
+    FROM {edges} l
+    WHERE EXISTS (SELECT 1 FROM nodes n WHERE n.id = l.source)
+      AND EXISTS (SELECT 1 FROM nodes n WHERE n.id = l.target)
+), updated AS (
+    UPDATE edges e
+    SET metadata = i.metadata, weight = i.weight, updated_at = NOW()
+    FROM incoming i
+    WHERE e.source = i.source AND e.target = i.target AND e.type = i.type
+      AND (e.metadata, e.weight) IS DISTINCT FROM (i.metadata, i.weight)
+    RETURNING 1
+)
+INSERT INTO edges (source, target, type, metadata, weight)
+SELECT i.source, i.target, i.type, i.metadata, i.weight
+FROM incoming i
+WHERE NOT EXISTS (
+    SELECT 1 FROM edges e
+    WHERE e.source = i.source AND e.target = i.target AND e.type = i.type
+)
+ORDER BY i.source, i.target, i.type"""
+
+PRUNE_DUPLICATE_EDGES = """DELETE FROM edges a
+USING edges b
+WHERE a.source = b.source AND a.target = b.target AND a.type = b.type
+  AND a.ctid > b.ctid"""
+
+PRUNE_EDGES = """DELETE FROM edges e
+WHERE NOT EXISTS (
+    SELECT 1 FROM {edges} l
+    WHERE l.source = e.source AND l.target = e.target AND l.type = e.type
+)"""
+
+PRUNE_NODES = """DELETE FROM nodes n
+WHERE NOT EXISTS (SELECT 1 FROM {nodes} l WHERE l.id = n.id)"""
+
+# Fresh statistics for the live tables before the joins against them. An
+# autovacuum analyze that ran while a big load was still uncommitted leaves
+# reltuples at 0 on a full table, and the planner then nests loops over
+# edges; ANALYZE inside the transaction counts its own uncommitted rows
+ANALYZE_NODES = "ANALYZE nodes"
+ANALYZE_EDGES = "ANALYZE edges"
+
+
+def merge_statements(nodes_table, edges_table, prune=True):
+    """Return [(label, sql)] merging loaded rows from the given tables
+
+    The tables need the nodes/edges row columns (id, type, name, metadata
+    and source, target, type, metadata, weight). Run the statements in
+    order, in one transaction, to publish the loaded rows atomically.
+    The 'analyzed' steps only refresh planner statistics.
+    """
+    names = {'nodes': nodes_table, 'edges': edges_table}
+    statements = [
+        ('nodes_merged', MERGE_NODES.format(**names)),
+        ('nodes_analyzed', ANALYZE_NODES),
+        ('edges_analyzed', ANALYZE_EDGES),
+        ('edges_inserted', MERGE_EDGES.format(**names)),
+    ]
+    if prune:
+        statements += [
+            ('edges_reanalyzed', ANALYZE_EDGES),
+            ('edges_deduplicated', PRUNE_DUPLICATE_EDGES),
+            ('edges_pruned', PRUNE_EDGES.format(**names)),
+            ('nodes_pruned', PRUNE_NODES.format(**names)),
+        ]
+    return statements
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Stream tuples into table with COPY FROM STDIN; return the row count"""
+    count = 0
+    with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+            count += 1
+    return count
+
+
+def _node_tuples(nodes):
+    for node in nodes:
+        row = node_row(node)
+        yield row['id'], row['type'], row['name'], json.dumps(row['metadata'])
+
+
+def _edge_tuples(edges):
+    for edge in edges:
+        row = edge_row(edge)
+        yield row['source'], row['target'], row['type'], json.dumps(row['metadata']), row['weight']
+
+
+def bulk_load(backend, nodes, edges, prune=True):
+    """COPY nodes and edges into load tables and merge them in one transaction
+
+    nodes and edges may be any iterables (e.g. hypergraph_stream.iter_nodes).
+    Returns a dict of row counts and per-phase timings in seconds.
+    """
+    if not isinstance(backend, PostgresBackend):
+        raise ValueError("Bulk loading needs a direct Postgres connection; set DATABASE_URL")
+
+    stats = {'timings': {}}
+    timings = stats['timings']
+    with backend.connection() as conn:
+        with conn.cursor() as cur:
+            # Room for the merge sorts to stay in memory; reset at commit
+            cur.execute("SET LOCAL work_mem = '64MB'")
+            for sql in CREATE_LOAD_TABLES:
+                cur.execute(sql)
+
+            start = time.perf_counter()
+            stats['nodes_copied'] = copy_rows(cur, 'nodes_load', ('id', 'type', 'name', 'metadata'),
+                                              _node_tuples(nodes))
+            stats['edges_copied'] = copy_rows(cur, 'edges_load',
+                                              ('source', 'target', 'type', 'metadata', 'weight'),
+                                              _edge_tuples(edges))
+            timings['copy'] = time.perf_counter() - start
+
+            cur.execute("CREATE INDEX ON edges_load (source, target, type)")
+            cur.execute("ANALYZE edges_load")
+            start = time.perf_counter()
+            for label, sql in merge_statements('nodes_load', 'edges_load', prune):
+                cur.execute(sql)
+                stats[label] = cur.rowcount
+            timings['merge'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        conn.commit()
+        timings['commit'] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk load the hypergraph into Postgres with COPY')
+    parser.add_argument('hypergraph', nargs='?', default=DEFAULT_HYPERGRAPH_PATH)
+    parser.add_argument('--no-prune', action='store_true',
+                        help='Keep database rows that are not in the snapshot')
+    parser.add_argument('--write-state', action='store_true',
+                        help='Record the loaded rows as the incremental sync state')
+    args = parser.parse_args()
+
+    print("Loading hypergraph data...")
+    data = load_valid(args.hypergraph)
+    print(f"Nodes: {len(data['nodes'])}")
+    print(f"Edges: {len(data['edges'])}")
+
+    backend = create_backend('postgres')
+    try:
+        stats = bulk_load(backend, data['nodes'], data['edges'], prune=not args.no_prune)
+    finally:
+        backend.close()
+
+    print(f"✓ Copied {stats['nodes_copied']} nodes and {stats['edges_copied']} edges")
+    print(f"  Nodes inserted or changed: {stats['nodes_merged']}")
+    print(f"  Edges inserted: {stats['edges_inserted']}")
+    if 'edges_pruned' in stats:
+        print(f"  Pruned: {stats['nodes_pruned']} nodes, {stats['edges_pruned']} edges")
+    for phase, seconds in stats['timings'].items():
+        print(f"  {phase}: {seconds:.2f}s")
+
+    if args.write_state:
+        state_path = f"{args.hypergraph}.neon-sync.json"
+        diff = compute_diff(data['nodes'], data['edges'], SyncState())
+        diff.next_state(data['metadata'].get('version')).save(state_path)
+        print(f"✓ Sync state written to {state_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Declarative changesets for the Skin Zone hypergraph
+A changeset describes node/edge additions, updates, upserts and deletions;
+apply_changeset() applies it to a HypergraphStore in one indexed pass
+
+Changeset layout (every section is optional):
+
+{
+  "metadata": {"version": "7.0", "last_updated": "2025-12-01"},
+  "nodes": {
+    "add":    [{"id": "...", "type": "...", "name": "...", ...}],
+    "upsert": [{"id": "...", ...}],
+    "update": {"node_id": {"field": "value"}},
+    "delete": ["node_id"]
+  },
+  "edges": {
+    "add":    [{"source": "...", "target": "...", "type": "...", ...}],
+    "upsert": [{"source": "...", "target": "...", "type": "...", ...}],
+    "update": [{"source": "...", "target": "...", "type": "...", "field": "value"}],
+    "delete": [{"source": "...", "target": "...", "type": "..."}]
+  }
+}
+
+Usage: python3 hypergraph_changeset.py changeset.json [--hypergraph PATH] [--dry-run]
+"""
+
+import argparse
+import json
+import sys
+
+from hypergraph_store import DEFAULT_HYPERGRAPH_PATH, HypergraphStore, edge_key
+
+
+class ChangesetError(Exception):
+    """Raised in strict mode when a changeset entry cannot be applied"""
+
+
+def new_report():
+    """Return an empty apply report"""
+    return {
+        'nodes_added': 0,
+        'nodes_updated': 0,
+        'nodes_deleted': 0,
+        'edges_added': 0,
+        'edges_updated': 0,
+        'edges_deleted': 0,
+        'details': [],
+        'skipped': [],
+    }
+
+
+def _skip(report, strict, message):
+    if strict:
+        raise ChangesetError(message)
+    report['skipped'].append(message)
+
+
+def _node_label(node):
+    return node.get('name', node['id'])
+
+
+def apply_changeset(store, changeset, strict=False):
+    """Apply a changeset dict to a HypergraphStore and return a report
+
+    Every entry is a single hash lookup, so the cost is linear in the size
+    of the changeset rather than (changes x nodes). Node additions and
+    updates run before edge changes so new edges can reference new nodes;
+    node deletions run last and cascade to their edges. In strict mode the
+    first entry that cannot be applied (adding an existing id, updating or
+    deleting a missing one) raises ChangesetError; otherwise it is recorded
+    under report['skipped'] and the rest of the changeset is applied.
+    """
+    report = new_report()
+    nodes = changeset.get('nodes', {})
+    edges = changeset.get('edges', {})
+
+    for node in nodes.get('add', []):
+        if store.has_node(node['id']):
+            _skip(report, strict, f"Node already exists: {node['id']}")
+            continue
+        store.add_node(node)
+        report['nodes_added'] += 1
+        report['details'].append(f"Added node: {_node_label(node)}")
+
+    for node in nodes.get('upsert', []):
+        if store.has_node(node['id']):
+            store.update_node(node['id'], node)
+            report['nodes_updated'] += 1
+            report['details'].append(f"Updated node: {_node_label(store.get_node(node['id']))}")
+        else:
+            store.add_node(node)
+            report['nodes_added'] += 1
+            report['details'].append(f"Added node: {_node_label(node)}")
+
+    for node_id, fields in nodes.get('update', {}).items():
+        if not store.has_node(node_id):
+            _skip(report, strict, f"Node not found for update: {node_id}")
+            continue
+        node = store.update_node(node_id, fields)
+        report['nodes_updated'] += 1
+        report['details'].append(f"Updated node: {_node_label(node)}")
+
+    for key in edges.get('delete', []):
+        key = edge_key(key)
+        if not store.has_edge(*key):
+            _skip(report, strict, f"Edge not found for delete: {key}")
+            continue
+        store.remove_edge(*key)
+        report['edges_deleted'] += 1
+        report['details'].append(f"Deleted edge: {key[0]} -[{key[2]}]-> {key[1]}")
+
+    for edge in edges.get('add', []):
+        key = edge_key(edge)
+        if store.has_edge(*key):
+            _skip(report, strict, f"Edge already exists: {key}")
+            continue
+        store.add_edge(edge)
+        report['edges_added'] += 1
+        report['details'].append(f"Added edge: {key[0]} -[{key[2]}]-> {key[1]}")
+
+    for edge in edges.get('upsert', []):
+        key = edge_key(edge)
+        if store.has_edge(*key):
+            store.update_edge(*key, edge)
+            report['edges_updated'] += 1
+            report['details'].append(f"Updated edge: {key[0]} -[{key[2]}]-> {key[1]}")
+        else:
+            store.add_edge(edge)
+            report['edges_added'] += 1
+            report['details'].append(f"Added edge: {key[0]} -[{key[2]}]-> {key[1]}")
+
+    for edge in edges.get('update', []):
+        key = edge_key(edge)
+        if not store.has_edge(*key):
+            _skip(report, strict, f"Edge not found for update: {key}")
+            continue
+        store.update_edge(*key, edge)
+        report['edges_updated'] += 1
+        report['details'].append(f"Updated edge: {key[0]} -[{key[2]}]-> {key[1]}")
+
+    for node_id in nodes.get('delete', []):
+        if not store.has_node(node_id):
+            _skip(report, strict, f"Node not found for delete: {node_id}")
+            continue
+        node = store.remove_node(node_id)
+        report['nodes_deleted'] += 1
+        report['details'].append(f"Deleted node: {_node_label(node)}")
+
+    store.metadata.update(changeset.get('metadata', {}))
+    store.refresh_counts()
+    return report
+
+
+def load_changeset(filepath):
+    """Load a changeset from a JSON file"""
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply a hypergraph changeset')
+    parser.add_argument('changeset', help='Path to the changeset JSON file')
+    parser.add_argument('--hypergraph', default=DEFAULT_HYPERGRAPH_PATH,
+                        help='Path to hypergraph_data.json')
+    parser.add_argument('--strict', action='store_true',
+                        help='Fail on the first entry that cannot be applied')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Apply in memory and report without saving')
+    args = parser.parse_args()
+
+    store = HypergraphStore.load(args.hypergraph)
+    try:
+        report = apply_changeset(store, load_changeset(args.changeset), strict=args.strict)
+    except ChangesetError as e:
+        print(f"✗ Changeset rejected: {e}")
+        return 1
+
+    if not args.dry_run:
+        store.save(args.hypergraph)
+
+    print(f"✓ Changeset applied{' (dry run)' if args.dry_run else ''}")
+    print(f"  Nodes: +{report['nodes_added']} ~{report['nodes_updated']} -{report['nodes_deleted']}")
+    print(f"  Edges: +{report['edges_added']} ~{report['edges_updated']} -{report['edges_deleted']}")
+    print(f"  Skipped: {len(report['skipped'])}")
+    for message in report['skipped']:
+        print(f"    - {message}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
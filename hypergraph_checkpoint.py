@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Resumable sync checkpoints
+A checkpoint file records, for one snapshot file and one sync target, the
+one-off steps already done (such as clearing the tables) and the row
+ranges of every batch that has been written. SyncPipeline consults it to
+skip finished batches, so a rerun after a failure resumes at the first
+unfinished batch instead of reloading everything
+
+The checkpoint only applies to the exact snapshot it was written for (a
+SHA-1 of the file) and the same batching settings; anything else starts a
+fresh run. Ranges are row offsets within a phase, half-open [start, end),
+kept merged so the file stays small however many batches complete.
+
+    checkpoint = SyncCheckpoint.open(checkpoint_path(path, 'neon'),
+                                     snapshot_hash(path), {'batch_size': 50})
+    with SyncPipeline(send, checkpoint=checkpoint) as pipeline:
+        pipeline.run_phase('nodes', node_batches())
+    checkpoint.remove()
+"""
+
+import hashlib
+import json
+import os
+import time
+
+SAVE_INTERVAL = 0.5
+
+
+def snapshot_hash(filepath, chunk_size=1 << 20):
+    """SHA-1 of a snapshot file and its WAL segment, read in chunks
+
+    Pending WAL records are part of the loaded state, so appending one
+    invalidates checkpoints taken before it.
+    """
+    digest = hashlib.sha1()
+    for path in (filepath, f"{filepath}.wal"):
+        if path != filepath and not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def checkpoint_path(snapshot_path, target):
+    """Checkpoint file next to the snapshot, one per sync target"""
+    return f"{snapshot_path}.{target}-checkpoint.json"
+
+
+def _merge_range(ranges, start, end):
+    """Insert [start, end) into a sorted list of disjoint ranges"""
+    merged = []
+    for low, high in ranges:
+        if high < start or low > end:
+            merged.append([low, high])
+        else:
+            start, end = min(start, low), max(end, high)
+    merged.append([start, end])
+    merged.sort()
+    return merged
+
+
+class SyncCheckpoint:
+    """Completed steps and batch row ranges for one snapshot and target"""
+
+    def __init__(self, path, snapshot, settings=None, steps=None, phases=None):
+        self.path = path
+        self.snapshot = snapshot
+        self.settings = settings or {}
+        self.steps = list(steps or [])
+        self.phases = phases or {}
+        self._saved_at = 0.0
+
+    @classmethod
+    def open(cls, path, snapshot, settings=None):
+        """Load the checkpoint at path if it matches snapshot and settings
+
+        A missing, unreadable or mismatched file gives a fresh checkpoint.
+        """
+        settings = settings or {}
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, snapshot, settings)
+        if data.get('snapshot') != snapshot or data.get('settings') != settings:
+            return cls(path, snapshot, settings)
+        return cls(path, snapshot, settings, data.get('steps'), data.get('phases'))
+
+    @property
+    def resumed(self):
+        """True when an earlier run left progress to continue from"""
+        return bool(self.steps or self.phases)
+
+    def has_step(self, step):
+        return step in self.steps
+
+    def mark_step(self, step):
+        """Record a one-off step and save immediately"""
+        if step not in self.steps:
+            self.steps.append(step)
+        self.save()
+
+    def is_done(self, phase, start, end):
+        """True when rows [start, end) of phase were all written"""
+        for low, high in self.phases.get(phase, []):
+            if low <= start and end <= high:
+                return True
+        return False
+
+    def rows_done(self, phase):
+        return sum(high - low for low, high in self.phases.get(phase, []))
+
+    def mark_done(self, phase, start, end):
+        """Record a completed batch; saves at most every SAVE_INTERVAL seconds"""
+        self.phases[phase] = _merge_range(self.phases.get(phase, []), start, end)
+        if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        """Atomically write the checkpoint file"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'snapshot': self.snapshot,
+                'settings': self.settings,
+                'steps': self.steps,
+                'phases': self.phases,
+            }, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._saved_at = time.monotonic()
+
+    def remove(self):
+        """Delete the checkpoint once the sync has finished"""
+        self.steps = []
+        self.phases = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Shared database access for the Skin Zone sync scripts
+One backend object is created per process and reused by every sync step,
+so a run costs a handful of connections or CLI calls rather than one per
+statement
+
+Two backends share the same interface:
+
+    MCPBackend       the Neon MCP server through manus-mcp-cli; statements
+                     are grouped into run_sql_transaction calls
+    PostgresBackend  a direct connection pool (psycopg); any Postgres,
+                     including a local one, can stand in for Neon
+
+get_backend() picks PostgresBackend when NEON_DATABASE_URL or DATABASE_URL
+is set and MCPBackend otherwise.
+
+A statement is either SQL text or a (sql, params) pair with %s
+placeholders. PostgresBackend binds the parameters to a server-side
+prepared statement, with dicts and lists sent as jsonb, so a statement
+shape is parsed and planned once per connection however many batches use
+it. The MCP tools only accept SQL text, so MCPBackend inlines the
+parameters as literals (render_sql).
+"""
+
+import atexit
+import json
+import os
+import queue
+import re
+import subprocess
+import threading
+from contextlib import contextmanager
+
+PROJECT_ID = "damp-brook-31747632"
+DATABASE_NAME = "neondb"
+DSN_ENV_VARS = ('NEON_DATABASE_URL', 'DATABASE_URL')
+DEFAULT_STATEMENTS_PER_CALL = 100
+# The CLI input travels as one argv string, which Linux caps at 128 KiB;
+# half that leaves room for the JSON escaping of quotes in the SQL
+MAX_CALL_BYTES = 64 * 1024
+DEFAULT_POOL_SIZE = 4
+
+TABLES_SQL = """SELECT table_name FROM information_schema.tables
+WHERE table_schema = 'public' ORDER BY table_name"""
+
+
+class DatabaseError(Exception):
+    """A statement or tool call failed"""
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _sized_chunks(statements, size, max_bytes):
+    """Chunks of at most size SQL strings totalling at most max_bytes
+
+    A statement longer than max_bytes on its own gets a chunk to itself.
+    """
+    chunk, total = [], 0
+    for statement in statements:
+        length = len(statement.encode())
+        if chunk and (len(chunk) >= size or total + length > max_bytes):
+            yield chunk
+            chunk, total = [], 0
+        chunk.append(statement)
+        total += length
+    if chunk:
+        yield chunk
+
+
+def sized_batches(rows, size, max_bytes=MAX_CALL_BYTES // 2):
+    """Lists of at most size rows whose SQL literals total at most max_bytes
+
+    For statements that bind a batch of rows as one jsonb parameter: the MCP
+    backend inlines it, so the row count alone does not bound the call size.
+    A row longer than max_bytes on its own gets a batch to itself.
+    """
+    batch, total = [], 0
+    for row in rows:
+        length = len(sql_literal(row).encode())
+        if batch and (len(batch) >= size or total + length > max_bytes):
+            yield batch
+            batch, total = [], 0
+        batch.append(row)
+        total += length
+    if batch:
+        yield batch
+
+
+def sql_literal(value):
+    """Render a parameter value as a SQL literal"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def render_sql(sql, params=None):
+    """Inline params into a %s-placeholder statement (psycopg syntax)"""
+    if params is None:
+        return sql
+    values = iter(params)
+    return re.sub(r'%[s%]', lambda m: '%' if m.group() == '%%' else sql_literal(next(values)), sql)
+
+
+def _statement(statement):
+    """Split a statement into (sql, params); plain SQL has params None"""
+    if isinstance(statement, tuple):
+        return statement
+    return statement, None
+
+
+def render_statement(statement):
+    """SQL text of a statement, with any parameters inlined"""
+    return render_sql(*_statement(statement))
+
+
+class MCPBackend:
+    """Neon through the MCP CLI, with statements grouped per call"""
+
+    name = 'mcp'
+
+    def __init__(self, project_id=PROJECT_ID, database_name=DATABASE_NAME, server='neon',
+                 statements_per_call=DEFAULT_STATEMENTS_PER_CALL):
+        self.project_id = project_id
+        self.database_name = database_name
+        self.server = server
+        self.statements_per_call = statements_per_call
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def call_tool(self, tool_name, params):
+        """Run one MCP tool call and return its stdout"""
+        params = dict(params)
+        params.setdefault('projectId', self.project_id)
+        params.setdefault('databaseName', self.database_name)
+        cmd = [
+            'manus-mcp-cli', 'tool', 'call', tool_name,
+            '--server', self.server,
+            '--input', json.dumps({"params": params})
+        ]
+        with self._calls_lock:
+            self.calls += 1
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        except OSError as e:
+            # E.g. E2BIG when a single statement outgrows the argument limit
+            raise DatabaseError(f"{tool_name} failed: {e}") from e
+        if result.returncode != 0:
+            raise DatabaseError(f"{tool_name} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    def execute(self, sql, params=None):
+        return self.call_tool('run_sql', {'sql': render_sql(sql, params)})
+
+    def query(self, sql, params=None):
+        """Run a query; returns the tool output parsed as JSON when possible"""
+        output = self.execute(sql, params)
+        try:
+            return json.loads(output)
+        except ValueError:
+            return output
+
+    def execute_transaction(self, statements):
+        """Run statements atomically in a single call"""
+        statements = [render_statement(statement) for statement in statements]
+        return self.call_tool('run_sql_transaction', {'sqlStatements': statements})
+
+    def execute_many(self, statements):
+        """Run statements in as few calls as possible
+
+        Each group of up to statements_per_call statements, kept under
+        MAX_CALL_BYTES of SQL, is its own transaction.
+        """
+        rendered = (render_statement(statement) for statement in statements)
+        for group in _sized_chunks(rendered, self.statements_per_call, MAX_CALL_BYTES):
+            self.call_tool('run_sql_transaction', {'sqlStatements': group})
+
+    def list_tables(self):
+        return self.call_tool('get_database_tables', {})
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """Minimal thread-safe pool of lazily opened connections"""
+
+    def __init__(self, connect, max_size=DEFAULT_POOL_SIZE):
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._all = []
+        self.max_size = max_size
+
+    @property
+    def opened(self):
+        return len(self._all)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is rolled back on error and returned"""
+        self._slots.acquire()
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+                with self._lock:
+                    self._all.append(conn)
+            try:
+                yield conn
+            except BaseException:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+        finally:
+            if conn is not None:
+                if conn.closed:
+                    with self._lock:
+                        self._all.remove(conn)
+                else:
+                    self._idle.put(conn)
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+
+class PostgresBackend:
+    """Direct Postgres access through a small psycopg connection pool"""
+
+    name = 'postgres'
+
+    def __init__(self, dsn, pool_size=DEFAULT_POOL_SIZE,
+                 statements_per_call=DEFAULT_STATEMENTS_PER_CALL):
+        try:
+            import psycopg
+        except ImportError as e:
+            raise ImportError("PostgresBackend requires psycopg (pip install 'psycopg[binary]')") from e
+        self.dsn = dsn
+        self.statements_per_call = statements_per_call
+        from psycopg.types.json import Jsonb
+        self.pool = ConnectionPool(lambda: psycopg.connect(dsn), pool_size)
+        self._driver_error = psycopg.Error
+        self._jsonb = Jsonb
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled psycopg connection; driver errors become DatabaseError"""
+        try:
+            with self.pool.connection() as conn:
+                yield conn
+        except self._driver_error as e:
+            raise DatabaseError(str(e)) from e
+
+    def _run(self, conn, statement):
+        sql, params = _statement(statement)
+        if params is None:
+            return conn.execute(sql)
+        params = [self._jsonb(p) if isinstance(p, (dict, list)) else p for p in params]
+        return conn.execute(sql, params, prepare=True)
+
+    def execute(self, sql, params=None):
+        with self.connection() as conn:
+            self._run(conn, (sql, params))
+            conn.commit()
+
+    def query(self, sql, params=None):
+        with self.connection() as conn:
+            rows = self._run(conn, (sql, params)).fetchall()
+            conn.commit()
+            return rows
+
+    def execute_transaction(self, statements):
+        with self.connection() as conn:
+            for statement in statements:
+                self._run(conn, statement)
+            conn.commit()
+
+    def execute_many(self, statements):
+        with self.connection() as conn:
+            for group in _chunks(list(statements), self.statements_per_call):
+                for statement in group:
+                    self._run(conn, statement)
+                conn.commit()
+
+    def list_tables(self):
+        return [row[0] for row in self.query(TABLES_SQL)]
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def database_url():
+    """Return the direct connection string from the environment, if any"""
+    for var in DSN_ENV_VARS:
+        if os.environ.get(var):
+            return os.environ[var]
+    return None
+
+
+def create_backend(kind=None, dsn=None, **kwargs):
+    """Create a backend; kind is 'mcp', 'postgres' or None to auto-detect"""
+    dsn = dsn or database_url()
+    if kind is None:
+        kind = 'postgres' if dsn else 'mcp'
+    if kind == 'postgres':
+        if not dsn:
+            raise ValueError(f"Set one of {', '.join(DSN_ENV_VARS)} for the postgres backend")
+        return PostgresBackend(dsn, **kwargs)
+    if kind == 'mcp':
+        return MCPBackend(**kwargs)
+    raise ValueError(f"Unknown database backend: {kind}")
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the process-wide backend, creating it on first use"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = create_backend()
+            atexit.register(close_backend)
+        return _shared
+
+
+def close_backend():
+    """Close the process-wide backend and its connections"""
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Content-hash diff between a hypergraph snapshot and the last synced state
+Every node and edge is encoded into the row the database stores and
+hashed; comparing those hashes with the ones recorded after the previous
+sync yields only the rows to INSERT, UPDATE or DELETE, so a sync costs
+time proportional to the churn rather than to the size of the graph
+
+Edges are identified by their (source, target, type) triple.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+
+NODE_CORE_FIELDS = ('id', 'type', 'name')
+EDGE_CORE_FIELDS = ('source', 'target', 'type', 'weight', 'metadata')
+DEFAULT_WEIGHT = 1.0
+# Fixed namespace for edge_id(); changing it changes every edge id
+EDGE_ID_NAMESPACE = uuid.UUID('63c21b7c-87b8-454c-8831-d776bb1fe91a')
+
+
+def node_row(node):
+    """Encode a node as its nodes-table row; non-core fields go to metadata"""
+    return {
+        'id': node['id'],
+        'type': node['type'],
+        'name': node['name'],
+        'metadata': {k: v for k, v in node.items() if k not in NODE_CORE_FIELDS},
+    }
+
+
+def edge_row(edge):
+    """Encode an edge as its edges-table row
+
+    Edges carry extra attributes either in a 'metadata' dict or as flat
+    fields (price_per_kg_usd, availability, ...); both end up in the
+    metadata column so neither form is dropped.
+    """
+    metadata = dict(edge.get('metadata') or {})
+    for k, v in edge.items():
+        if k not in EDGE_CORE_FIELDS:
+            metadata[k] = v
+    weight = edge.get('weight', DEFAULT_WEIGHT)
+    return {
+        'source': edge['source'],
+        'target': edge['target'],
+        'type': edge['type'],
+        'metadata': metadata,
+        'weight': DEFAULT_WEIGHT if weight is None else float(weight),
+    }
+
+
+def row_hash(row):
+    """Stable content hash of an encoded row"""
+    text = json.dumps(row, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]
+
+
+def edge_state_key(source, target, edge_type):
+    """Flatten an edge triple into a string usable as a JSON object key"""
+    return f"{source}\t{target}\t{edge_type}"
+
+
+def split_edge_state_key(key):
+    return tuple(key.split('\t'))
+
+
+def edge_id(source, target, edge_type):
+    """Deterministic UUID for the edges.id column of an edge triple
+
+    Inserting edges with this id as an upsert makes the write idempotent:
+    a retried or resumed batch updates its rows instead of duplicating them.
+    """
+    return str(uuid.uuid5(EDGE_ID_NAMESPACE, edge_state_key(source, target, edge_type)))
+
+
+class SyncState:
+    """Row hashes recorded after the last successful sync to one database"""
+
+    def __init__(self, nodes=None, edges=None, synced_at=None, snapshot_version=None):
+        self.nodes = nodes or {}
+        self.edges = edges or {}
+        self.synced_at = synced_at
+        self.snapshot_version = snapshot_version
+
+    @property
+    def is_empty(self):
+        return not self.nodes and not self.edges
+
+    @classmethod
+    def load(cls, filepath):
+        """Load a state file; a missing file gives an empty state"""
+        if not os.path.exists(filepath):
+            return cls()
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        return cls(data.get('nodes'), data.get('edges'),
+                   data.get('synced_at'), data.get('snapshot_version'))
+
+    def save(self, filepath):
+        """Atomically write the state file"""
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'synced_at': self.synced_at,
+                'snapshot_version': self.snapshot_version,
+                'nodes': self.nodes,
+                'edges': self.edges,
+            }, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+
+
+class SyncDiff:
+    """Rows to send to bring the database from one SyncState to the next"""
+
+    def __init__(self):
+        self.node_inserts = []
+        self.node_updates = []
+        self.node_deletes = []
+        self.edge_inserts = []
+        self.edge_updates = []
+        self.edge_deletes = []
+        self.node_hashes = {}
+        self.edge_hashes = {}
+
+    @property
+    def is_empty(self):
+        return not (self.node_inserts or self.node_updates or self.node_deletes
+                    or self.edge_inserts or self.edge_updates or self.edge_deletes)
+
+    def summary(self):
+        return {
+            'nodes_inserted': len(self.node_inserts),
+            'nodes_updated': len(self.node_updates),
+            'nodes_deleted': len(self.node_deletes),
+            'edges_inserted': len(self.edge_inserts),
+            'edges_updated': len(self.edge_updates),
+            'edges_deleted': len(self.edge_deletes),
+        }
+
+    def next_state(self, snapshot_version=None):
+        """The SyncState to record once this diff has been applied"""
+        return SyncState(self.node_hashes, self.edge_hashes,
+                         datetime.now().isoformat(), snapshot_version)
+
+
+def compute_diff(nodes, edges, state):
+    """Diff node and edge dicts against a SyncState
+
+    Deleted nodes are not repeated as edge deletes when the node delete
+    already cascades to the edge.
+    """
+    diff = SyncDiff()
+    old_nodes = state.nodes
+    old_edges = state.edges
+
+    for node in nodes:
+        row = node_row(node)
+        digest = row_hash(row)
+        diff.node_hashes[row['id']] = digest
+        previous = old_nodes.get(row['id'])
+        if previous is None:
+            diff.node_inserts.append(row)
+        elif previous != digest:
+            diff.node_updates.append(row)
+
+    for node_id in old_nodes:
+        if node_id not in diff.node_hashes:
+            diff.node_deletes.append(node_id)
+    deleted_nodes = set(diff.node_deletes)
+
+    for edge in edges:
+        row = edge_row(edge)
+        key = edge_state_key(row['source'], row['target'], row['type'])
+        digest = row_hash(row)
+        diff.edge_hashes[key] = digest
+        previous = old_edges.get(key)
+        if previous is None:
+            diff.edge_inserts.append(row)
+        elif previous != digest:
+            diff.edge_updates.append(row)
+
+    for key in old_edges:
+        if key not in diff.edge_hashes:
+            source, target, edge_type = split_edge_state_key(key)
+            if source not in deleted_nodes and target not in deleted_nodes:
+                diff.edge_deletes.append((source, target, edge_type))
+
+    return diff
+
+
+# SQL generation (PostgreSQL). Each builder returns a (sql, params) statement
+# whose rows travel as one jsonb parameter, so the SQL text is the same for
+# every batch and values are never spliced into it (see hypergraph_db)
+
+NODE_ROWS = "jsonb_to_recordset(%s::jsonb) AS v(id TEXT, type TEXT, name TEXT, metadata JSONB)"
+EDGE_ROWS = ("jsonb_to_recordset(%s::jsonb) "
+             "AS v(source TEXT, target TEXT, type TEXT, metadata JSONB, weight FLOAT)")
+EDGE_KEYS = "jsonb_to_recordset(%s::jsonb) AS v(source TEXT, target TEXT, type TEXT)"
+NODE_IDS = "jsonb_array_elements_text(%s::jsonb) AS v(id)"
+
+NODE_UPSERT = f"""INSERT INTO nodes (id, type, name, metadata)
+SELECT v.id, v.type, v.name, v.metadata FROM {NODE_ROWS}
+ON CONFLICT (id) DO UPDATE
+SET type = EXCLUDED.type,
+    name = EXCLUDED.name,
+    metadata = EXCLUDED.metadata,
+    updated_at = NOW();"""
+
+NODE_DELETE = f"DELETE FROM nodes n USING {NODE_IDS} WHERE n.id = v.id;"
+
+# edges has no unique constraint on the triple, so guard with NOT EXISTS
+# to keep re-running an interrupted sync idempotent
+EDGE_INSERT = f"""INSERT INTO edges (source, target, type, metadata, weight)
+SELECT v.source, v.target, v.type, v.metadata, v.weight
+FROM {EDGE_ROWS}
+WHERE NOT EXISTS (
+    SELECT 1 FROM edges e
+    WHERE e.source = v.source AND e.target = v.target AND e.type = v.type
+);"""
+
+EDGE_UPDATE = f"""UPDATE edges e
+SET metadata = v.metadata, weight = v.weight, updated_at = NOW()
+FROM {EDGE_ROWS}
+WHERE e.source = v.source AND e.target = v.target AND e.type = v.type;"""
+
+EDGE_DELETE = f"""DELETE FROM edges e
+USING {EDGE_KEYS}
+WHERE e.source = v.source AND e.target = v.target AND e.type = v.type;"""
+
+RECONCILE_DUPLICATE_EDGES = """DELETE FROM edges a
+USING edges b
+WHERE a.source = b.source AND a.target = b.target AND a.type = b.type
+  AND a.ctid > b.ctid;"""
+
+# Reconcile stages the snapshot's node ids and edge keys in a scratch table,
+# a chunk per statement, and deletes with an anti-join against it. Passing
+# every key as one parameter would not fit in a single MCP call. The table
+# is a regular (unlogged) one because each MCP call is a new session.
+RECONCILE_BATCH_SIZE = 200
+
+RECONCILE_CREATE = "CREATE UNLOGGED TABLE {table} (id TEXT, source TEXT, target TEXT, type TEXT);"
+
+RECONCILE_STAGE_NODES = f"INSERT INTO {{table}} (id) SELECT v.id FROM {NODE_IDS};"
+
+RECONCILE_STAGE_EDGES = (f"INSERT INTO {{table}} (source, target, type) "
+                         f"SELECT v.source, v.target, v.type FROM {EDGE_KEYS};")
+
+RECONCILE_NODES = """DELETE FROM nodes n
+WHERE NOT EXISTS (SELECT 1 FROM {table} k WHERE k.id = n.id);"""
+
+RECONCILE_EDGES = """DELETE FROM edges e
+WHERE NOT EXISTS (
+    SELECT 1 FROM {table} k
+    WHERE k.source = e.source AND k.target = e.target AND k.type = e.type
+);"""
+
+RECONCILE_DROP = "DROP TABLE IF EXISTS {table};"
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _edge_keys(keys):
+    return [{'source': s, 'target': t, 'type': k} for s, t, k in keys]
+
+
+def node_upsert_sql(rows):
+    """Upsert node_row() dicts"""
+    return NODE_UPSERT, (list(rows),)
+
+
+def node_delete_sql(node_ids):
+    return NODE_DELETE, (list(node_ids),)
+
+
+def edge_insert_sql(rows):
+    """Insert edge_row() dicts whose triple is not stored yet"""
+    return EDGE_INSERT, (list(rows),)
+
+
+def edge_update_sql(rows):
+    return EDGE_UPDATE, (list(rows),)
+
+
+def edge_delete_sql(keys):
+    """Delete edges by (source, target, type) triple"""
+    return EDGE_DELETE, (_edge_keys(keys),)
+
+
+def diff_operations(diff, reconcile=False):
+    """Return [(operation, items)] applying the diff in dependency order
+
+    Nodes are upserted before edges that may reference them, and node
+    deletes come last so their cascades never race an edge statement.
+    With reconcile=True (first sync, no recorded state) inserted edges are
+    also updated, in case a matching row already existed. Operations are
+    the batch methods every sync driver implements.
+    """
+    edge_updates = diff.edge_updates + diff.edge_inserts if reconcile else diff.edge_updates
+    return [
+        ('upsert_nodes', diff.node_inserts + diff.node_updates),
+        ('delete_edges', diff.edge_deletes),
+        ('insert_edges', diff.edge_inserts),
+        ('update_edges', edge_updates),
+        ('delete_nodes', diff.node_deletes),
+    ]
+
+
+OPERATION_SQL = {
+    'upsert_nodes': node_upsert_sql,
+    'delete_edges': edge_delete_sql,
+    'insert_edges': edge_insert_sql,
+    'update_edges': edge_update_sql,
+    'delete_nodes': node_delete_sql,
+}
+
+
+def operation_label(operation, count):
+    """'upsert_nodes', 3 -> 'upsert 3 nodes'"""
+    verb, noun = operation.split('_')
+    return f"{verb} {count} {noun}"
+
+
+def diff_statements(diff, batch_size=100, reconcile=False):
+    """Return [(label, statement)] applying the diff in dependency order
+
+    See diff_operations() for the order. With reconcile=True the deletes
+    from reconcile_statements() must have run first.
+    """
+    statements = []
+    for operation, items in diff_operations(diff, reconcile):
+        for batch in _chunks(items, batch_size):
+            statements.append((operation_label(operation, len(batch)), OPERATION_SQL[operation](batch)))
+    return statements
+
+
+def reconcile_statements(diff, table, batch_size=RECONCILE_BATCH_SIZE):
+    """Statements that make an unknown database match the snapshot exactly
+
+    Used on the first incremental sync, when there is no recorded state:
+    rows the snapshot does not contain and duplicate edges left by earlier
+    full reloads are deleted. Rows that match are left in place, so
+    metrics and recommendations referencing them survive.
+
+    Returns (stage, apply, drop): stage creates the scratch table and fills
+    it in batches and may span several calls, apply is the delete
+    transaction, and drop removes the table again.
+    """
+    stage = [RECONCILE_CREATE.format(table=table)]
+    for batch in _chunks(list(diff.node_hashes), batch_size):
+        stage.append((RECONCILE_STAGE_NODES.format(table=table), (batch,)))
+    edge_keys = _edge_keys(map(split_edge_state_key, diff.edge_hashes))
+    for batch in _chunks(edge_keys, batch_size):
+        stage.append((RECONCILE_STAGE_EDGES.format(table=table), (batch,)))
+
+    apply = [RECONCILE_DUPLICATE_EDGES]
+    if diff.node_hashes:
+        apply.append(RECONCILE_NODES.format(table=table))
+    if diff.edge_hashes:
+        apply.append(RECONCILE_EDGES.format(table=table))
+    return stage, apply, RECONCILE_DROP.format(table=table)
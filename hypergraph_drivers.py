@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Sync target drivers for the Skin Zone hypergraph
+Every target stores the same rows (hypergraph_diff.node_row/edge_row) and
+exposes the same batch operations, so batching, diffing, retries and
+checkpointing live once in sync_hypergraph.py and apply to all of them:
+
+    upsert_nodes(rows)   insert_edges(rows)   update_edges(rows)
+    delete_nodes(ids)    delete_edges(keys)   reconcile(diff)
+
+Edge keys are (source, target, type) triples. reconcile(diff) is called
+before the first sync to a target with no recorded state and removes
+whatever the snapshot does not contain.
+
+Drivers:
+    mcp       Neon through the MCP CLI (hypergraph_db.MCPBackend)
+    postgres  any Postgres over a direct connection, e.g. Neon or local
+    neon      postgres when NEON_DATABASE_URL/DATABASE_URL is set, else mcp
+    supabase  the Supabase REST API (supabase-py)
+    sqlite    a local SQLite file, handy for tests and benchmarks
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+from hypergraph_db import DatabaseError, create_backend
+from hypergraph_diff import OPERATION_SQL, edge_id, reconcile_statements, split_edge_state_key
+
+DEFAULT_SQLITE_PATH = 'hypergraph.db'
+
+COUNT_SQL = "SELECT (SELECT COUNT(*) FROM nodes) AS nodes, (SELECT COUNT(*) FROM edges) AS edges;"
+
+
+def _first_row(result):
+    """First row of a query result from either database backend
+
+    psycopg returns a list of tuples; the MCP tools return JSON, either
+    row objects or nested lists depending on the tool.
+    """
+    while isinstance(result, (list, tuple)) and result and isinstance(result[0], (list, tuple, dict)):
+        result = result[0]
+    if isinstance(result, dict):
+        return tuple(result.values())
+    return tuple(result)
+
+
+class SQLDriver:
+    """Neon or any Postgres through a hypergraph_db backend"""
+
+    state_name = 'neon'
+    reconcile_keeps_edges = True
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+
+    def prepare(self):
+        self.backend.list_tables()
+
+    def statement(self, operation, items):
+        return OPERATION_SQL[operation](items)
+
+    def _run(self, operation, items):
+        self.backend.execute_transaction([self.statement(operation, items)])
+
+    def upsert_nodes(self, rows):
+        self._run('upsert_nodes', rows)
+
+    def delete_nodes(self, node_ids):
+        self._run('delete_nodes', node_ids)
+
+    def insert_edges(self, rows):
+        self._run('insert_edges', rows)
+
+    def update_edges(self, rows):
+        self._run('update_edges', rows)
+
+    def delete_edges(self, keys):
+        self._run('delete_edges', keys)
+
+    def reconcile(self, diff):
+        table = f"reconcile_keys_{uuid.uuid4().hex[:12]}"
+        stage, apply, drop = reconcile_statements(diff, table)
+        try:
+            self.backend.execute_many(stage)
+            self.backend.execute_transaction(apply)
+        finally:
+            self.backend.execute(drop)
+
+    def counts(self):
+        return _first_row(self.backend.query(COUNT_SQL))
+
+    def close(self):
+        self.backend.close()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    metadata TEXT DEFAULT '{}',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(type);
+CREATE TABLE IF NOT EXISTS edges (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL REFERENCES nodes(id) ON DELETE CASCADE,
+    target TEXT NOT NULL REFERENCES nodes(id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    metadata TEXT DEFAULT '{}',
+    weight REAL DEFAULT 1.0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_edges_key ON edges(source, target, type);
+CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target);
+"""
+
+
+class SQLiteDriver:
+    """A local SQLite file with the same nodes/edges layout (JSON as text)"""
+
+    name = 'sqlite'
+    state_name = 'sqlite'
+    reconcile_keeps_edges = True
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        # One connection shared by the pipeline threads; SQLite serialises writes anyway
+        self.lock = threading.Lock()
+
+    def _executemany(self, sql, params):
+        with self.lock, self.conn:
+            self.conn.executemany(sql, params)
+
+    def prepare(self):
+        with self.lock:
+            self.conn.executescript(SQLITE_SCHEMA)
+
+    def upsert_nodes(self, rows):
+        self._executemany(
+            """INSERT INTO nodes (id, type, name, metadata) VALUES (?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET type = excluded.type, name = excluded.name,
+                metadata = excluded.metadata, updated_at = CURRENT_TIMESTAMP""",
+            [(r['id'], r['type'], r['name'], json.dumps(r['metadata'])) for r in rows])
+
+    def delete_nodes(self, node_ids):
+        self._executemany("DELETE FROM nodes WHERE id = ?", [(i,) for i in node_ids])
+
+    def insert_edges(self, rows):
+        self._executemany(
+            """INSERT INTO edges (source, target, type, metadata, weight)
+            SELECT ?1, ?2, ?3, ?4, ?5
+            WHERE NOT EXISTS (SELECT 1 FROM edges WHERE source = ?1 AND target = ?2 AND type = ?3)""",
+            [(r['source'], r['target'], r['type'], json.dumps(r['metadata']), r['weight'])
+             for r in rows])
+
+    def update_edges(self, rows):
+        self._executemany(
+            """UPDATE edges SET metadata = ?, weight = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE source = ? AND target = ? AND type = ?""",
+            [(json.dumps(r['metadata']), r['weight'], r['source'], r['target'], r['type'])
+             for r in rows])
+
+    def delete_edges(self, keys):
+        self._executemany("DELETE FROM edges WHERE source = ? AND target = ? AND type = ?", keys)
+
+    def reconcile(self, diff):
+        with self.lock, self.conn:
+            cur = self.conn.cursor()
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS keep_nodes (id TEXT PRIMARY KEY)")
+            cur.execute("""CREATE TEMP TABLE IF NOT EXISTS keep_edges (
+                source TEXT, target TEXT, type TEXT, PRIMARY KEY (source, target, type))""")
+            cur.execute("DELETE FROM keep_nodes")
+            cur.execute("DELETE FROM keep_edges")
+            cur.executemany("INSERT INTO keep_nodes VALUES (?)", [(i,) for i in diff.node_hashes])
+            cur.executemany("INSERT OR IGNORE INTO keep_edges VALUES (?, ?, ?)",
+                            map(split_edge_state_key, diff.edge_hashes))
+            cur.execute("""DELETE FROM edges WHERE id NOT IN (
+                SELECT MIN(id) FROM edges GROUP BY source, target, type)""")
+            cur.execute("DELETE FROM nodes WHERE id NOT IN (SELECT id FROM keep_nodes)")
+            cur.execute("""DELETE FROM edges WHERE NOT EXISTS (
+                SELECT 1 FROM keep_edges k
+                WHERE k.source = edges.source AND k.target = edges.target AND k.type = edges.type)""")
+
+    def counts(self):
+        with self.lock:
+            return self.conn.execute(COUNT_SQL.rstrip(';')).fetchone()
+
+    def close(self):
+        self.conn.close()
+
+
+class SupabaseDriver:
+    """Supabase through its REST API (PostgREST filters, no raw SQL)
+
+    Edges are written with their deterministic edge_id() as the primary
+    key, so updates are bulk upserts and deletes are one id=in.(...)
+    filter per batch.
+    """
+
+    name = 'supabase'
+    state_name = 'supabase'
+    # insert_edges already upserts, so inserted edges need no second update
+    reconcile_keeps_edges = False
+    PAGE_SIZE = 1000
+    DELETE_BATCH_SIZE = 100
+
+    def __init__(self, url=None, key=None):
+        try:
+            from supabase import create_client
+        except ImportError as e:
+            raise ImportError("The supabase target requires supabase-py (pip install supabase)") from e
+        url = url or os.environ.get("SUPABASE_URL")
+        key = key or os.environ.get("SUPABASE_KEY")
+        if not url or not key:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
+        self.client = create_client(url, key)
+
+    @staticmethod
+    def _execute(query):
+        """Run a request; API and transport errors become DatabaseError"""
+        try:
+            return query.execute()
+        except Exception as e:
+            raise DatabaseError(str(e)) from e
+
+    def _ids(self, table):
+        """Every id in a table, read a page at a time"""
+        ids, start = [], 0
+        while True:
+            query = self.client.table(table).select('id').order('id')
+            page = self._execute(query.range(start, start + self.PAGE_SIZE - 1)).data
+            ids.extend(row['id'] for row in page)
+            if len(page) < self.PAGE_SIZE:
+                return ids
+            start += self.PAGE_SIZE
+
+    def _delete_ids(self, table, ids):
+        ids = list(ids)
+        for i in range(0, len(ids), self.DELETE_BATCH_SIZE):
+            self._execute(self.client.table(table).delete().in_('id', ids[i:i + self.DELETE_BATCH_SIZE]))
+
+    def prepare(self):
+        self._execute(self.client.table('nodes').select('id').limit(1))
+
+    def upsert_nodes(self, rows):
+        self._execute(self.client.table('nodes').upsert(rows))
+
+    def delete_nodes(self, node_ids):
+        self._delete_ids('nodes', node_ids)
+
+    def insert_edges(self, rows):
+        # Upsert on a deterministic id, so a retried batch cannot duplicate edges
+        rows = [dict(r, id=edge_id(r['source'], r['target'], r['type'])) for r in rows]
+        self._execute(self.client.table('edges').upsert(rows))
+
+    def update_edges(self, rows):
+        # The full row is sent, so updating is the same upsert on edge_id()
+        self.insert_edges(rows)
+
+    def delete_edges(self, keys):
+        self._delete_ids('edges', [edge_id(*key) for key in keys])
+
+    def reconcile(self, diff):
+        """Delete the edges and nodes the snapshot does not contain
+
+        Edges stored under any other id than their edge_id() (rows from
+        older full loads, duplicate triples) are deleted too; the diff then
+        reinserts the ones the snapshot has.
+        """
+        keep_edges = {edge_id(*split_edge_state_key(key)) for key in diff.edge_hashes}
+        self._delete_ids('edges', [i for i in self._ids('edges') if i not in keep_edges])
+        self._delete_ids('nodes', [i for i in self._ids('nodes') if i not in diff.node_hashes])
+
+    def counts(self):
+        return tuple(self._execute(self.client.table(table).select('id', count='exact').limit(1)).count
+                     for table in ('nodes', 'edges'))
+
+    def close(self):
+        pass
+
+
+TARGETS = ('neon', 'mcp', 'postgres', 'supabase', 'sqlite')
+
+
+def create_driver(target, database=None):
+    """Create the driver for a target name (see TARGETS)
+
+    database is the DSN for postgres or the file for sqlite.
+    """
+    if target == 'mcp':
+        return SQLDriver(create_backend('mcp'))
+    if target in ('neon', 'postgres'):
+        return SQLDriver(create_backend(None if target == 'neon' else 'postgres', dsn=database))
+    if target == 'supabase':
+        return SupabaseDriver()
+    if target == 'sqlite':
+        return SQLiteDriver(database or DEFAULT_SQLITE_PATH)
+    raise ValueError(f"Unknown sync target: {target}")
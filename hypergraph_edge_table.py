@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped edge table for read-only Skin Zone hypergraph queries
+Only source, target, type and weight are kept, as fixed-width columns of
+integer node indices, integer type codes and float32 weights. Readers mmap
+the file, so any number of worker processes share one copy of the edges
+through the page cache with zero-copy reads
+
+File layout (little-endian, columns 8-byte aligned):
+
+    header   '<4sIIIIQQ': magic b'HGE1', format version, node count,
+             edge count, type count, byte offset and length of the names
+             section
+    source   uint32[edges]   index into the node id list
+    target   uint32[edges]   index into the node id list
+    type     uint32[edges]   index into the edge type list
+    weight   float32[edges]  edge 'weight', 1.0 when the edge has none
+    names    JSON {"node_ids": [...], "edge_types": [...]}
+
+Edges whose source or target is not a node in the snapshot are left out of
+the table (run the validator to find them).
+
+Usage:
+    python3 hypergraph_edge_table.py build hypergraph_data.json hypergraph_edges.bin
+    python3 hypergraph_edge_table.py info hypergraph_edges.bin
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections import Counter
+
+MAGIC = b'HGE1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIIIIQQ')
+DEFAULT_WEIGHT = 1.0
+
+if sys.byteorder != 'little':
+    raise ImportError("hypergraph_edge_table requires a little-endian platform")
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _read_snapshot_columns(snapshot_path):
+    """Return (node_ids, edges) where edges yields (source, target, type, weight)"""
+    if snapshot_path.endswith('.hgb'):
+        from hypergraph_binary import BinarySnapshot
+
+        with open(snapshot_path, 'rb') as f:
+            snapshot = BinarySnapshot(f.read())
+        strings = snapshot.strings
+        node_ids = [strings[i] for i in snapshot.node_id]
+
+        def edges():
+            for i, (s, t, k, w) in enumerate(zip(snapshot.edge_source, snapshot.edge_target,
+                                                 snapshot.edge_type, snapshot.edge_weight)):
+                if w != w:
+                    blob = snapshot.edge_blob(i)
+                    w = json.loads(blob).get('weight', DEFAULT_WEIGHT) if b'"weight"' in blob else DEFAULT_WEIGHT
+                yield strings[s], strings[t], strings[k], w
+
+        return node_ids, edges()
+
+    with open(snapshot_path, 'r') as f:
+        data = json.load(f)
+    node_ids = [node['id'] for node in data['nodes']]
+    edges = ((e['source'], e['target'], e['type'], e.get('weight', DEFAULT_WEIGHT))
+             for e in data['edges'])
+    return node_ids, edges
+
+
+def build_edge_table(node_ids, edges, filepath):
+    """Write an edge table file; return the number of edges skipped as dangling"""
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+    type_index = {}
+    sources = array('I')
+    targets = array('I')
+    types = array('I')
+    weights = array('f')
+    skipped = 0
+
+    for source, target, edge_type, weight in edges:
+        s = node_index.get(source)
+        t = node_index.get(target)
+        if s is None or t is None:
+            skipped += 1
+            continue
+        k = type_index.get(edge_type)
+        if k is None:
+            k = type_index[edge_type] = len(type_index)
+        sources.append(s)
+        targets.append(t)
+        types.append(k)
+        weights.append(DEFAULT_WEIGHT if weight is None else float(weight))
+
+    n_edges = len(sources)
+    names = json.dumps({'node_ids': list(node_ids), 'edge_types': list(type_index)},
+                       separators=(',', ':')).encode('utf-8')
+    column_bytes = _align(4 * n_edges)
+    names_offset = _align(HEADER.size) + 4 * column_bytes
+
+    with open(filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(node_ids), n_edges, len(type_index),
+                            names_offset, len(names)))
+        f.write(b'\0' * (_align(HEADER.size) - HEADER.size))
+        for column in (sources, targets, types, weights):
+            data = column.tobytes()
+            f.write(data)
+            f.write(b'\0' * (column_bytes - len(data)))
+        f.write(names)
+    return skipped
+
+
+def build_from_snapshot(snapshot_path, filepath):
+    """Build an edge table from a .json or .hgb hypergraph snapshot"""
+    node_ids, edges = _read_snapshot_columns(snapshot_path)
+    return build_edge_table(node_ids, edges, filepath)
+
+
+class EdgeTable:
+    """Read-only, memory-mapped view of an edge table file
+
+    sources, targets, types and weights are memoryviews straight over the
+    mapped file (typecodes 'I', 'I', 'I', 'f'); nothing is copied or parsed
+    until node_ids / edge_types are first used.
+    """
+
+    def __init__(self, filepath):
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = view = memoryview(self._mmap)
+        (magic, version, self.node_count, self.edge_count, self.type_count,
+         self._names_offset, self._names_len) = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("Not a hypergraph edge table")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported edge table format version: {version}")
+
+        pos = _align(HEADER.size)
+        column_bytes = _align(4 * self.edge_count)
+        n = self.edge_count
+        self.sources = view[pos:pos + 4 * n].cast('I')
+        pos += column_bytes
+        self.targets = view[pos:pos + 4 * n].cast('I')
+        pos += column_bytes
+        self.types = view[pos:pos + 4 * n].cast('I')
+        pos += column_bytes
+        self.weights = view[pos:pos + 4 * n].cast('f')
+        self._names = None
+        self._node_index = None
+
+    def _load_names(self):
+        if self._names is None:
+            start = self._names_offset
+            self._names = json.loads(self._mmap[start:start + self._names_len])
+        return self._names
+
+    @property
+    def node_ids(self):
+        return self._load_names()['node_ids']
+
+    @property
+    def edge_types(self):
+        return self._load_names()['edge_types']
+
+    def node_index(self, node_id):
+        """Return the integer index of a node id, or None"""
+        if self._node_index is None:
+            self._node_index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        return self._node_index.get(node_id)
+
+    def type_code(self, edge_type):
+        """Return the integer code of an edge type, or None"""
+        try:
+            return self.edge_types.index(edge_type)
+        except ValueError:
+            return None
+
+    def __len__(self):
+        return self.edge_count
+
+    def edge(self, i):
+        """Return edge i as (source index, target index, type code, weight)"""
+        return self.sources[i], self.targets[i], self.types[i], self.weights[i]
+
+    def __iter__(self):
+        return zip(self.sources, self.targets, self.types, self.weights)
+
+    def type_counts(self):
+        """Return {edge type: edge count}"""
+        names = self.edge_types
+        return {names[k]: count for k, count in Counter(self.types).items()}
+
+    def degrees(self):
+        """Return an array of total (in + out) degree per node index"""
+        degree = array('I', bytes(4 * self.node_count))
+        for s in self.sources:
+            degree[s] += 1
+        for t in self.targets:
+            degree[t] += 1
+        return degree
+
+    def close(self):
+        for name in ('sources', 'targets', 'types', 'weights', '_view'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory-mapped hypergraph edge table tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='Build an edge table from a .json or .hgb snapshot')
+    build.add_argument('snapshot')
+    build.add_argument('dest')
+    info = sub.add_parser('info', help='Summarize an edge table')
+    info.add_argument('table')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        skipped = build_from_snapshot(args.snapshot, args.dest)
+        with EdgeTable(args.dest) as table:
+            print(f"✓ Wrote {args.dest} ({table.node_count} nodes, {table.edge_count} edges)")
+        if skipped:
+            print(f"  Skipped {skipped} edges with a missing source or target node")
+    else:
+        with EdgeTable(args.table) as table:
+            print(f"Nodes: {table.node_count}")
+            print(f"Edges: {table.edge_count}")
+            for edge_type, count in sorted(table.type_counts().items(), key=lambda kv: -kv[1]):
+                print(f"  {edge_type}: {count}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
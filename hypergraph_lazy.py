@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Lazy node and edge records over a binary (.hgb) hypergraph snapshot
+Only the identity fields (node id/type/name, edge source/target/type and
+weight) are materialized at load time. Every other field stays as raw JSON
+bytes in the snapshot and is decoded on first access, through an LRU cache
+so hot nodes are not decoded repeatedly
+
+Graph-wide passes that only look at ids, types and names (degree and
+type-mix metrics, batch builders keyed on id) never pay for parsing
+pricing_tiers, features, services, discount_codes and the like.
+"""
+
+import json
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from hypergraph_binary import ABSENT, BinarySnapshot, gc_paused
+from hypergraph_store import HypergraphStore
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class BlobCache:
+    """LRU cache of decoded blobs keyed by (kind, position)"""
+
+    def __init__(self, snapshot, max_size=DEFAULT_CACHE_SIZE):
+        self.snapshot = snapshot
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, index):
+        key = (kind, index)
+        extra = self._cache.get(key)
+        if extra is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return extra
+        self.misses += 1
+        extra = self.decode(kind, index)
+        self._cache[key] = extra
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return extra
+
+    def decode(self, kind, index):
+        """Decode a blob without caching it; the result is not shared"""
+        blob = self.snapshot.node_blob(index) if kind == 'node' else self.snapshot.edge_blob(index)
+        return json.loads(blob)
+
+
+_UNSET = object()
+
+
+class LazyRecord(MutableMapping):
+    """Dict-like record whose non-identity fields decode on first access
+
+    Identity fields live in __slots__ (CORE_FIELDS); a core value the
+    snapshot could not slot (an int or null weight, a missing name) stays
+    in the extras and is read from there. Cached extras are shared, so the
+    first write, or the first read of a dict or list value that could be
+    edited in place, decodes a private copy; after that the record no
+    longer touches the snapshot.
+    """
+
+    __slots__ = ('_cache', '_index', '_extra')
+    KIND = None
+    CORE_FIELDS = ()
+
+    def _extras(self):
+        if self._extra is not None:
+            return self._extra
+        return self._cache.get(self.KIND, self._index)
+
+    def _materialize(self):
+        if self._extra is None:
+            # Decoded afresh, so nested values are not shared with the cache
+            self._extra = self._cache.decode(self.KIND, self._index)
+        return self._extra
+
+    def _extra_value(self, value, key):
+        if self._extra is None and isinstance(value, (dict, list)):
+            return self._materialize()[key]
+        return value
+
+    def _core_items(self):
+        for field in self.CORE_FIELDS:
+            value = getattr(self, field)
+            if value is not _UNSET:
+                yield field, value
+
+    @property
+    def is_decoded(self):
+        """True once the extra fields were copied into this record"""
+        return self._extra is not None
+
+    def __getitem__(self, key):
+        if key in self.CORE_FIELDS:
+            value = getattr(self, key)
+            if value is not _UNSET:
+                return value
+        return self._extra_value(self._extras()[key], key)
+
+    def get(self, key, default=None):
+        if key in self.CORE_FIELDS:
+            value = getattr(self, key)
+            if value is not _UNSET:
+                return value
+        extras = self._extras()
+        if key not in extras:
+            return default
+        return self._extra_value(extras[key], key)
+
+    def __setitem__(self, key, value):
+        if key in self.CORE_FIELDS:
+            # A core value the encoder could not slot (e.g. an int weight)
+            # lives in the extras; drop it there so the slot is the only copy
+            if getattr(self, key) is _UNSET and key in self._extras():
+                del self._materialize()[key]
+            setattr(self, key, value)
+        else:
+            self._materialize()[key] = value
+
+    def __delitem__(self, key):
+        if key in self.CORE_FIELDS and getattr(self, key) is not _UNSET:
+            setattr(self, key, _UNSET)
+        else:
+            del self._materialize()[key]
+
+    def __iter__(self):
+        for field, _ in self._core_items():
+            yield field
+        yield from self._extras()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if key in self.CORE_FIELDS and getattr(self, key) is not _UNSET:
+            return True
+        return key in self._extras()
+
+    def to_dict(self):
+        record = dict(self._core_items())
+        if self._extra is None:
+            # A fresh decode rather than the cache entry, whose nested
+            # values the caller could otherwise edit
+            record.update(self._cache.decode(self.KIND, self._index))
+        else:
+            record.update(self._extra)
+        return record
+
+    def __eq__(self, other):
+        if isinstance(other, MutableMapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self._core_items())!r}, decoded={self.is_decoded})"
+
+
+class LazyNode(LazyRecord):
+    __slots__ = ('id', 'type', 'name')
+    KIND = 'node'
+    CORE_FIELDS = ('id', 'type', 'name')
+
+    def __init__(self, cache, index, node_id, node_type, name=_UNSET):
+        self._cache = cache
+        self._index = index
+        self._extra = None
+        self.id = node_id
+        self.type = node_type
+        self.name = name
+
+
+class LazyEdge(LazyRecord):
+    __slots__ = ('source', 'target', 'type', 'weight')
+    KIND = 'edge'
+    CORE_FIELDS = ('source', 'target', 'type', 'weight')
+
+    def __init__(self, cache, index, source, target, edge_type, weight=_UNSET):
+        self._cache = cache
+        self._index = index
+        self._extra = None
+        self.source = source
+        self.target = target
+        self.type = edge_type
+        self.weight = weight
+
+
+def lazy_records(snapshot, cache):
+    """Build LazyNode and LazyEdge lists from a BinarySnapshot"""
+    strings = snapshot.strings
+    nodes = [
+        LazyNode(cache, i, strings[id_idx], strings[type_idx],
+                 strings[name_idx] if name_idx != ABSENT else _UNSET)
+        for i, (id_idx, type_idx, name_idx) in enumerate(
+            zip(snapshot.node_id, snapshot.node_type, snapshot.node_name))
+    ]
+    edges = [
+        LazyEdge(cache, i, strings[s], strings[t], strings[k], w if w == w else _UNSET)
+        for i, (s, t, k, w) in enumerate(zip(snapshot.edge_source, snapshot.edge_target,
+                                             snapshot.edge_type, snapshot.edge_weight))
+    ]
+    return nodes, edges
+
+
+def load_lazy_store(filepath, cache_size=DEFAULT_CACHE_SIZE):
+    """Load a .hgb snapshot into a HypergraphStore of lazy records"""
+    with open(filepath, 'rb') as f:
+        snapshot = BinarySnapshot(f.read())
+    cache = BlobCache(snapshot, cache_size)
+    with gc_paused():
+        nodes, edges = lazy_records(snapshot, cache)
+        store = HypergraphStore({'metadata': snapshot.metadata, 'nodes': nodes, 'edges': edges})
+    store.blob_cache = cache
+    return store
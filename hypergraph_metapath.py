@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Typed metapath queries over the hypergraph
+A metapath is a chain of node types joined by typed, directed edge steps,
+written the way the edges point:
+
+    skin_concern <-treats- ingredient <-supplies- supplier
+    platform -offers_feature-> feature
+    salon -offers_service-> service -uses_ingredient|treats-> *
+
+('*' matches any node type, 'a|b' either edge type.) A query starts from
+some nodes of the first type (all of them by default) and returns every
+(start, end) pair the chain connects, with the number of paths between
+them and, optionally, edge attributes aggregated over those paths, such
+as the minimum price_per_kg_usd. Results are ranked, globally or per start.
+
+Path counts are products of per-type sparse adjacency matrices
+(hypergraph_sparse.SparseGraph); aggregates follow the same chain edge by
+edge over per-type CSR edge indexes, reducing with min or max at each hop.
+Chaining two queries answers "cheapest supplier for every ingredient that
+treats acne":
+
+    engine = MetapathEngine.load(attributes=['price_per_kg_usd'])
+    ingredients = engine.endpoints('skin_concern <-treats- ingredient', ['acne_concern'])
+    engine.query('ingredient <-supplies- supplier', start=ingredients,
+                 aggregate={'price_per_kg_usd': 'min'}, per_start=1)
+
+Requires numpy and scipy (pip install numpy scipy).
+
+Usage:
+    python3 hypergraph_metapath.py METAPATH [--start ID ...] [--via METAPATH] [--end ID ...]
+                                   [--min ATTR] [--max ATTR] [--order-by KEY]
+                                   [--per-start K] [--limit N] [--snapshot PATH] [--json]
+"""
+
+import argparse
+import json
+import re
+import sys
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix, diags
+except ImportError as e:
+    raise ImportError("hypergraph_metapath requires numpy and scipy (pip install numpy scipy)") from e
+
+from hypergraph_sparse import SparseGraph
+from hypergraph_store import DEFAULT_HYPERGRAPH_PATH
+
+ANY_TYPE = '*'
+STEP = re.compile(r'\s*(<-[\w|]+-|-[\w|]+->)\s*')
+
+# Reductions for aggregated edge attributes; NaN (attribute missing) is ignored
+AGGREGATES = {'min': np.fmin, 'max': np.fmax}
+
+
+class Metapath:
+    """Node types (None for any) joined by steps of (edge types, reverse)
+
+    A reverse step follows edges target → source.
+    """
+
+    def __init__(self, node_types, steps):
+        if len(node_types) != len(steps) + 1 or not steps:
+            raise ValueError("A metapath needs at least one step and a node type on each side of it")
+        self.node_types = list(node_types)
+        self.steps = [(tuple(edge_types), reverse) for edge_types, reverse in steps]
+
+    @classmethod
+    def parse(cls, text):
+        """Parse 'type -edge-> type <-edge- type ...'"""
+        parts = STEP.split(text.strip())
+        node_types = [part.strip() for part in parts[0::2]]
+        if len(parts) < 3 or not all(node_types) or any(STEP.search(t) or ' ' in t for t in node_types):
+            raise ValueError(f"Not a metapath: {text!r}")
+        steps = [(step.strip('<>-').split('|'), step.startswith('<')) for step in parts[1::2]]
+        return cls([None if t == ANY_TYPE else t for t in node_types], steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __str__(self):
+        text = self.node_types[0] or ANY_TYPE
+        for (edge_types, reverse), node_type in zip(self.steps, self.node_types[1:]):
+            label = '|'.join(edge_types)
+            text += f" <-{label}- " if reverse else f" -{label}-> "
+            text += node_type or ANY_TYPE
+        return text
+
+
+def _metapath(metapath):
+    return metapath if isinstance(metapath, Metapath) else Metapath.parse(metapath)
+
+
+def _align(keys, values, wanted):
+    """values at the wanted keys (NaN where absent); keys are sorted"""
+    aligned = np.full(len(wanted), np.nan)
+    if len(keys):
+        at = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+        found = keys[at] == wanted
+        aligned[found] = values[at[found]]
+    return aligned
+
+
+class MetapathEngine:
+    """Evaluates metapaths over a SparseGraph with per-step indexes, cached"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._node_types = set(graph.node_types or ())
+        self._masks = {}
+        self._matrices = {}
+        self._edge_indexes = {}
+
+    @classmethod
+    def load(cls, filepath=DEFAULT_HYPERGRAPH_PATH, attributes=()):
+        """Engine over a .json snapshot, keeping the named edge attributes"""
+        return cls(SparseGraph.load(filepath, attributes))
+
+    def _check(self, metapath):
+        for node_type in metapath.node_types:
+            if node_type is not None and node_type not in self._node_types:
+                raise ValueError(f"Unknown node type: {node_type}")
+        for edge_types, _ in metapath.steps:
+            for edge_type in edge_types:
+                if edge_type not in self.graph.edge_types:
+                    raise ValueError(f"Unknown edge type: {edge_type}")
+
+    def _mask(self, node_type):
+        """Boolean node mask for a node type, or None for any type"""
+        if node_type is None:
+            return None
+        if node_type not in self._masks:
+            self._masks[node_type] = self.graph.type_mask([node_type])
+        return self._masks[node_type]
+
+    def _matrix(self, step):
+        """Path-count matrix of one step: entry (i, j) = edges leading i to j"""
+        if step not in self._matrices:
+            edge_types, reverse = step
+            a = self.graph.matrix(edge_types, weighted=False)
+            self._matrices[step] = a.T.tocsr() if reverse else a
+        return self._matrices[step]
+
+    def _edge_index(self, step):
+        """(offsets, next nodes, edge indices): the step's edges by the node they leave"""
+        if step not in self._edge_indexes:
+            edge_types, reverse = step
+            g = self.graph
+            edges = np.flatnonzero(np.isin(g.types, [g.edge_types.index(t) for t in edge_types]))
+            leave, enter = (g.targets, g.sources) if reverse else (g.sources, g.targets)
+            edges = edges[np.argsort(leave[edges], kind='stable')]
+            offsets = np.zeros(len(g) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(leave[edges], minlength=len(g)), out=offsets[1:])
+            self._edge_indexes[step] = (offsets, enter[edges], edges)
+        return self._edge_indexes[step]
+
+    def _starts(self, metapath, start):
+        """Start node indices: the given ids of the first type, or all of it"""
+        mask = self._mask(metapath.node_types[0])
+        if start is None:
+            return np.arange(len(self.graph)) if mask is None else np.flatnonzero(mask)
+        starts = self.graph.indices(start)
+        return starts if mask is None else starts[mask[starts]]
+
+    def counts(self, metapath, start=None):
+        """(start indices, CSR matrix): entry (i, j) = paths from starts[i] to node j"""
+        metapath = _metapath(metapath)
+        self._check(metapath)
+        starts = self._starts(metapath, start)
+        n = len(self.graph)
+        paths = csr_matrix((np.ones(len(starts)), (np.arange(len(starts)), starts)),
+                           shape=(len(starts), n))
+        for step, node_type in zip(metapath.steps, metapath.node_types[1:]):
+            paths = paths @ self._matrix(step)
+            mask = self._mask(node_type)
+            if mask is not None:
+                paths = paths @ diags(mask.astype(np.float64))
+            paths.eliminate_zeros()
+        return starts, paths.tocsr()
+
+    def _aggregate(self, metapath, starts, name, how):
+        """(sorted row * n + node keys, values): attribute name reduced with how over paths"""
+        column = self.graph.edge_attribute(name)
+        reduce = AGGREGATES[how]
+        n = len(self.graph)
+        rows = np.arange(len(starts), dtype=np.int64)
+        nodes = np.asarray(starts, dtype=np.int64)
+        values = np.full(len(starts), np.nan)
+        for step, node_type in zip(metapath.steps, metapath.node_types[1:]):
+            offsets, enter, edges = self._edge_index(step)
+            # Expand every (row, node) pair into one entry per edge leaving node
+            first, lengths = offsets[nodes], offsets[nodes + 1] - offsets[nodes]
+            pick = np.repeat(np.arange(len(nodes)), lengths)
+            position = first[pick] + np.arange(len(pick)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            rows, nodes = rows[pick], enter[position]
+            values = reduce(values[pick], column[edges[position]])
+            mask = self._mask(node_type)
+            if mask is not None:
+                keep = mask[nodes]
+                rows, nodes, values = rows[keep], nodes[keep], values[keep]
+            if not len(rows):
+                break
+            # One entry per (row, node), reducing over the paths that meet there
+            keys = rows * n + nodes
+            order = np.argsort(keys, kind='stable')
+            keys, values = keys[order], values[order]
+            heads = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            keys, values = keys[heads], reduce.reduceat(values, heads)
+            rows, nodes = keys // n, keys % n
+        return rows * n + nodes, values
+
+    def endpoints(self, metapath, start=None):
+        """Node ids at the end of the metapath from start, in index order"""
+        _, paths = self.counts(metapath, start)
+        reached = np.unique(paths.indices)
+        return [self.graph.node_ids[i] for i in reached]
+
+    def query(self, metapath, start=None, end=None, aggregate=None, order_by=None,
+              per_start=None, limit=None):
+        """Ranked (start, end) pairs the metapath connects
+
+        Each result is a dict of start, end, paths (number of paths) and
+        one '<how>_<attribute>' entry per aggregate ({attribute: 'min',
+        'max' or both as a list}), None where no path has the attribute. order_by is 'paths'
+        or an aggregate key and defaults to the first aggregate; min
+        aggregates rank ascending, the others descending, ties by paths.
+        per_start keeps the best K ends of each start (grouped by start);
+        limit caps the number of results.
+        """
+        metapath = _metapath(metapath)
+        wanted = [(name, how) for name, hows in (aggregate or {}).items()
+                  for how in ([hows] if isinstance(hows, str) else hows)]
+        for name, how in wanted:
+            if how not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate {how!r} for {name} (use {', '.join(AGGREGATES)})")
+        starts, paths = self.counts(metapath, start)
+        n = len(self.graph)
+        paths = paths.tocoo()
+        keys = paths.row.astype(np.int64) * n + paths.col
+        order = np.argsort(keys)
+        keys, rows, ends, counts = keys[order], paths.row[order], paths.col[order], paths.data[order]
+
+        columns = {}
+        for name, how in wanted:
+            agg_keys, values = self._aggregate(metapath, starts, name, how)
+            columns[f"{how}_{name}"] = (how, _align(agg_keys, values, keys))
+
+        if end is not None:
+            keep = np.isin(ends, self.graph.indices(end))
+            rows, ends, counts = rows[keep], ends[keep], counts[keep]
+            columns = {key: (how, values[keep]) for key, (how, values) in columns.items()}
+
+        order_by = order_by or next(iter(columns), 'paths')
+        if order_by == 'paths':
+            primary = -counts
+        elif order_by in columns:
+            how, values = columns[order_by]
+            primary = np.where(np.isnan(values), np.inf, values if how == 'min' else -values)
+        else:
+            raise ValueError(f"Cannot order by {order_by!r} (use paths or {', '.join(columns) or 'an aggregate'})")
+        order = np.lexsort((ends, -counts, primary))
+        if per_start is not None:
+            order = order[np.argsort(rows[order], kind='stable')]
+            grouped = rows[order]
+            heads = np.r_[0, np.flatnonzero(grouped[1:] != grouped[:-1]) + 1] if len(order) else order
+            rank = np.arange(len(order)) - np.repeat(heads, np.diff(np.r_[heads, len(order)]))
+            order = order[rank < per_start]
+        if limit is not None:
+            order = order[:limit]
+
+        node_ids = self.graph.node_ids
+        results = []
+        for i in order:
+            result = {'start': node_ids[starts[rows[i]]], 'end': node_ids[ends[i]], 'paths': int(counts[i])}
+            for key, (_, values) in columns.items():
+                result[key] = None if np.isnan(values[i]) else float(values[i])
+            results.append(result)
+        return results
+
+
+def print_results(results):
+    for result in results:
+        extra = ''.join(f"  {key}={value:g}" for key, value in result.items()
+                        if key not in ('start', 'end', 'paths') and value is not None)
+        print(f"  {result['start']} → {result['end']}  paths={result['paths']}{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Typed metapath queries over the hypergraph')
+    parser.add_argument('metapath', help="e.g. 'ingredient <-supplies- supplier'")
+    parser.add_argument('--snapshot', default=DEFAULT_HYPERGRAPH_PATH)
+    parser.add_argument('--start', nargs='+', help='Start node ids (default: every node of the first type)')
+    parser.add_argument('--via', help='Start from the ends of this metapath (from --start) instead')
+    parser.add_argument('--end', nargs='+', help='Only these end node ids')
+    parser.add_argument('--min', action='append', default=[], metavar='ATTR',
+                        help='Minimum of an edge attribute over the paths')
+    parser.add_argument('--max', action='append', default=[], metavar='ATTR',
+                        help='Maximum of an edge attribute over the paths')
+    parser.add_argument('--order-by', help='paths or an aggregate such as min_price_per_kg_usd')
+    parser.add_argument('--per-start', type=int, help='Best K ends per start')
+    parser.add_argument('--limit', type=int, help='At most N results')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    aggregate = {name: [how for how, names in (('min', args.min), ('max', args.max)) if name in names]
+                 for name in args.min + args.max}
+    engine = MetapathEngine.load(args.snapshot, attributes=list(aggregate))
+    try:
+        start = args.start
+        if args.via:
+            start = engine.endpoints(args.via, start)
+        results = engine.query(args.metapath, start=start, end=args.end, aggregate=aggregate,
+                               order_by=args.order_by, per_start=args.per_start, limit=args.limit)
+    except (KeyError, ValueError) as e:
+        print(f"✗ {e.args[0]}")
+        return 1
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"✓ {len(results)} results for {_metapath(args.metapath)}")
+        print_results(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
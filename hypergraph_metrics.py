@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Batch graph metrics for every node, materialized into hypergraph_metrics
+The SQL functions calculate_node_centrality and calculate_cognitive_synergy
+score one node at a time with several scans of edges each, so scoring the
+whole graph is O(N·E) inside Postgres. This computes the same numbers for
+all nodes in a single pass over the edge list, into typed array columns,
+and bulk-writes them so dashboards read precomputed values
+
+Metrics per node (names as stored in hypergraph_metrics.metric_name):
+
+    in_degree                edges pointing at the node
+    out_degree               edges leaving the node
+    degree                   in_degree + out_degree
+    degree_centrality        degree / (nodes - 1), as calculate_node_centrality
+    neighbor_type_diversity  distinct node types among the node's neighbours
+    weighted_degree          sum of the 'weight' of incident edges (1.0 default)
+    cognitive_synergy        0.4 * degree_centrality
+                             + 0.3 * neighbor_type_diversity
+                             + 0.3 * weighted_degree, as calculate_cognitive_synergy
+
+A write inserts the new rows tagged with a run id, then deletes every
+older node-level row for these metric names in one statement. Readers that
+pick the newest row per node and metric (v_node_metrics) never see a gap.
+
+Usage:
+    python3 hypergraph_metrics.py [hypergraph_data.json] [--top N] [--write]
+"""
+
+import argparse
+import sys
+import uuid
+from array import array
+
+from hypergraph_db import DatabaseError, create_backend, sized_batches
+from hypergraph_store import DEFAULT_HYPERGRAPH_PATH
+from hypergraph_validate import load_valid
+
+METRIC_NAMES = (
+    'in_degree', 'out_degree', 'degree', 'degree_centrality',
+    'neighbor_type_diversity', 'weighted_degree', 'cognitive_synergy',
+)
+
+# Weights of calculate_cognitive_synergy in database_schema.sql
+SYNERGY_WEIGHTS = {'degree_centrality': 0.4, 'neighbor_type_diversity': 0.3, 'weighted_degree': 0.3}
+
+DEFAULT_WEIGHT = 1.0
+WRITE_BATCH_SIZE = 1000
+
+# One row per node with its metrics as a JSON object, unnested into one
+# hypergraph_metrics row per metric
+INSERT_METRICS = """INSERT INTO hypergraph_metrics (metric_name, metric_value, node_id, metadata)
+SELECT m.key, m.value::numeric, v.node_id, %s::jsonb
+FROM jsonb_to_recordset(%s::jsonb) AS v(node_id TEXT, metrics JSONB),
+     jsonb_each_text(v.metrics) AS m;"""
+
+DELETE_STALE_METRICS = """DELETE FROM hypergraph_metrics
+WHERE metric_name IN (SELECT jsonb_array_elements_text(%s::jsonb))
+  AND node_id IS NOT NULL AND edge_id IS NULL
+  AND metadata->>'run_id' IS DISTINCT FROM %s;"""
+
+
+class NodeMetrics:
+    """Metric columns indexed like node_ids; columns[name][i] is node i's value"""
+
+    def __init__(self, node_ids, columns):
+        self.node_ids = node_ids
+        self.columns = columns
+        self.names = tuple(columns)
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def values(self, index):
+        """Return {metric name: value} for node index"""
+        return {name: self.columns[name][index] for name in self.names}
+
+    def rows(self):
+        """Yield (node_id, {metric name: value}) for every node"""
+        for i, node_id in enumerate(self.node_ids):
+            yield node_id, self.values(i)
+
+    def top(self, metric, n=10):
+        """Return the n (node_id, value) pairs with the highest metric"""
+        column = self.columns[metric]
+        ranked = sorted(range(len(column)), key=column.__getitem__, reverse=True)[:n]
+        return [(self.node_ids[i], column[i]) for i in ranked]
+
+
+def compute_metrics(nodes, edges):
+    """Compute METRIC_NAMES for every node in one pass over edges
+
+    nodes and edges are the dicts from hypergraph_data.json (any
+    iterables). Edges whose source or target is not a node are skipped,
+    like the foreign keys would reject them; run the validator first to
+    drop duplicates, which would otherwise count twice.
+    """
+    node_ids = []
+    node_index = {}
+    type_codes = {}
+    node_type = array('I')
+    for node in nodes:
+        node_index[node['id']] = len(node_ids)
+        node_ids.append(node['id'])
+        node_type.append(type_codes.setdefault(node['type'], len(type_codes)))
+
+    n = len(node_ids)
+    in_degree = array('I', bytes(4 * n))
+    out_degree = array('I', bytes(4 * n))
+    weighted = array('d', bytes(8 * n))
+    # Neighbour types as bitmasks over the type codes: one int per node
+    # instead of a set, and diversity is a popcount
+    neighbor_types = [0] * n
+
+    get = node_index.get
+    for edge in edges:
+        s = get(edge['source'])
+        t = get(edge['target'])
+        if s is None or t is None:
+            continue
+        weight = edge.get('weight')
+        weight = DEFAULT_WEIGHT if weight is None else float(weight)
+        out_degree[s] += 1
+        in_degree[t] += 1
+        weighted[s] += weight
+        if s != t:
+            weighted[t] += weight
+            neighbor_types[s] |= 1 << node_type[t]
+            neighbor_types[t] |= 1 << node_type[s]
+
+    degree = array('I', (i + o for i, o in zip(in_degree, out_degree)))
+    scale = 1.0 / (n - 1) if n > 1 else 0.0
+    centrality = array('d', (d * scale for d in degree))
+    diversity = array('I', (mask.bit_count() for mask in neighbor_types))
+    w = SYNERGY_WEIGHTS
+    synergy = array('d', (w['degree_centrality'] * c + w['neighbor_type_diversity'] * d
+                          + w['weighted_degree'] * s
+                          for c, d, s in zip(centrality, diversity, weighted)))
+    return NodeMetrics(node_ids, {
+        'in_degree': in_degree,
+        'out_degree': out_degree,
+        'degree': degree,
+        'degree_centrality': centrality,
+        'neighbor_type_diversity': diversity,
+        'weighted_degree': weighted,
+        'cognitive_synergy': synergy,
+    })
+
+
+def metrics_statements(metrics, run_id, metadata=None, batch_size=WRITE_BATCH_SIZE):
+    """Return (insert statements, cleanup statement) writing metrics as run_id
+
+    Run the inserts first (in any grouping) and the cleanup last; the
+    cleanup removes the rows of every other run for the same metric names.
+    """
+    metadata = dict(metadata or {}, run_id=run_id)
+    rows = ({'node_id': node_id, 'metrics': values} for node_id, values in metrics.rows())
+    inserts = [(INSERT_METRICS, (metadata, batch)) for batch in sized_batches(rows, batch_size)]
+    return inserts, (DELETE_STALE_METRICS, (list(metrics.names), run_id))
+
+
+def write_metrics(backend, metrics, metadata=None, batch_size=WRITE_BATCH_SIZE):
+    """Bulk-write metrics through a hypergraph_db backend; returns the run id"""
+    run_id = uuid.uuid4().hex
+    inserts, cleanup = metrics_statements(metrics, run_id, metadata, batch_size)
+    backend.execute_many(inserts)
+    backend.execute_transaction([cleanup])
+    return run_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute node metrics for the hypergraph')
+    parser.add_argument('hypergraph', nargs='?', default=DEFAULT_HYPERGRAPH_PATH)
+    parser.add_argument('--top', type=int, default=10, help='Nodes to show per metric')
+    parser.add_argument('--write', action='store_true',
+                        help='Store the metrics in hypergraph_metrics (DATABASE_URL or MCP)')
+    args = parser.parse_args()
+
+    data = load_valid(args.hypergraph)
+    metrics = compute_metrics(data['nodes'], data['edges'])
+    print(f"✓ Computed {len(METRIC_NAMES)} metrics for {len(metrics)} nodes")
+    for name in ('degree', 'neighbor_type_diversity', 'cognitive_synergy'):
+        print(f"\nTop {args.top} by {name}:")
+        for node_id, value in metrics.top(name, args.top):
+            print(f"  {node_id}: {value:g}")
+
+    if args.write:
+        backend = create_backend()
+        try:
+            run_id = write_metrics(backend, metrics, {
+                'snapshot_version': data.get('metadata', {}).get('version'),
+            })
+        except DatabaseError as e:
+            print(f"\n✗ Writing metrics failed: {e}")
+            return 1
+        finally:
+            backend.close()
+        print(f"\n✓ Wrote {len(metrics) * len(metrics.names)} rows to hypergraph_metrics (run {run_id})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Pipelined, concurrent batch sender for the hypergraph sync scripts
+Batches are built lazily on the calling thread while a bounded pool of
+worker threads sends them, so building the next batch overlaps the round
+trip of the previous ones. Each batch is retried with exponential backoff
+
+Work is split into phases that run strictly one after another (for
+example all node batches, then all edge batches, so edges never reach the
+database before the nodes they reference); batches within a phase have no
+ordering between them.
+
+    with SyncPipeline(send_batch, concurrency=4) as pipeline:
+        pipeline.run_phase('nodes', node_batches())
+        pipeline.run_phase('edges', edge_batches())
+
+Batch generators yield (payload, row_count) pairs and send_batch(payload)
+does the network call. SYNC_CONCURRENCY and SYNC_RETRIES set the defaults.
+With a hypergraph_checkpoint.SyncCheckpoint, batches recorded as written by
+an earlier run are skipped and newly written ones are recorded.
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_CONCURRENCY = int(os.environ.get('SYNC_CONCURRENCY', 4))
+DEFAULT_RETRIES = int(os.environ.get('SYNC_RETRIES', 3))
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+
+
+class BatchFailed(Exception):
+    """A batch still failed after all retries"""
+
+    def __init__(self, phase, index, error):
+        super().__init__(f"{phase} batch {index} failed: {error}")
+        self.phase = phase
+        self.index = index
+        self.error = error
+
+
+def call_with_retry(fn, *args, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                    max_backoff=MAX_BACKOFF, retry_on=(Exception,), on_retry=None):
+    """Call fn(*args), retrying with jittered exponential backoff
+
+    on_retry(attempt, error, delay) is called before each sleep.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn(*args)
+        except retry_on as e:
+            if attempt >= retries:
+                raise
+            delay = min(max_backoff, backoff * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            if on_retry:
+                on_retry(attempt + 1, e, delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+class SyncPipeline:
+    """Send batches concurrently, phase by phase"""
+
+    def __init__(self, send, concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, retry_on=(Exception,), progress=None,
+                 checkpoint=None):
+        self.send = send
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.retry_on = retry_on
+        self.progress = progress
+        self.checkpoint = checkpoint
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix='sync')
+        return self
+
+    def __exit__(self, *exc):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    def _send(self, phase, payload):
+        def on_retry(attempt, error, delay):
+            with self._lock:
+                self.stats[phase]['retries'] += 1
+            print(f"  ↻ {phase}: retry {attempt} in {delay:.1f}s ({error})")
+
+        return call_with_retry(self.send, payload, retries=self.retries, backoff=self.backoff,
+                               retry_on=self.retry_on, on_retry=on_retry)
+
+    def run_phase(self, phase, batches):
+        """Send every (payload, row_count) from batches; return once all are done
+
+        At most 2 * concurrency batches are built ahead of the workers, so
+        memory stays bounded however many batches the phase has. The first
+        batch that fails for good stops the phase and raises BatchFailed.
+        Batches the checkpoint already covers are counted under 'skipped'
+        and not sent; the batch generator must cut the same batches as the
+        run that wrote the checkpoint.
+        """
+        if self._executor is None:
+            raise RuntimeError("SyncPipeline must be used as a context manager")
+        stats = self.stats[phase] = {'batches': 0, 'rows': 0, 'retries': 0, 'skipped': 0,
+                                     'seconds': 0.0}
+        checkpoint = self.checkpoint
+        start = time.perf_counter()
+        pending = {}
+        max_pending = 2 * self.concurrency
+
+        def collect(done):
+            for future in done:
+                index, offset, rows = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in pending:
+                        other.cancel()
+                    wait(pending)
+                    if checkpoint is not None:
+                        # Batches that finished while this one failed still count
+                        for other, (_, other_offset, other_rows) in pending.items():
+                            if not other.cancelled() and other.exception() is None:
+                                checkpoint.mark_done(phase, other_offset, other_offset + other_rows)
+                    raise BatchFailed(phase, index, error) from error
+                stats['batches'] += 1
+                stats['rows'] += rows
+                if checkpoint is not None:
+                    checkpoint.mark_done(phase, offset, offset + rows)
+                if self.progress:
+                    self.progress(phase, stats['batches'], stats['rows'])
+
+        offset = 0
+        try:
+            for index, (payload, rows) in enumerate(batches, 1):
+                if checkpoint is not None and checkpoint.is_done(phase, offset, offset + rows):
+                    stats['skipped'] += rows
+                    offset += rows
+                    continue
+                while len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = self._executor.submit(self._send, phase, payload)
+                pending[future] = (index, offset, rows)
+                offset += rows
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        finally:
+            stats['seconds'] = time.perf_counter() - start
+            if checkpoint is not None:
+                checkpoint.save()
+        return stats
+
+
+def print_progress(phase, batches, rows):
+    """Default progress callback in the sync scripts' style"""
+    print(f"  ✓ {phase} batch {batches} ({rows} rows)")
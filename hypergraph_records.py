@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Compact record types for large Skin Zone hypergraphs
+Node and Edge are __slots__ classes holding the common fields directly and
+rare attributes in an overflow dict; EdgeArray stores edges column-wise in
+typed arrays with interned ids. Both convert losslessly to and from the
+plain dicts used in hypergraph_data.json
+
+load_record_store() streams the snapshot into a HypergraphStore of Node
+and Edge records (replaying the WAL like HypergraphStore.load), and
+load_edge_array() reads the edges alone into an EdgeArray for read-only
+whole-graph passes.
+"""
+
+import os
+import sys
+from array import array
+from itertools import chain
+
+from hypergraph_store import DEFAULT_HYPERGRAPH_PATH, HypergraphStore
+from hypergraph_stream import iter_edges, iter_nodes, read_metadata
+from hypergraph_wal import HypergraphLog
+
+MISSING = object()
+
+NODE_SLOTS = (
+    'id', 'type', 'name', 'category', 'function', 'supplier', 'availability',
+    'price_usd', 'price_per_kg_usd', 'price_per_kg', 'price_per_lb',
+    'bulk_size_kg', 'bulk_size_lbs', 'website', 'focus', 'last_updated',
+)
+EDGE_SLOTS = ('source', 'target', 'type', 'weight', 'metadata', 'price_per_kg_usd', 'availability')
+
+# Edge attributes EdgeArray keeps in columns rather than the sparse extras
+STRING_COLUMNS = ('availability',)
+FLOAT_COLUMNS = ('weight', 'price_per_kg_usd')
+NO_CODE = 0xFFFF
+
+
+class _Record:
+    """Shared dict-style access for slotted records
+
+    Unset slots hold MISSING so absent keys survive a to_dict() round trip;
+    keys without a slot live in self.extra, which stays None until needed.
+    """
+
+    __slots__ = ('extra',)
+    FIELDS = ()
+
+    def __init__(self, fields=None, **kwargs):
+        for slot in self.FIELDS:
+            object.__setattr__(self, slot, MISSING)
+        self.extra = None
+        if fields:
+            self.update(fields)
+        if kwargs:
+            self.update(kwargs)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data)
+
+    def __getitem__(self, key):
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            object.__setattr__(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS and getattr(self, key) is not MISSING:
+            object.__setattr__(self, key, MISSING)
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return self.get(key, MISSING) is not MISSING
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is MISSING else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def update(self, fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def items(self):
+        for slot in self.FIELDS:
+            value = getattr(self, slot)
+            if value is not MISSING:
+                yield slot, value
+        if self.extra:
+            yield from self.extra.items()
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, _Record):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Node(_Record):
+    """Hypergraph node with slots for the common fields"""
+
+    __slots__ = NODE_SLOTS
+    FIELDS = NODE_SLOTS
+
+
+class Edge(_Record):
+    """Hypergraph edge with slots for the common fields"""
+
+    __slots__ = EDGE_SLOTS
+    FIELDS = EDGE_SLOTS
+
+
+class EdgeArray:
+    """Column-wise edge storage
+
+    Source and target ids are interned into one id table and stored as
+    uint32 indexes, edge types as uint16 codes, and the common attributes
+    in columns too: FLOAT_COLUMNS as float64 (NaN when absent) and
+    STRING_COLUMNS as uint16 codes into one value table (NO_CODE when
+    absent). Only floats go in float columns, so an int or null weight
+    keeps its JSON type in the extras. Any other fields (metadata, rare
+    attributes) go into a sparse dict keyed by edge position, so an edge
+    without them costs 28 bytes plus its share of the id table.
+    """
+
+    def __init__(self, edges=()):
+        self.ids = []
+        self._id_index = {}
+        self.type_names = []
+        self._type_index = {}
+        self.values = []
+        self._value_index = {}
+        self.sources = array('I')
+        self.targets = array('I')
+        self.types = array('H')
+        self.floats = {name: array('d') for name in FLOAT_COLUMNS}
+        self.strings = {name: array('H') for name in STRING_COLUMNS}
+        self.weights = self.floats['weight']
+        self.extras = {}
+        for edge in edges:
+            self.append(edge)
+
+    def _intern_id(self, value):
+        idx = self._id_index.get(value)
+        if idx is None:
+            idx = self._id_index[value] = len(self.ids)
+            self.ids.append(sys.intern(value))
+        return idx
+
+    def _intern_type(self, value):
+        idx = self._type_index.get(value)
+        if idx is None:
+            idx = self._type_index[value] = len(self.type_names)
+            self.type_names.append(sys.intern(value))
+        return idx
+
+    def _intern_value(self, value):
+        idx = self._value_index.get(value)
+        if idx is None:
+            if len(self.values) >= NO_CODE:
+                return NO_CODE
+            idx = self._value_index[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return idx
+
+    def append(self, edge):
+        """Append an edge dict (or Edge record)"""
+        position = len(self.sources)
+        self.sources.append(self._intern_id(edge['source']))
+        self.targets.append(self._intern_id(edge['target']))
+        self.types.append(self._intern_type(edge['type']))
+        stored = {'source', 'target', 'type'}
+        for name, column in self.floats.items():
+            value = edge.get(name, MISSING)
+            if isinstance(value, float) and value == value:
+                column.append(value)
+                stored.add(name)
+            else:
+                column.append(float('nan'))
+        for name, column in self.strings.items():
+            value = edge.get(name, MISSING)
+            code = self._intern_value(value) if isinstance(value, str) else NO_CODE
+            column.append(code)
+            if code != NO_CODE:
+                stored.add(name)
+        extra = {k: v for k, v in edge.items() if k not in stored}
+        if extra:
+            self.extras[position] = extra
+
+    def extend(self, edges):
+        for edge in edges:
+            self.append(edge)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def source(self, i):
+        return self.ids[self.sources[i]]
+
+    def target(self, i):
+        return self.ids[self.targets[i]]
+
+    def edge_type(self, i):
+        return self.type_names[self.types[i]]
+
+    def weight(self, i, default=1.0):
+        weight = self.weights[i]
+        return default if weight != weight else weight
+
+    def get_dict(self, i):
+        """Materialize edge i as a plain dict"""
+        if i < 0:
+            i += len(self)
+        edge = {
+            'source': self.ids[self.sources[i]],
+            'target': self.ids[self.targets[i]],
+            'type': self.type_names[self.types[i]],
+        }
+        extra = self.extras.get(i)
+        if extra:
+            edge.update(extra)
+        for name, column in self.floats.items():
+            value = column[i]
+            if value == value:
+                edge[name] = value
+        for name, column in self.strings.items():
+            code = column[i]
+            if code != NO_CODE:
+                edge[name] = self.values[code]
+        return edge
+
+    def __getitem__(self, i):
+        """Materialize edge i as an Edge record"""
+        return Edge(self.get_dict(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get_dict(i)
+
+    def to_dicts(self):
+        return list(self)
+
+
+def nodes_from_dicts(nodes):
+    """Convert node dicts into Node records"""
+    return [Node(node) for node in nodes]
+
+
+def nodes_to_dicts(nodes):
+    """Convert Node records back into plain dicts"""
+    return [node.to_dict() for node in nodes]
+
+
+def _load_records(filepath):
+    # Streams the file, so no plain-dict copy of the graph is ever built
+    return HypergraphStore({
+        'metadata': read_metadata(filepath),
+        'nodes': (Node(node) for node in iter_nodes(filepath)),
+        'edges': (Edge(edge) for edge in iter_edges(filepath)),
+    })
+
+
+def load_record_store(filepath=DEFAULT_HYPERGRAPH_PATH):
+    """Load the hypergraph into a HypergraphStore of Node and Edge records
+
+    Pending WAL records are replayed, as in HypergraphStore.load.
+    """
+    return HypergraphLog(filepath, snapshot_loader=_load_records).open()
+
+
+def load_edge_array(filepath=DEFAULT_HYPERGRAPH_PATH):
+    """Load the hypergraph edges into an EdgeArray
+
+    The edges are streamed from the file; with pending WAL records the
+    record store is loaded first so they are included.
+    """
+    if os.path.exists(f"{filepath}.wal"):
+        store = load_record_store(filepath)
+        return EdgeArray(chain(store.edges(), store.duplicate_edges))
+    return EdgeArray(iter_edges(filepath))
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Sparse-matrix backend for whole-graph hypergraph analytics
+Loads a snapshot into NumPy columns and SciPy CSR matrices: one n×n
+matrix per edge type plus a combined one weighted by edge 'weight', with
+a stable node index (the node's position in the snapshot). Whole-graph
+algorithms run as sparse matrix-vector products instead of Python loops
+over dicts, so they scale to millions of edges on one core
+
+    pagerank                  power iteration, dangling mass spread evenly
+    eigenvector_centrality    power iteration on the undirected adjacency
+    connected_components      weak or strong components (scipy.sparse.csgraph)
+    k_hop                     hop distance from a set of nodes, up to k hops
+
+All of them can be restricted to some edge types. Entry (i, j) of a
+matrix is the summed weight (or the number) of the edges i → j. Numeric
+edge attributes such as price_per_kg_usd can be loaded as extra columns.
+
+--write stores PageRank as pagerank_scaled, n × pagerank (1.0 is an
+average node), since hypergraph_metrics.metric_value keeps six decimals
+and raw values of about 1/n would round to 0.
+
+Requires numpy and scipy (pip install numpy scipy).
+
+Usage:
+    python3 hypergraph_sparse.py [hypergraph_data.json] [--top N] [--write]
+"""
+
+import argparse
+import sys
+
+try:
+    import numpy as np
+    from scipy.sparse import csgraph, csr_matrix
+except ImportError as e:
+    raise ImportError("hypergraph_sparse requires numpy and scipy (pip install numpy scipy)") from e
+
+from hypergraph_db import DatabaseError, create_backend
+from hypergraph_metrics import NodeMetrics, write_metrics
+from hypergraph_store import DEFAULT_HYPERGRAPH_PATH
+from hypergraph_validate import load_valid
+
+DEFAULT_WEIGHT = 1.0
+DEFAULT_DAMPING = 0.85
+DEFAULT_TOLERANCE = 1e-10
+DEFAULT_MAX_ITER = 200
+
+
+def _attribute(edge, name):
+    value = edge.get(name)
+    if value is None:
+        value = (edge.get('metadata') or {}).get(name)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class SparseGraph:
+    """Edge columns and CSR adjacency matrices over a stable node index"""
+
+    def __init__(self, node_ids, node_types, edge_types, sources, targets, types, weights,
+                 attributes=None):
+        self.node_ids = list(node_ids)
+        self.node_index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.node_types = node_types
+        self.edge_types = list(edge_types)
+        self.sources = np.asarray(sources, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.types = np.asarray(types, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        # {name: float column}, NaN where an edge lacks the attribute
+        self.attributes = {name: np.asarray(column, dtype=np.float64)
+                           for name, column in (attributes or {}).items()}
+        self._matrices = {}
+
+    @classmethod
+    def from_hypergraph(cls, data, attributes=()):
+        """Build from a hypergraph dict; dangling edges are left out
+
+        attributes names numeric edge attributes to keep as columns, read
+        from the edge or its 'metadata'.
+        """
+        node_ids = [node['id'] for node in data['nodes']]
+        node_types = [node['type'] for node in data['nodes']]
+        node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+        type_index = {}
+        sources, targets, types, weights = [], [], [], []
+        columns = {name: [] for name in attributes}
+        for edge in data['edges']:
+            s = node_index.get(edge['source'])
+            t = node_index.get(edge['target'])
+            if s is None or t is None:
+                continue
+            weight = edge.get('weight')
+            sources.append(s)
+            targets.append(t)
+            types.append(type_index.setdefault(edge['type'], len(type_index)))
+            weights.append(DEFAULT_WEIGHT if weight is None else float(weight))
+            for name, column in columns.items():
+                column.append(_attribute(edge, name))
+        return cls(node_ids, node_types, type_index, sources, targets, types, weights, columns)
+
+    @classmethod
+    def from_edge_table(cls, table):
+        """Build from an open hypergraph_edge_table.EdgeTable
+
+        The columns are copied out of the mapping, so the table may be
+        closed afterwards. Edge tables carry no node types.
+        """
+        return cls(table.node_ids, None, table.edge_types,
+                   np.frombuffer(table.sources, dtype=np.uint32),
+                   np.frombuffer(table.targets, dtype=np.uint32),
+                   np.frombuffer(table.types, dtype=np.uint32),
+                   np.frombuffer(table.weights, dtype=np.float32))
+
+    @classmethod
+    def load(cls, filepath=DEFAULT_HYPERGRAPH_PATH, attributes=()):
+        """Build from a .json snapshot (with its WAL, validated and repaired) or an edge table file
+
+        Edge tables hold no attributes, so attributes needs a snapshot.
+        """
+        if filepath.endswith('.json'):
+            return cls.from_hypergraph(load_valid(filepath), attributes)
+        if attributes:
+            raise ValueError(f"Edge attributes need a .json snapshot, not {filepath}")
+        from hypergraph_edge_table import EdgeTable
+
+        with EdgeTable(filepath) as table:
+            return cls.from_edge_table(table)
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self):
+        return len(self.sources)
+
+    def indices(self, node_ids):
+        """Node indices for node ids; raises KeyError for unknown ids"""
+        try:
+            return np.array([self.node_index[node_id] for node_id in node_ids], dtype=np.int64)
+        except KeyError as e:
+            raise KeyError(f"Unknown node: {e.args[0]}") from None
+
+    def _mask(self, edge_types):
+        if not edge_types:
+            return None
+        codes = [self.edge_types.index(t) for t in edge_types if t in self.edge_types]
+        return np.isin(self.types, codes)
+
+    def matrix(self, edge_types=None, weighted=True):
+        """CSR adjacency of the given edge types (all by default), cached
+
+        Entry (i, j) is the summed weight of the edges i → j, or their
+        number when weighted is False.
+        """
+        types = tuple(sorted(edge_types)) if edge_types else None
+        key = (types, weighted)
+        if key not in self._matrices:
+            mask = self._mask(types)
+            rows, cols = self.sources, self.targets
+            data = self.weights if weighted else np.ones(len(rows))
+            if mask is not None:
+                rows, cols, data = rows[mask], cols[mask], data[mask]
+            n = len(self)
+            self._matrices[key] = csr_matrix((data, (rows, cols)), shape=(n, n))
+        return self._matrices[key]
+
+    def type_matrices(self):
+        """{edge type: CSR adjacency of that type}"""
+        return {edge_type: self.matrix([edge_type]) for edge_type in self.edge_types}
+
+    def type_mask(self, node_types):
+        """Boolean array marking the nodes of the given node types"""
+        if self.node_types is None:
+            raise ValueError("This graph has no node types (built from an edge table)")
+        wanted = set(node_types)
+        return np.fromiter((t in wanted for t in self.node_types), dtype=bool, count=len(self))
+
+    def edge_attribute(self, name):
+        """The float column of edge attribute name (NaN where missing)"""
+        try:
+            return self.attributes[name]
+        except KeyError:
+            raise KeyError(f"Edge attribute not loaded: {name}") from None
+
+    def pagerank(self, damping=DEFAULT_DAMPING, edge_types=None, weighted=True,
+                 tol=DEFAULT_TOLERANCE, max_iter=DEFAULT_MAX_ITER):
+        """PageRank per node index (sums to 1)
+
+        Each node passes its rank along its out-edges in proportion to
+        their weight; nodes without out-edges spread theirs evenly.
+        """
+        n = len(self)
+        if n == 0:
+            return np.zeros(0)
+        a = self.matrix(edge_types, weighted)
+        out_weight = np.asarray(a.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        scale = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+        transition_t = (a.multiply(scale[:, None])).T.tocsr()
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            spread = damping * rank[dangling].sum() / n + (1.0 - damping) / n
+            updated = damping * (transition_t @ rank) + spread
+            if np.abs(updated - rank).sum() < tol * n:
+                return updated
+            rank = updated
+        return rank
+
+    def eigenvector_centrality(self, edge_types=None, tol=DEFAULT_TOLERANCE, max_iter=DEFAULT_MAX_ITER):
+        """Eigenvector centrality per node index over the undirected graph
+
+        The edges of this graph mostly point one way down a type hierarchy,
+        so the directed version is zero almost everywhere; the symmetric
+        adjacency (A + Aᵀ) is used instead. Iterates x ← (A + Aᵀ + I) x,
+        which has the same leading eigenvector and always converges.
+        Normalised to unit length.
+        """
+        n = len(self)
+        if n == 0:
+            return np.zeros(0)
+        a = self.matrix(edge_types)
+        symmetric = (a + a.T).tocsr()
+        x = np.full(n, 1.0 / np.sqrt(n))
+        for _ in range(max_iter):
+            updated = symmetric @ x + x
+            norm = np.linalg.norm(updated)
+            if norm == 0:
+                return updated
+            updated /= norm
+            if np.abs(updated - x).sum() < tol * n:
+                return updated
+            x = updated
+        return x
+
+    def connected_components(self, edge_types=None, strong=False):
+        """(component count, component label per node index)
+
+        Weak components ignore edge direction; strong ones follow it.
+        """
+        return csgraph.connected_components(self.matrix(edge_types, weighted=False), directed=True,
+                                            connection='strong' if strong else 'weak')
+
+    def k_hop(self, node_ids, k, edge_types=None, directed=True):
+        """Hop distance from the nearest of node_ids, -1 beyond k hops
+
+        Expands one level per sparse matrix-vector product, so the cost
+        is k products however many start nodes there are. The unweighted
+        matrix is walked, so an edge of weight 0 is still followed.
+        """
+        a = self.matrix(edge_types, weighted=False)
+        step = (a.T if directed else (a + a.T)).tocsr()
+        hops = np.full(len(self), -1, dtype=np.int64)
+        frontier = np.zeros(len(self), dtype=np.float64)
+        start = self.indices(node_ids)
+        hops[start] = 0
+        frontier[start] = 1.0
+        for level in range(1, k + 1):
+            reached = (step @ frontier > 0) & (hops < 0)
+            if not reached.any():
+                break
+            hops[reached] = level
+            frontier = reached.astype(np.float64)
+        return hops
+
+    def within(self, node_ids, k, edge_types=None, directed=True):
+        """Node ids reachable from node_ids in 1..k hops"""
+        hops = self.k_hop(node_ids, k, edge_types, directed)
+        return [self.node_ids[i] for i in np.flatnonzero(hops > 0)]
+
+    def top(self, values, n=10):
+        """The n (node_id, value) pairs with the highest values"""
+        order = np.argsort(-values, kind='stable')[:n]
+        return [(self.node_ids[i], float(values[i])) for i in order]
+
+
+def graph_metrics(graph, components=None):
+    """Whole-graph metrics for hypergraph_metrics, one column per metric
+
+    components is a connected_components() result to reuse, if the caller
+    already has one.
+    """
+    count, labels = components or graph.connected_components()
+    sizes = np.bincount(labels, minlength=count)
+    return NodeMetrics(graph.node_ids, {
+        'pagerank_scaled': (graph.pagerank() * len(graph)).tolist(),
+        'eigenvector_centrality': graph.eigenvector_centrality().tolist(),
+        'component_size': sizes[labels].tolist(),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sparse-matrix analytics for the hypergraph')
+    parser.add_argument('hypergraph', nargs='?', default=DEFAULT_HYPERGRAPH_PATH,
+                        help='.json snapshot or edge table file')
+    parser.add_argument('--top', type=int, default=10, help='Nodes to show per metric')
+    parser.add_argument('--write', action='store_true',
+                        help='Store pagerank_scaled, eigenvector_centrality and component_size '
+                             'in hypergraph_metrics (DATABASE_URL or MCP)')
+    args = parser.parse_args()
+
+    graph = SparseGraph.load(args.hypergraph)
+    print(f"✓ Loaded {len(graph)} nodes and {graph.edge_count} edges "
+          f"({len(graph.edge_types)} edge types)")
+
+    count, labels = graph.connected_components()
+    metrics = graph_metrics(graph, (count, labels))
+    sizes = np.bincount(labels)
+    print(f"\nWeakly connected components: {count} (largest {sizes.max() if count else 0} nodes)")
+    for name in ('pagerank_scaled', 'eigenvector_centrality'):
+        print(f"\nTop {args.top} by {name}:")
+        for node_id, value in graph.top(np.asarray(metrics.columns[name]), args.top):
+            print(f"  {node_id}: {value:.6f}")
+
+    if args.write:
+        backend = create_backend()
+        try:
+            run_id = write_metrics(backend, metrics, {'pagerank_scale': len(graph)})
+        except DatabaseError as e:
+            print(f"\n✗ Writing metrics failed: {e}")
+            return 1
+        finally:
+            backend.close()
+        print(f"\n✓ Wrote {len(metrics) * len(metrics.names)} rows to hypergraph_metrics (run {run_id})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
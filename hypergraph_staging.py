@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Staging tables for zero-downtime hypergraph publishes
+A sync first loads every row into the shadow tables nodes_staging and
+edges_staging, batch by batch, without touching the live tables. Once the
+staging tables are complete they are merged into nodes and edges in a
+single transaction, so readers see either the previous graph or the new
+one and never a half-loaded state
+
+The publish merges instead of renaming tables: hypergraph_metrics and
+recommendations hold foreign keys to the live nodes and edges, and a
+rename would carry those keys along to the old tables. Unchanged rows are
+skipped, so the publish only locks the rows that actually change.
+
+The staging tables have no constraints, so load batches can run in any
+order and a retried batch that had in fact committed only adds duplicates,
+which the publish ignores. A failed load leaves the live tables untouched;
+a failed publish leaves the staging tables loaded, so it can be retried on
+its own (see publish_statements).
+"""
+
+from hypergraph_bulk_load import merge_statements
+from hypergraph_diff import EDGE_ROWS, NODE_ROWS
+from hypergraph_stream import batched
+
+NODES_STAGING = 'nodes_staging'
+EDGES_STAGING = 'edges_staging'
+
+PREPARE_STAGING = [
+    f"""CREATE TABLE IF NOT EXISTS {NODES_STAGING} (
+        id TEXT, type TEXT, name TEXT, metadata JSONB
+    );""",
+    f"""CREATE TABLE IF NOT EXISTS {EDGES_STAGING} (
+        source TEXT, target TEXT, type TEXT, metadata JSONB, weight FLOAT
+    );""",
+    f"CREATE INDEX IF NOT EXISTS {NODES_STAGING}_id_idx ON {NODES_STAGING} (id);",
+    f"""CREATE INDEX IF NOT EXISTS {EDGES_STAGING}_key_idx
+        ON {EDGES_STAGING} (source, target, type);""",
+    f"TRUNCATE {NODES_STAGING}, {EDGES_STAGING};",
+]
+
+CLEAR_STAGING = f"TRUNCATE {NODES_STAGING}, {EDGES_STAGING};"
+
+# Refuses to publish unless every expected row reached staging; counting
+# distinct keys lets duplicates from retried batches through
+CHECK_STAGING = f"""DO $$
+DECLARE
+    staged_nodes BIGINT;
+    staged_edges BIGINT;
+BEGIN
+    SELECT COUNT(DISTINCT id) INTO staged_nodes FROM {NODES_STAGING};
+    SELECT COUNT(*) INTO staged_edges
+    FROM (SELECT DISTINCT source, target, type FROM {EDGES_STAGING}) k;
+    IF staged_nodes <> {{nodes}} OR staged_edges <> {{edges}} THEN
+        RAISE EXCEPTION 'staging incomplete: % of {{nodes}} nodes, % of {{edges}} edges',
+            staged_nodes, staged_edges;
+    END IF;
+END $$;"""
+
+
+STAGE_NODES = f"""INSERT INTO {NODES_STAGING} (id, type, name, metadata)
+SELECT v.id, v.type, v.name, v.metadata FROM {NODE_ROWS};"""
+
+STAGE_EDGES = f"""INSERT INTO {EDGES_STAGING} (source, target, type, metadata, weight)
+SELECT v.source, v.target, v.type, v.metadata, v.weight FROM {EDGE_ROWS};"""
+
+
+def staging_node_sql(rows):
+    """INSERT statement for node_row() dicts into nodes_staging"""
+    return STAGE_NODES, (list(rows),)
+
+
+def staging_edge_sql(rows):
+    """INSERT statement for edge_row() dicts into edges_staging"""
+    return STAGE_EDGES, (list(rows),)
+
+
+def publish_statements(node_count, edge_count, prune=True):
+    """Statements that publish the staging tables; run them as one transaction
+
+    node_count and edge_count are the distinct rows the load should have
+    staged. The first statement aborts the transaction if staging holds
+    fewer, so a partial load can never be published. The merge is
+    idempotent, so a publish whose outcome is unknown can simply be sent
+    again.
+    """
+    statements = [CHECK_STAGING.format(nodes=int(node_count), edges=int(edge_count)),
+                  f"ANALYZE {NODES_STAGING};", f"ANALYZE {EDGES_STAGING};"]
+    statements += [sql + ';' for _, sql in merge_statements(NODES_STAGING, EDGES_STAGING, prune)]
+    return statements
+
+
+def staging_batches(rows, to_sql, batch_size):
+    """Yield (sql, row_count) for each batch of encoded rows (any iterable)"""
+    for batch in batched(rows, batch_size):
+        yield to_sql(batch), len(batch)
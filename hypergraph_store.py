@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Indexed in-memory store for the Skin Zone hypergraph
+Loads hypergraph_data.json once and keeps hash indexes so node/edge lookups
+and updates are O(1) instead of a linear scan over hypergraph['nodes']
+"""
+
+import json
+import os
+from collections import defaultdict
+
+DEFAULT_HYPERGRAPH_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'hypergraph_data.json'
+)
+
+
+def edge_key(edge):
+    """Return the (source, target, type) identity of an edge dict"""
+    return (edge['source'], edge['target'], edge['type'])
+
+
+def _as_dict(record):
+    # Records may be plain dicts or dict-like objects (slotted or lazily
+    # decoded records) that provide to_dict() for serialization
+    return record if isinstance(record, dict) else record.to_dict()
+
+
+class HypergraphStore:
+    """Hypergraph nodes and edges with id, type, edge-key and adjacency indexes
+
+    Nodes and edges are the same plain dicts found in hypergraph_data.json,
+    so callers can keep mutating them directly; only the identity fields
+    (node 'id'/'type', edge 'source'/'target'/'type') must go through the
+    store so the indexes stay consistent.
+    """
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.metadata = data.get('metadata', {})
+        self._nodes = {}
+        self._nodes_by_type = defaultdict(dict)
+        self._edges = {}
+        self._out = defaultdict(lambda: defaultdict(dict))
+        self._in = defaultdict(lambda: defaultdict(dict))
+        # Edges whose (source, target, type) repeats an earlier edge in the
+        # loaded file. They are kept so a load/save round trip is lossless.
+        self.duplicate_edges = []
+        # (path, file identity) of the snapshot this store was loaded from;
+        # set by HypergraphLog so save() can detect a concurrent writer
+        self.snapshot_source = None
+
+        for node in data.get('nodes', []):
+            self.add_node(node)
+        for edge in data.get('edges', []):
+            if edge_key(edge) in self._edges:
+                self.duplicate_edges.append(edge)
+            else:
+                self.add_edge(edge)
+
+    @classmethod
+    def load(cls, filepath=DEFAULT_HYPERGRAPH_PATH):
+        """Load the current hypergraph: the JSON snapshot plus pending WAL records"""
+        # hypergraph_wal builds on this module, so it is imported late
+        from hypergraph_wal import HypergraphLog
+        return HypergraphLog(filepath).open()
+
+    @classmethod
+    def load_snapshot(cls, filepath=DEFAULT_HYPERGRAPH_PATH):
+        """Load a store from the JSON snapshot alone, ignoring any WAL"""
+        with open(filepath, 'r') as f:
+            return cls(json.load(f))
+
+    def save(self, filepath=DEFAULT_HYPERGRAPH_PATH):
+        """Write the store out as the hypergraph_data.json snapshot
+
+        The new snapshot replaces the WAL next to it (a compaction), so the
+        store must have been loaded with load(). Raises ValueError if WAL
+        records were appended, or the snapshot rewritten, after it was loaded.
+        """
+        from hypergraph_wal import HypergraphLog
+        HypergraphLog(filepath).save(self)
+
+    def to_dict(self):
+        """Return the hypergraph as a {'metadata', 'nodes', 'edges'} dict"""
+        return {
+            'metadata': self.metadata,
+            'nodes': [_as_dict(node) for node in self._nodes.values()],
+            'edges': [_as_dict(edge) for edge in self._edges.values()]
+                     + [_as_dict(edge) for edge in self.duplicate_edges],
+        }
+
+    def refresh_counts(self):
+        """Set metadata node_count/edge_count from the current contents"""
+        self.metadata['node_count'] = self.node_count
+        self.metadata['edge_count'] = self.edge_count
+
+    # ------------------------------------------------------------------
+    # Nodes
+    # ------------------------------------------------------------------
+
+    @property
+    def node_count(self):
+        return len(self._nodes)
+
+    @property
+    def edge_count(self):
+        return len(self._edges) + len(self.duplicate_edges)
+
+    def nodes(self):
+        """Iterate over all node dicts in insertion order"""
+        return iter(self._nodes.values())
+
+    def has_node(self, node_id):
+        return node_id in self._nodes
+
+    def get_node(self, node_id, default=None):
+        return self._nodes.get(node_id, default)
+
+    def nodes_of_type(self, node_type):
+        """Return the node dicts of one type"""
+        return list(self._nodes_by_type.get(node_type, {}).values())
+
+    def node_types(self):
+        return [t for t, nodes in self._nodes_by_type.items() if nodes]
+
+    def add_node(self, node):
+        """Add a node dict; raises ValueError if the id is already present"""
+        node_id = node['id']
+        if node_id in self._nodes:
+            raise ValueError(f"Node already exists: {node_id}")
+        self._nodes[node_id] = node
+        self._nodes_by_type[node.get('type')][node_id] = node
+        return node
+
+    def add_nodes_if_absent(self, nodes):
+        """Add every node whose id is not present yet; return the added nodes
+
+        Runs in time linear in the batch size, and ids repeated inside the
+        batch are only added once.
+        """
+        added = []
+        for node in nodes:
+            if node['id'] not in self._nodes:
+                added.append(self.add_node(node))
+        return added
+
+    def update_node(self, node_id, fields):
+        """Merge fields into an existing node; raises KeyError if missing"""
+        node = self._nodes[node_id]
+        if 'id' in fields and fields['id'] != node_id:
+            raise ValueError(f"Cannot change node id: {node_id}")
+        if 'type' in fields and fields['type'] != node.get('type'):
+            del self._nodes_by_type[node.get('type')][node_id]
+            self._nodes_by_type[fields['type']][node_id] = node
+        node.update(fields)
+        return node
+
+    def upsert_node(self, node):
+        """Update the node if its id exists, otherwise add it"""
+        if node['id'] in self._nodes:
+            return self.update_node(node['id'], node)
+        return self.add_node(node)
+
+    def remove_node(self, node_id):
+        """Remove a node and every edge touching it"""
+        node = self._nodes.pop(node_id)
+        del self._nodes_by_type[node.get('type')][node_id]
+        for edge in list(self.out_edges(node_id)) + list(self.in_edges(node_id)):
+            if edge_key(edge) in self._edges:
+                self.remove_edge(*edge_key(edge))
+        self._out.pop(node_id, None)
+        self._in.pop(node_id, None)
+        if self.duplicate_edges:
+            self.duplicate_edges = [
+                e for e in self.duplicate_edges
+                if node_id not in (e['source'], e['target'])
+            ]
+        return node
+
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+
+    def edges(self):
+        """Iterate over all indexed edge dicts in insertion order"""
+        return iter(self._edges.values())
+
+    def has_edge(self, source, target, edge_type):
+        return (source, target, edge_type) in self._edges
+
+    def get_edge(self, source, target, edge_type, default=None):
+        return self._edges.get((source, target, edge_type), default)
+
+    def add_edge(self, edge):
+        """Add an edge dict; raises ValueError if the triple is already present"""
+        key = edge_key(edge)
+        if key in self._edges:
+            raise ValueError(f"Edge already exists: {key}")
+        source, target, edge_type = key
+        self._edges[key] = edge
+        self._out[source][edge_type][target] = edge
+        self._in[target][edge_type][source] = edge
+        return edge
+
+    def add_edges_if_absent(self, edges):
+        """Add every edge whose (source, target, type) is not present yet
+
+        Returns the added edges. Runs in time linear in the batch size and
+        never creates a duplicate triple, including triples repeated inside
+        the batch itself.
+        """
+        added = []
+        for edge in edges:
+            if edge_key(edge) not in self._edges:
+                added.append(self.add_edge(edge))
+        return added
+
+    def update_edge(self, source, target, edge_type, fields):
+        """Merge fields into an existing edge; raises KeyError if missing"""
+        edge = self._edges[(source, target, edge_type)]
+        for field in ('source', 'target', 'type'):
+            if field in fields and fields[field] != edge[field]:
+                raise ValueError(f"Cannot change edge {field}: {edge_key(edge)}")
+        edge.update(fields)
+        return edge
+
+    def upsert_edge(self, edge):
+        """Update the edge if its triple exists, otherwise add it"""
+        if edge_key(edge) in self._edges:
+            return self.update_edge(*edge_key(edge), edge)
+        return self.add_edge(edge)
+
+    def remove_edge(self, source, target, edge_type):
+        """Remove an edge by its (source, target, type) triple"""
+        edge = self._edges.pop((source, target, edge_type))
+        del self._out[source][edge_type][target]
+        del self._in[target][edge_type][source]
+        return edge
+
+    def out_edges(self, node_id, edge_type=None):
+        """Return edges leaving node_id, optionally of one type"""
+        by_type = self._out.get(node_id, {})
+        if edge_type is not None:
+            return list(by_type.get(edge_type, {}).values())
+        return [e for edges in by_type.values() for e in edges.values()]
+
+    def in_edges(self, node_id, edge_type=None):
+        """Return edges entering node_id, optionally of one type"""
+        by_type = self._in.get(node_id, {})
+        if edge_type is not None:
+            return list(by_type.get(edge_type, {}).values())
+        return [e for edges in by_type.values() for e in edges.values()]
+
+    def successors(self, node_id, edge_type=None):
+        """Return target ids of edges leaving node_id"""
+        return [e['target'] for e in self.out_edges(node_id, edge_type)]
+
+    def predecessors(self, node_id, edge_type=None):
+        """Return source ids of edges entering node_id"""
+        return [e['source'] for e in self.in_edges(node_id, edge_type)]
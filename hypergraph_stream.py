@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Streaming reader and writer for hypergraph_data.json
+The reader yields nodes and edges one at a time from the existing file
+layout without loading the whole document, and the writer emits them
+incrementally in the same format json.dump(..., indent=2) produces, so
+memory use stays constant regardless of file size
+"""
+
+import json
+import re
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_SECTION_KINDS = {'nodes': 'node', 'edges': 'edge'}
+
+
+class _Scanner:
+    """Chunked character buffer with JSON value decoding at the cursor"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop consumed text so the buffer never grows past one value + chunk
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} in hypergraph stream")
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value at the cursor"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer end may continue in the
+            # next chunk, so only accept it once more input (or EOF) is seen
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_hypergraph(f, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (kind, value) pairs from a hypergraph JSON file object
+
+    kind is 'node' or 'edge' for each element of the 'nodes' and 'edges'
+    arrays, and the key name for any other top-level entry such as
+    'metadata'. Items come out in file order.
+    """
+    scanner = _Scanner(f, chunk_size)
+    scanner.expect('{')
+    if scanner.peek() == '}':
+        return
+    while True:
+        key = scanner.value()
+        scanner.expect(':')
+        kind = _SECTION_KINDS.get(key)
+        if kind is not None and scanner.peek() == '[':
+            scanner.expect('[')
+            if scanner.peek() == ']':
+                scanner.pos += 1
+            else:
+                while True:
+                    yield kind, scanner.value()
+                    if scanner.peek() == ',':
+                        scanner.pos += 1
+                        continue
+                    scanner.expect(']')
+                    break
+        else:
+            yield key, scanner.value()
+        if scanner.peek() == ',':
+            scanner.pos += 1
+            continue
+        scanner.expect('}')
+        return
+
+
+def _iter_kind(filepath, wanted, chunk_size):
+    with open(filepath, 'r') as f:
+        seen = False
+        for kind, value in iter_hypergraph(f, chunk_size):
+            if kind == wanted:
+                seen = True
+                yield value
+            elif seen:
+                # The section is contiguous, so nothing more to read
+                return
+
+
+def iter_nodes(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield node dicts from a hypergraph JSON file one at a time"""
+    return _iter_kind(filepath, 'node', chunk_size)
+
+
+def iter_edges(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield edge dicts from a hypergraph JSON file one at a time"""
+    return _iter_kind(filepath, 'edge', chunk_size)
+
+
+def read_metadata(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return the 'metadata' section, scanning past nodes/edges if needed"""
+    with open(filepath, 'r') as f:
+        for kind, value in iter_hypergraph(f, chunk_size):
+            if kind == 'metadata':
+                return value
+    return {}
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items from any iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _indented(value, indent, depth):
+    text = json.dumps(value, indent=indent)
+    return text.replace('\n', '\n' + ' ' * (indent * depth))
+
+
+class HypergraphWriter:
+    """Incrementally write a hypergraph JSON file
+
+    Sections are written in call order: metadata may come first or last
+    (for example once node_count/edge_count are known), and all nodes must
+    be written before the first edge. Writing metadata first, then nodes,
+    then edges produces the same bytes as json.dump(data, f, indent=2).
+
+        with HypergraphWriter(open('out.json', 'w')) as writer:
+            writer.write_metadata(metadata)
+            for node in nodes:
+                writer.write_node(node)
+            for edge in edges:
+                writer.write_edge(edge)
+    """
+
+    def __init__(self, f, indent=2):
+        self.f = f
+        self.indent = indent
+        self.node_count = 0
+        self.edge_count = 0
+        self._written = set()
+        self._open_section = None
+        self._section_items = 0
+
+    def _write_key(self, key):
+        self.f.write('{\n' if not self._written else ',\n')
+        self.f.write(' ' * self.indent + json.dumps(key) + ': ')
+        self._written.add(key)
+
+    def _close_section(self):
+        if self._open_section is None:
+            return
+        if self._section_items:
+            self.f.write('\n' + ' ' * self.indent + ']')
+        else:
+            self.f.write(']')
+        self._open_section = None
+
+    def _write_item(self, section, item):
+        if self._open_section != section:
+            if section in self._written:
+                raise ValueError(f"Section '{section}' was already closed")
+            self._close_section()
+            self._write_key(section)
+            self.f.write('[')
+            self._open_section = section
+            self._section_items = 0
+        self.f.write(',\n' if self._section_items else '\n')
+        self.f.write(' ' * (self.indent * 2) + _indented(item, self.indent, 2))
+        self._section_items += 1
+
+    def write_section(self, key, value):
+        """Write a whole top-level entry such as 'metadata'"""
+        if key in self._written:
+            raise ValueError(f"Section '{key}' was already written")
+        self._close_section()
+        self._write_key(key)
+        self.f.write(_indented(value, self.indent, 1))
+
+    def write_metadata(self, metadata):
+        self.write_section('metadata', metadata)
+
+    def write_node(self, node):
+        if 'edges' in self._written:
+            raise ValueError("All nodes must be written before the first edge")
+        self._write_item('nodes', node)
+        self.node_count += 1
+
+    def write_edge(self, edge):
+        self._write_item('edges', edge)
+        self.edge_count += 1
+
+    def close(self):
+        """Finish the document; empty nodes/edges arrays are emitted if unused"""
+        self._close_section()
+        for section in ('nodes', 'edges'):
+            if section not in self._written:
+                self._write_key(section)
+                self.f.write('[]')
+        self.f.write('\n}' if self._written else '{}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        self.f.close()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Referential-integrity and duplicate validator for Skin Zone hypergraph snapshots
+One hash-indexed pass over nodes and then edges finds missing fields,
+duplicate node ids, dangling edge endpoints and duplicate
+(source, target, type) triples, and produces a machine-readable report.
+Repair mode drops the bad rows (merging duplicate edges into the first
+occurrence) so they never reach the database
+
+Usage:
+    python3 hypergraph_validate.py [hypergraph_data.json] [--report report.json]
+    python3 hypergraph_validate.py hypergraph_data.json --repair --output repaired.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+from hypergraph_store import DEFAULT_HYPERGRAPH_PATH, HypergraphStore
+from hypergraph_stream import iter_hypergraph
+from hypergraph_wal import HypergraphLog, write_snapshot
+
+NODE_REQUIRED = ('id', 'type', 'name')
+EDGE_REQUIRED = ('source', 'target', 'type')
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+def _issue(report, code, severity, kind, index, message, **extra):
+    issue = {'code': code, 'severity': severity, 'kind': kind, 'index': index, 'message': message}
+    issue.update(extra)
+    report['issues'].append(issue)
+
+
+def validate_items(items):
+    """Validate a stream of (kind, value) pairs as yielded by iter_hypergraph
+
+    Edges must follow the nodes they reference, as in the snapshot layout.
+    Memory use is one set of node ids plus one set of edge keys. The report
+    lists every issue, and report['drop'] holds the node and edge positions
+    that repair() removes; report['merge'] maps the position of the first
+    edge of each duplicated triple to the positions of its repeats.
+    """
+    report = {
+        'valid': True,
+        'node_count': 0,
+        'edge_count': 0,
+        'issues': [],
+        'summary': {},
+        'drop': {'nodes': [], 'edges': []},
+        'merge': {},
+    }
+    node_ids = set()
+    edge_first = {}
+
+    for kind, value in items:
+        if kind == 'node':
+            index = report['node_count']
+            report['node_count'] += 1
+            missing = [f for f in NODE_REQUIRED if not isinstance(value.get(f), str)]
+            if missing:
+                _issue(report, 'node_missing_field', ERROR, 'node', index,
+                       f"Node {index} missing {', '.join(missing)}",
+                       id=value.get('id'), fields=missing)
+                report['drop']['nodes'].append(index)
+                continue
+            if value['id'] in node_ids:
+                _issue(report, 'duplicate_node', ERROR, 'node', index,
+                       f"Duplicate node id: {value['id']}", id=value['id'])
+                report['drop']['nodes'].append(index)
+                continue
+            node_ids.add(value['id'])
+
+        elif kind == 'edge':
+            index = report['edge_count']
+            report['edge_count'] += 1
+            missing = [f for f in EDGE_REQUIRED if not isinstance(value.get(f), str)]
+            if missing:
+                _issue(report, 'edge_missing_field', ERROR, 'edge', index,
+                       f"Edge {index} missing {', '.join(missing)}", fields=missing)
+                report['drop']['edges'].append(index)
+                continue
+            key = (value['source'], value['target'], value['type'])
+            dangling = [f for f in ('source', 'target') if value[f] not in node_ids]
+            if dangling:
+                _issue(report, 'dangling_edge', ERROR, 'edge', index,
+                       f"Edge {key[0]} -[{key[2]}]-> {key[1]} references missing "
+                       f"{' and '.join(dangling)} node", key=list(key), fields=dangling)
+                report['drop']['edges'].append(index)
+                continue
+            if key in edge_first:
+                _issue(report, 'duplicate_edge', ERROR, 'edge', index,
+                       f"Duplicate edge {key[0]} -[{key[2]}]-> {key[1]} "
+                       f"(first at {edge_first[key]})", key=list(key), first=edge_first[key])
+                report['drop']['edges'].append(index)
+                report['merge'].setdefault(edge_first[key], []).append(index)
+                continue
+            edge_first[key] = index
+            weight = value.get('weight')
+            if weight is not None and (isinstance(weight, bool) or not isinstance(weight, (int, float))):
+                _issue(report, 'invalid_weight', WARNING, 'edge', index,
+                       f"Edge {key[0]} -[{key[2]}]-> {key[1]} has non-numeric weight {weight!r}",
+                       key=list(key))
+            if key[0] == key[1]:
+                _issue(report, 'self_loop', WARNING, 'edge', index,
+                       f"Edge {key[0]} -[{key[2]}]-> {key[1]} is a self-loop", key=list(key))
+
+    report['summary'] = dict(Counter(issue['code'] for issue in report['issues']))
+    report['valid'] = not any(issue['severity'] == ERROR for issue in report['issues'])
+    return report
+
+
+def _data_items(data):
+    for node in data.get('nodes', []):
+        yield 'node', node
+    for edge in data.get('edges', []):
+        yield 'edge', edge
+
+
+def validate(data):
+    """Validate an in-memory {'metadata', 'nodes', 'edges'} dict"""
+    return validate_items(_data_items(data))
+
+
+def validate_file(filepath=DEFAULT_HYPERGRAPH_PATH):
+    """Validate a hypergraph JSON file by streaming it"""
+    with open(filepath, 'r') as f:
+        return validate_items(iter_hypergraph(f))
+
+
+def repair(data, report=None):
+    """Return a copy of data with the rows in report['drop'] removed
+
+    Duplicate edges are folded into the first occurrence: fields the first
+    edge lacks are taken from its repeats, so no information is lost.
+    """
+    report = report or validate(data)
+    drop_nodes = set(report['drop']['nodes'])
+    drop_edges = set(report['drop']['edges'])
+    edges = data.get('edges', [])
+
+    repaired_edges = []
+    for index, edge in enumerate(edges):
+        if index in drop_edges:
+            continue
+        repeats = report['merge'].get(index) or report['merge'].get(str(index))
+        if repeats:
+            merged = {}
+            for repeat in reversed(repeats):
+                merged.update(edges[repeat])
+            merged.update(edge)
+            edge = merged
+        repaired_edges.append(edge)
+
+    repaired = dict(data)
+    repaired['nodes'] = [n for i, n in enumerate(data.get('nodes', [])) if i not in drop_nodes]
+    repaired['edges'] = repaired_edges
+    if 'metadata' in data:
+        repaired['metadata'] = dict(data['metadata'])
+        repaired['metadata']['node_count'] = len(repaired['nodes'])
+        repaired['metadata']['edge_count'] = len(repaired['edges'])
+    return repaired
+
+
+def load_valid(filepath=DEFAULT_HYPERGRAPH_PATH):
+    """Load the snapshot and its pending WAL records, dropping rows the validator rejects
+
+    The report is printed when rows are dropped. Every loader that feeds a
+    database or the metrics goes through this.
+    """
+    data = HypergraphStore.load(filepath).to_dict()
+    report = validate(data)
+    if not report['valid']:
+        print_report(report, limit=0)
+        data = repair(data, report)
+    return data
+
+
+def print_report(report, limit=20):
+    """Print a human-readable summary of a validation report"""
+    status = "✓ Hypergraph valid" if report['valid'] else "✗ Hypergraph has errors"
+    print(status)
+    print(f"  Nodes: {report['node_count']}  Edges: {report['edge_count']}")
+    for code, count in sorted(report['summary'].items()):
+        print(f"  {code}: {count}")
+    for issue in report['issues'][:limit]:
+        print(f"    [{issue['severity']}] {issue['message']}")
+    if len(report['issues']) > limit:
+        print(f"    ... {len(report['issues']) - limit} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate a hypergraph snapshot')
+    parser.add_argument('hypergraph', nargs='?', default=DEFAULT_HYPERGRAPH_PATH)
+    parser.add_argument('--report', help='Write the JSON report to this path')
+    parser.add_argument('--repair', action='store_true',
+                        help='Drop invalid rows and merge duplicate edges')
+    parser.add_argument('--output', help='Where to write the repaired snapshot (default: in place)')
+    args = parser.parse_args()
+
+    if args.repair:
+        # Repair the current state, WAL records included, not just the file
+        store = HypergraphStore.load(args.hypergraph)
+        data = store.to_dict()
+        report = validate(data)
+    else:
+        report = validate_file(args.hypergraph)
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"  Report written to {args.report}")
+
+    if args.repair and not report['valid']:
+        repaired = HypergraphStore(repair(data, report))
+        output = args.output or args.hypergraph
+        if os.path.abspath(output) == os.path.abspath(args.hypergraph):
+            # Replaces the snapshot atomically and folds in the WAL; refused
+            # if another writer changed the hypergraph since it was loaded
+            repaired.snapshot_source = store.snapshot_source
+            HypergraphLog(args.hypergraph).save(repaired)
+        else:
+            # A standalone copy has no WAL of its own
+            repaired.metadata.pop('wal_seq', None)
+            write_snapshot(repaired, output)
+        print(f"✓ Repaired snapshot written to {output} "
+              f"(dropped {len(report['drop']['nodes'])} nodes, {len(report['drop']['edges'])} edges)")
+        return 0
+    return 0 if report['valid'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Write-ahead log for Skin Zone hypergraph mutations
+Changesets are appended to a WAL segment next to hypergraph_data.json
+instead of rewriting the whole snapshot, and are folded back into a new
+snapshot by periodic compaction
+
+WAL layout: one record per line, "<crc32 hex> <json>\n", where the JSON is
+{"seq": N, "changeset": {...}}. A torn or corrupt record at the tail (from a
+crash mid-append) fails its checksum and is dropped on replay. The snapshot
+records the last sequence number it contains in metadata['wal_seq'], so a
+crash between writing a compacted snapshot and resetting the WAL never
+replays a record twice.
+
+HypergraphStore.load() replays pending records and HypergraphStore.save()
+writes a compacted snapshot, so every reader and writer going through the
+store sees the same state. Code that streams the snapshot file directly
+calls HypergraphLog.compact_pending() first.
+
+Usage:
+    python3 hypergraph_wal.py append changeset.json [--hypergraph PATH]
+    python3 hypergraph_wal.py compact [--hypergraph PATH]
+    python3 hypergraph_wal.py status [--hypergraph PATH]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import sys
+import zlib
+from contextlib import contextmanager
+
+from hypergraph_changeset import apply_changeset, load_changeset
+from hypergraph_store import DEFAULT_HYPERGRAPH_PATH, HypergraphStore
+
+DEFAULT_COMPACT_EVERY = 1000
+
+
+def encode_record(seq, changeset):
+    """Encode one WAL record line"""
+    payload = json.dumps({'seq': seq, 'changeset': changeset}, separators=(',', ':'))
+    crc = zlib.crc32(payload.encode('utf-8'))
+    return f"{crc:08x} {payload}\n".encode('utf-8')
+
+
+def decode_record(line):
+    """Decode one WAL record line; return None if it is torn or corrupt"""
+    if not line.endswith(b'\n'):
+        return None
+    try:
+        crc, payload = line.rstrip(b'\n').split(b' ', 1)
+        if int(crc, 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def write_snapshot(store, filepath):
+    """Atomically replace the JSON snapshot with the store contents"""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(store.to_dict(), f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+class HypergraphLog:
+    """A HypergraphStore backed by a JSON snapshot plus an append-only WAL
+
+    Several processes may append to the same log: every append takes an
+    exclusive lock on '<snapshot>.lock' and first replays records written
+    by other processes, so each changeset applies on top of the latest state.
+    """
+
+    def __init__(self, snapshot_path=DEFAULT_HYPERGRAPH_PATH, wal_path=None,
+                 compact_every=DEFAULT_COMPACT_EVERY, snapshot_loader=None):
+        self.snapshot_path = snapshot_path
+        # Builds the store from the snapshot file (e.g. with compact records)
+        self.snapshot_loader = snapshot_loader or HypergraphStore.load_snapshot
+        self.wal_path = wal_path or f"{snapshot_path}.wal"
+        self.lock_path = f"{snapshot_path}.lock"
+        self.compact_every = compact_every
+        self.store = None
+        self.seq = 0
+        self.pending_records = 0
+        self._snapshot_id = None
+        self._wal_id = None
+        self._offset = 0
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _file_id(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _load_snapshot(self):
+        self.store = self.snapshot_loader(self.snapshot_path)
+        self.seq = self.store.metadata.get('wal_seq', 0)
+        self.pending_records = 0
+        self._snapshot_id = self._file_id(self.snapshot_path)
+        self._wal_id = None
+        self._offset = 0
+
+    def _replay(self, repair=False):
+        """Apply WAL records not yet seen by this process
+
+        With repair=True (caller holds the lock) a torn tail is truncated so
+        the next append starts on a clean record boundary.
+        """
+        if self.store is None or self._file_id(self.snapshot_path) != self._snapshot_id:
+            self._load_snapshot()
+        if not os.path.exists(self.wal_path):
+            return
+        wal_ino = os.stat(self.wal_path).st_ino
+        if wal_ino != self._wal_id:
+            self._wal_id = wal_ino
+            self._offset = 0
+            self.pending_records = 0
+
+        with open(self.wal_path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                record = decode_record(line)
+                if record is None:
+                    if repair:
+                        f.close()
+                        os.truncate(self.wal_path, self._offset)
+                    break
+                self._offset += len(line)
+                self.pending_records += 1
+                if record['seq'] <= self.seq:
+                    continue
+                apply_changeset(self.store, record['changeset'])
+                self.seq = record['seq']
+                # The store now holds every record up to seq; save() relies on it
+                self.store.metadata['wal_seq'] = self.seq
+
+    def _last_seq(self):
+        """Highest sequence number in the WAL, 0 when it has no records"""
+        last = 0
+        if os.path.exists(self.wal_path):
+            with open(self.wal_path, 'rb') as f:
+                for line in f:
+                    record = decode_record(line)
+                    if record is None:
+                        break
+                    last = record['seq']
+        return last
+
+    def open(self):
+        """Load the snapshot, replay the WAL and return the current store"""
+        if os.path.exists(self.wal_path):
+            # Under the lock, so a compaction cannot swap the snapshot mid-replay
+            with self._locked():
+                self._replay(repair=True)
+        else:
+            self._replay()
+        self._stamp(self.store)
+        return self.store
+
+    def _stamp(self, store):
+        # Which snapshot file the store was built from; save() compares it
+        store.snapshot_source = (os.path.abspath(self.snapshot_path), self._snapshot_id)
+
+    def append(self, changeset):
+        """Apply a changeset and durably append it to the WAL
+
+        Returns the apply report. Only the encoded changeset is written, so
+        the I/O per update is proportional to the size of the change.
+        """
+        with self._locked():
+            self._replay(repair=True)
+            record = encode_record(self.seq + 1, changeset)
+            report = apply_changeset(self.store, changeset)
+            with open(self.wal_path, 'ab') as f:
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            self.seq += 1
+            self.store.metadata['wal_seq'] = self.seq
+            self._wal_id = os.stat(self.wal_path).st_ino
+            self._offset += len(record)
+            self.pending_records += 1
+            if self.compact_every and self.pending_records >= self.compact_every:
+                self._compact_locked()
+        return report
+
+    def compact(self):
+        """Fold the WAL into a new snapshot and start an empty WAL"""
+        with self._locked():
+            self._replay(repair=True)
+            self._compact_locked()
+
+    def compact_pending(self):
+        """Compact only if the WAL has records; return how many were folded in
+
+        Lets readers of the raw snapshot file (the streaming loaders) see
+        every appended changeset.
+        """
+        if not os.path.exists(self.wal_path):
+            return 0
+        with self._locked():
+            self._replay(repair=True)
+            pending = self.pending_records
+            if pending:
+                self._compact_locked()
+        return pending
+
+    def save(self, store):
+        """Write store as the new snapshot, replacing the WAL
+
+        store must contain every WAL record (HypergraphStore.load replays
+        them). Raises ValueError if records were appended or the snapshot
+        was rewritten (by another save or a compaction) after it was
+        loaded, since writing it would drop those changes.
+        """
+        with self._locked():
+            path, loaded_id = getattr(store, 'snapshot_source', None) or (None, None)
+            current_id = self._file_id(self.snapshot_path)
+            if path == os.path.abspath(self.snapshot_path) and current_id != loaded_id:
+                raise ValueError(
+                    f"{self.snapshot_path} was rewritten after the store was loaded; "
+                    f"reload it and reapply the changes before saving")
+            latest = self._last_seq()
+            seq = store.metadata.get('wal_seq', 0)
+            if latest > seq:
+                raise ValueError(
+                    f"{self.wal_path} has records up to {latest} that the store "
+                    f"(wal_seq {seq}) does not contain; reload it before saving")
+            write_snapshot(store, self.snapshot_path)
+            if os.path.exists(self.wal_path):
+                os.remove(self.wal_path)
+            self.store = None
+            self._snapshot_id = self._file_id(self.snapshot_path)
+            self._stamp(store)
+
+    def _compact_locked(self):
+        self.store.metadata['wal_seq'] = self.seq
+        write_snapshot(self.store, self.snapshot_path)
+        # The snapshot now contains every record up to self.seq, so the old
+        # WAL can be dropped; a crash before this point is covered by wal_seq.
+        if os.path.exists(self.wal_path):
+            os.remove(self.wal_path)
+        self._snapshot_id = self._file_id(self.snapshot_path)
+        self._wal_id = None
+        self._offset = 0
+        self.pending_records = 0
+        self._stamp(self.store)
+
+
+def load_store(snapshot_path=DEFAULT_HYPERGRAPH_PATH):
+    """Load the current hypergraph state (snapshot plus any WAL records)"""
+    return HypergraphLog(snapshot_path).open()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hypergraph write-ahead log tools')
+    parser.add_argument('command', choices=['append', 'compact', 'status'])
+    parser.add_argument('changeset', nargs='?', help='Changeset JSON file for append')
+    parser.add_argument('--hypergraph', default=DEFAULT_HYPERGRAPH_PATH,
+                        help='Path to hypergraph_data.json')
+    parser.add_argument('--compact-every', type=int, default=DEFAULT_COMPACT_EVERY,
+                        help='Compact after this many WAL records (0 disables)')
+    args = parser.parse_args()
+
+    log = HypergraphLog(args.hypergraph, compact_every=args.compact_every)
+
+    if args.command == 'append':
+        if not args.changeset:
+            parser.error('append requires a changeset file')
+        report = log.append(load_changeset(args.changeset))
+        print(f"✓ Appended changeset as WAL record {log.seq}")
+        print(f"  Nodes: +{report['nodes_added']} ~{report['nodes_updated']} -{report['nodes_deleted']}")
+        print(f"  Edges: +{report['edges_added']} ~{report['edges_updated']} -{report['edges_deleted']}")
+    elif args.command == 'compact':
+        log.compact()
+        print(f"✓ Compacted WAL into {args.hypergraph} (wal_seq {log.seq})")
+    else:
+        store = log.open()
+        print(f"Snapshot: {args.hypergraph}")
+        print(f"WAL records pending compaction: {log.pending_records}")
+        print(f"Last sequence number: {log.seq}")
+        print(f"Nodes: {store.node_count}  Edges: {store.edge_count}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
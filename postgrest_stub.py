@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Local PostgREST-compatible stub for exercising the Supabase sync scripts
+Serves the subset of /rest/v1 the sync code uses, keeping nodes and edges in
+memory: bulk POST (insert, or upsert with Prefer: resolution=merge-duplicates),
+PATCH and DELETE with eq/neq/in filters, and GET with offset/limit and
+Prefer: count=exact. Edge foreign keys are checked like the real schema
+(deleting a node cascades to its edges), and optional latency, failure rate
+and request size limit make throughput and retry behaviour measurable
+without a Supabase project. Edges are keyed by their id column, so a POST
+that repeats an id conflicts unless it is an upsert; --lost-rate answers
+some committed writes with 504 to check that retries do not duplicate rows
+
+Usage:
+    python3 postgrest_stub.py [--port 54321] [--latency 0.05] [--row-cost 0.0001]
+                              [--fail-rate 0.0] [--lost-rate 0.0] [--max-body 1000000]
+
+Then point the sync at it:
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=local python3 sync_supabase_async.py
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_PORT = 54321
+RESERVED_PARAMS = {'select', 'limit', 'offset', 'order', 'on_conflict', 'columns'}
+
+
+def parse_filters(query):
+    """PostgREST filters from a query string as (column, op, value) triples
+
+    Supports eq, neq and in; for in the value is a set of strings.
+    """
+    filters = []
+    for column, expression in parse_qsl(query, keep_blank_values=True):
+        if column in RESERVED_PARAMS:
+            continue
+        op, _, value = expression.partition('.')
+        if op == 'in':
+            value = set(next(csv.reader([value.strip('()')], quotechar='"'), []))
+        elif op not in ('eq', 'neq'):
+            raise ValueError(f"Unsupported filter operator: {op}")
+        filters.append((column, op, value))
+    return filters
+
+
+def matches(row, filters):
+    for column, op, value in filters:
+        stored = row.get(column)
+        stored = '' if stored is None else str(stored)
+        if op == 'eq' and stored != value:
+            return False
+        if op == 'neq' and stored == value:
+            return False
+        if op == 'in' and stored not in value:
+            return False
+    return True
+
+
+class StubDatabase:
+    """In-memory nodes and edges tables with the schema's key constraints"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.nodes = {}
+        self.edges = {}
+        self.requests = 0
+        self.rows_written = 0
+
+    def write(self, table, rows, upsert):
+        """Apply a bulk write; returns (status, error message or None)"""
+        with self.lock:
+            if table == 'nodes':
+                for row in rows:
+                    if row.get('id') in self.nodes and not upsert:
+                        return 409, f"duplicate key value violates unique constraint \"nodes_pkey\" ({row['id']})"
+                for row in rows:
+                    self.nodes[row['id']] = row
+            elif table == 'edges':
+                for row in rows:
+                    for field in ('source', 'target'):
+                        if row.get(field) not in self.nodes:
+                            return 409, (f"insert or update on table \"edges\" violates foreign key "
+                                         f"constraint \"edges_{field}_fkey\" ({row.get(field)})")
+                    if row.get('id') in self.edges and not upsert:
+                        return 409, f"duplicate key value violates unique constraint \"edges_pkey\" ({row['id']})"
+                for row in rows:
+                    row = {'id': str(uuid.uuid4()), **row}
+                    self.edges[row['id']] = row
+            else:
+                return 404, f"relation \"public.{table}\" does not exist"
+            self.rows_written += len(rows)
+            return 201, None
+
+    def _rows(self, table):
+        if table == 'nodes':
+            return list(self.nodes.values())
+        if table == 'edges':
+            return list(self.edges.values())
+        return None
+
+    def delete(self, table, filters=()):
+        with self.lock:
+            if table == 'nodes':
+                removed = {i for i, row in self.nodes.items() if matches(row, filters)}
+                for node_id in removed:
+                    del self.nodes[node_id]
+                # ON DELETE CASCADE
+                self.edges = {i: e for i, e in self.edges.items()
+                              if e.get('source') not in removed and e.get('target') not in removed}
+            elif table == 'edges':
+                self.edges = {i: e for i, e in self.edges.items() if not matches(e, filters)}
+            else:
+                return 404
+            return 204
+
+    def update(self, table, filters, values):
+        with self.lock:
+            rows = self._rows(table)
+            if rows is None:
+                return 404
+            for row in rows:
+                if matches(row, filters):
+                    row.update(values)
+            return 204
+
+    def select(self, table, filters=(), offset=0, limit=None):
+        """Return (matching rows for the requested window, total matches) or None"""
+        with self.lock:
+            rows = self._rows(table)
+            if rows is None:
+                return None
+            found = [row for row in rows if matches(row, filters)]
+            end = None if limit is None else offset + limit
+            return found[offset:end], len(found)
+
+    def count(self, table):
+        with self.lock:
+            if table == 'nodes':
+                return len(self.nodes)
+            if table == 'edges':
+                return len(self.edges)
+            return None
+
+
+def make_handler(db, latency=0.0, row_cost=0.0, fail_rate=0.0, lost_rate=0.0, max_body=None):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _table(self):
+            path = urlsplit(self.path).path
+            prefix = '/rest/v1/'
+            if not path.startswith(prefix):
+                return None
+            return path[len(prefix):].strip('/')
+
+        def _reply(self, status, body=None, headers=None):
+            payload = json.dumps(body).encode('utf-8') if body is not None else b''
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _error(self, status, message):
+            self._reply(status, {'code': str(status), 'message': message})
+
+        def _simulate(self, rows=0):
+            with db.lock:
+                db.requests += 1
+            if latency or row_cost:
+                time.sleep(latency + row_cost * rows)
+            return fail_rate and random.random() < fail_rate
+
+        def do_POST(self):
+            table = self._table()
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+            if max_body and length > max_body:
+                self._simulate()
+                self._error(413, f"Payload too large ({length} > {max_body} bytes)")
+                return
+            try:
+                rows = json.loads(body or b'[]')
+            except ValueError:
+                self._error(400, "Invalid JSON")
+                return
+            if isinstance(rows, dict):
+                rows = [rows]
+            if self._simulate(len(rows)):
+                self._error(503, "Simulated upstream failure")
+                return
+            prefer = self.headers.get('Prefer', '')
+            status, error = db.write(table, rows, 'merge-duplicates' in prefer)
+            if error:
+                self._error(status, error)
+            elif lost_rate and random.random() < lost_rate:
+                # Committed, but the client never hears so; a retry resends the rows
+                self._error(504, "Simulated gateway timeout after commit")
+            else:
+                self._reply(201)
+
+        def _drain(self):
+            # Clients may send a body (even "{}") with DELETE and GET
+            length = int(self.headers.get('Content-Length', 0))
+            if length:
+                self.rfile.read(length)
+
+        def _filters(self):
+            try:
+                return parse_filters(urlsplit(self.path).query)
+            except ValueError as e:
+                self._error(400, str(e))
+                return None
+
+        def do_DELETE(self):
+            self._drain()
+            filters = self._filters()
+            if filters is None:
+                return
+            if self._simulate():
+                self._error(503, "Simulated upstream failure")
+                return
+            status = db.delete(self._table(), filters)
+            self._reply(status) if status == 204 else self._error(status, "Unknown table")
+
+        def do_PATCH(self):
+            filters = self._filters()
+            length = int(self.headers.get('Content-Length', 0))
+            values = json.loads(self.rfile.read(length) or b'{}')
+            if filters is None:
+                return
+            if self._simulate(1):
+                self._error(503, "Simulated upstream failure")
+                return
+            status = db.update(self._table(), filters, values)
+            self._reply(status) if status == 204 else self._error(status, "Unknown table")
+
+        def do_GET(self):
+            self._drain()
+            table = self._table()
+            filters = self._filters()
+            if filters is None:
+                return
+            self._simulate()
+            params = dict(parse_qsl(urlsplit(self.path).query))
+            offset, limit = int(params.get('offset', 0)), params.get('limit')
+            limit = int(limit) if limit is not None else None
+            range_header = self.headers.get('Range')
+            if range_header and '-' in range_header:
+                first, _, last = range_header.partition('-')
+                offset, limit = int(first), int(last) - int(first) + 1
+            result = db.select(table, filters, offset, limit)
+            if result is None:
+                self._error(404, f"relation \"public.{table}\" does not exist")
+                return
+            rows, total = result
+            columns = params.get('select', '*')
+            if columns != '*':
+                names = columns.split(',')
+                rows = [{name: row.get(name) for name in names} for row in rows]
+            headers = {}
+            if 'count=exact' in self.headers.get('Prefer', ''):
+                end = offset + len(rows) - 1
+                headers['Content-Range'] = f"{offset}-{max(end, offset)}/{total}" if rows else f"*/{total}"
+            self._reply(200, rows, headers)
+
+    return Handler
+
+
+def serve(port=DEFAULT_PORT, **options):
+    """Start the stub in a background thread; returns (server, database)"""
+    db = StubDatabase()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(db, **options))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, db
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local PostgREST-compatible stub')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--row-cost', type=float, default=0.0, help='Seconds added per written row')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered 503')
+    parser.add_argument('--lost-rate', type=float, default=0.0,
+                        help='Fraction of applied writes answered 504 anyway')
+    parser.add_argument('--max-body', type=int, help='Reject request bodies larger than this with 413')
+    args = parser.parse_args()
+
+    server, db = serve(args.port, latency=args.latency, row_cost=args.row_cost,
+                       fail_rate=args.fail_rate, lost_rate=args.lost_rate, max_body=args.max_body)
+    print(f"✓ PostgREST stub listening on http://127.0.0.1:{args.port}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"  requests: {db.requests}  nodes: {len(db.nodes)}  edges: {len(db.edges)}")
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
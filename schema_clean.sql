@@ -191,6 +191,7 @@ CREATE INDEX IF NOT EXISTS idx_recommendations_source ON recommendations(source_
 CREATE INDEX IF NOT EXISTS idx_recommendations_target ON recommendations(target_node_id);
 CREATE INDEX IF NOT EXISTS idx_recommendations_type ON recommendations(recommendation_type);
 CREATE INDEX IF NOT EXISTS idx_recommendations_score ON recommendations(score DESC);
+CREATE INDEX IF NOT EXISTS idx_recommendations_lookup ON recommendations(source_node_id, recommendation_type, score DESC);
 CREATE TABLE IF NOT EXISTS price_history (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     supplier_id TEXT REFERENCES suppliers(id) ON DELETE CASCADE,
@@ -299,6 +300,18 @@ SELECT
 FROM nodes n
 LEFT JOIN edges e ON n.id = e.source OR n.id = e.target
 GROUP BY n.type;
+CREATE OR REPLACE VIEW v_node_metrics AS
+SELECT DISTINCT ON (m.node_id, m.metric_name)
+    m.node_id,
+    n.type AS node_type,
+    n.name AS node_name,
+    m.metric_name,
+    m.metric_value,
+    m.calculated_at
+FROM hypergraph_metrics m
+JOIN nodes n ON n.id = m.node_id
+WHERE m.edge_id IS NULL
+ORDER BY m.node_id, m.metric_name, m.calculated_at DESC;
 CREATE OR REPLACE FUNCTION calculate_node_centrality(node_id_param TEXT)
 RETURNS NUMERIC AS $$
 DECLARE
@@ -358,29 +371,48 @@ END;
 $$ LANGUAGE plpgsql;
 CREATE OR REPLACE FUNCTION find_shortest_path(source_id TEXT, target_id TEXT)
 RETURNS TABLE(path TEXT[], path_length INTEGER) AS $$
+DECLARE
+    level INTEGER := 0;
 BEGIN
-    -- This is a simplified version; for production, use pgRouting extension
+    -- Breadth-first, one level per iteration; each node is visited once, so
+    -- the cost is linear in the edges reached instead of exponential in the
+    -- depth. For many queries use hypergraph_paths.py, which keeps the
+    -- adjacency in memory.
+    IF to_regclass('pg_temp.shortest_path_visited') IS NULL THEN
+        CREATE TEMP TABLE shortest_path_visited (
+            node TEXT PRIMARY KEY,
+            parent TEXT,
+            depth INTEGER
+        ) ON COMMIT DROP;
+    END IF;
+    TRUNCATE shortest_path_visited;
+    INSERT INTO shortest_path_visited VALUES (source_id, NULL, 0);
+
+    WHILE level < 10
+        AND NOT EXISTS (SELECT 1 FROM shortest_path_visited WHERE node = target_id) LOOP
+        INSERT INTO shortest_path_visited (node, parent, depth)
+        SELECT DISTINCT ON (e.target) e.target, e.source, level + 1
+        FROM shortest_path_visited v
+        JOIN edges e ON e.source = v.node
+        WHERE v.depth = level
+        ON CONFLICT (node) DO NOTHING;
+        EXIT WHEN NOT FOUND;
+        level := level + 1;
+    END LOOP;
+
     RETURN QUERY
-    WITH RECURSIVE path_search AS (
-        SELECT 
-            ARRAY[source_id] AS path,
-            source_id AS current_node,
-            0 AS depth
+    WITH RECURSIVE walk AS (
+        SELECT v.node, v.parent, v.depth
+        FROM shortest_path_visited v
+        WHERE v.node = target_id
         UNION ALL
-        SELECT 
-            ps.path || e.target,
-            e.target,
-            ps.depth + 1
-        FROM path_search ps
-        JOIN edges e ON ps.current_node = e.source
-        WHERE NOT e.target = ANY(ps.path)
-        AND ps.depth < 10
+        SELECT v.node, v.parent, v.depth
+        FROM shortest_path_visited v
+        JOIN walk w ON v.node = w.parent
     )
-    SELECT ps.path, ps.depth
-    FROM path_search ps
-    WHERE ps.current_node = target_id
-    ORDER BY ps.depth
-    LIMIT 1;
+    SELECT array_agg(walk.node ORDER BY walk.depth), MAX(walk.depth)
+    FROM walk
+    HAVING COUNT(*) > 0;
 END;
 $$ LANGUAGE plpgsql;
 CREATE OR REPLACE FUNCTION update_timestamp()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Sync the Skin Zone hypergraph to any supported database
+One code path for every target: the snapshot is validated, encoded into
+table rows (hypergraph_diff.node_row/edge_row), diffed against the state
+recorded after the last sync to that target, and only the changed rows
+are sent, in batches, through the concurrent retrying pipeline. Progress
+is checkpointed, so rerunning after a failure resumes where it stopped
+
+Targets are drivers from hypergraph_drivers: neon (direct connection when
+NEON_DATABASE_URL or DATABASE_URL is set, otherwise MCP), mcp, postgres,
+supabase and sqlite.
+
+The state is kept next to the snapshot in '<snapshot>.<target>-sync.json'
+(neon, mcp and postgres share '<snapshot>.neon-sync.json'). Without a
+state file, or with --full, the target is first reconciled: rows the
+snapshot does not contain are removed and every row is written.
+
+Usage:
+    python3 sync_hypergraph.py [--target neon] [--hypergraph PATH] [--database DSN_OR_FILE]
+                               [--state PATH] [--full] [--dry-run]
+                               [--batch-size N] [--concurrency N]
+"""
+
+import argparse
+import sys
+
+from hypergraph_checkpoint import SyncCheckpoint, checkpoint_path, snapshot_hash
+from hypergraph_db import DatabaseError, render_statement
+from hypergraph_diff import SyncState, compute_diff, diff_operations, operation_label
+from hypergraph_drivers import TARGETS, create_driver
+from hypergraph_pipeline import DEFAULT_CONCURRENCY, BatchFailed, SyncPipeline, print_progress
+from hypergraph_stream import batched
+from hypergraph_validate import load_valid
+
+HYPERGRAPH_PATH = '/home/ubuntu/skin-zone/hypergraph_data.json'
+
+# Rows per batch; each batch is one statement or request
+BATCH_SIZES = {
+    'neon': 500,
+    'mcp': 500,
+    'postgres': 1000,
+    'supabase': 500,
+    'sqlite': 5000,
+}
+
+
+def state_path_for(hypergraph_path, driver):
+    return f"{hypergraph_path}.{driver.state_name}-sync.json"
+
+
+def print_dry_run(driver, operations, batch_size):
+    """Show what would be sent: SQL for SQL drivers, batch counts otherwise"""
+    for operation, items in operations:
+        for batch in batched(items, batch_size):
+            label = operation_label(operation, len(batch))
+            if hasattr(driver, 'statement'):
+                print(f"\n-- {label}\n{render_statement(driver.statement(operation, batch))}")
+            else:
+                print(f"  {label}")
+
+
+def sync(target, hypergraph_path, database=None, state_path=None, full=False,
+         dry_run=False, batch_size=None, concurrency=DEFAULT_CONCURRENCY, driver=None):
+    """Bring the target in line with the snapshot; returns True on success
+
+    driver replaces the one create_driver() would make (e.g. an
+    instrumented one); it is closed at the end like any other.
+    """
+    print("Loading hypergraph data...")
+    data = load_valid(hypergraph_path)
+    print(f"Nodes: {len(data['nodes'])}")
+    print(f"Edges: {len(data['edges'])}")
+
+    try:
+        driver = driver or create_driver(target, database)
+    except (ImportError, ValueError) as e:
+        print(f"✗ {e}")
+        return False
+    batch_size = batch_size or BATCH_SIZES[target]
+    state_path = state_path or state_path_for(hypergraph_path, driver)
+    try:
+        state = SyncState() if full else SyncState.load(state_path)
+        reconcile = state.is_empty
+        if reconcile:
+            print(f"\nNo previous {target} sync state, reconciling the whole database")
+        else:
+            print(f"\nLast synced: {state.synced_at}")
+
+        diff = compute_diff(data['nodes'], data['edges'], state)
+        for key, count in diff.summary().items():
+            print(f"  {key}: {count}")
+        if diff.is_empty and not reconcile:
+            print("\n✓ Database already in sync")
+            return True
+
+        operations = diff_operations(diff, reconcile and driver.reconcile_keeps_edges)
+        if dry_run:
+            print_dry_run(driver, operations, batch_size)
+            return True
+
+        driver.prepare()
+        print(f"✓ Connected to {driver.name}")
+
+        # Tied to this snapshot and this starting state, so a resumed run
+        # replays exactly the same batches
+        checkpoint = SyncCheckpoint.open(
+            checkpoint_path(hypergraph_path, f"{driver.state_name}-sync"),
+            snapshot_hash(hypergraph_path),
+            {'batch_size': batch_size, 'full': full, 'synced_at': state.synced_at})
+        if checkpoint.resumed:
+            print("  Resuming an interrupted sync")
+
+        if reconcile and not checkpoint.has_step('reconciled'):
+            print("\nReconciling...")
+            driver.reconcile(diff)
+            checkpoint.mark_step('reconciled')
+            print("✓ Rows missing from the snapshot removed")
+
+        print(f"\nSending changes ({concurrency} in flight, {batch_size} rows per batch)...")
+        with SyncPipeline(lambda payload: getattr(driver, payload[0])(payload[1]),
+                          concurrency=concurrency, progress=print_progress,
+                          checkpoint=checkpoint) as pipeline:
+            for operation, items in operations:
+                if not items:
+                    continue
+                batches = (((operation, batch), len(batch)) for batch in batched(items, batch_size))
+                stats = pipeline.run_phase(operation, batches)
+                print(f"✓ {operation_label(operation, stats['rows'] + stats['skipped'])}")
+
+        diff.next_state(data['metadata'].get('version')).save(state_path)
+        checkpoint.remove()
+
+        nodes, edges = driver.counts()[:2]
+        print(f"\n✓ {target} sync complete: {nodes} nodes, {edges} edges in the database")
+        print(f"  State saved to {state_path}")
+        return True
+    except BatchFailed as e:
+        print(f"  ✗ {e}")
+        print("  Rerun to resume from the failed batch")
+        return False
+    except DatabaseError as e:
+        print(f"  ✗ {e}")
+        return False
+    finally:
+        driver.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sync the hypergraph to a database')
+    parser.add_argument('--target', choices=TARGETS, default='neon')
+    parser.add_argument('--hypergraph', default=HYPERGRAPH_PATH)
+    parser.add_argument('--database', help='DSN for postgres or file for sqlite')
+    parser.add_argument('--state', help='State file (default: <hypergraph>.<target>-sync.json)')
+    parser.add_argument('--full', action='store_true', help='Ignore the saved state and reconcile')
+    parser.add_argument('--dry-run', action='store_true', help='Show the changes without sending them')
+    parser.add_argument('--batch-size', type=int, help='Rows per batch (default depends on target)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    ok = sync(args.target, args.hypergraph, args.database, args.state, full=args.full,
+              dry_run=args.dry_run, batch_size=args.batch_size, concurrency=args.concurrency)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
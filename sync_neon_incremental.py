@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Incremental sync of the Skin Zone hypergraph to Neon
+Only rows whose content hash changed since the last successful sync are
+sent, as INSERT/UPDATE/DELETE statements. Nothing is cleared first, so
+hypergraph_metrics, recommendations and other rows referencing unchanged
+nodes and edges are kept
+
+The hashes of the last synced state are kept next to the snapshot in
+'<snapshot>.neon-sync.json'. Without that file (or with --full) the first
+run reconciles the database with the snapshot instead: unknown rows and
+duplicate edges are deleted and every row is upserted in place.
+
+This is sync_hypergraph.py with --target neon; see there for the options.
+
+Usage:
+    python3 sync_neon_incremental.py [--hypergraph PATH] [--state PATH] [--full] [--dry-run]
+"""
+
+import sys
+
+from sync_hypergraph import main
+
+if __name__ == '__main__':
+    sys.exit(main(['--target', 'neon', *sys.argv[1:]]))
@@ -2,189 +2,195 @@
 """
 Sync Skin Zone hypergraph data to Neon database via MCP CLI
 November 18, 2025 update
+
+Rows are loaded into the nodes_staging and edges_staging tables first and
+published to the live tables in one transaction, so readers never see a
+partial graph and a failed run leaves production as it was. Staged batches
+are checkpointed, so rerunning after a failure resumes at the first batch
+that was not staged (--restart ignores the checkpoint). If only the publish
+failed, --publish-only retries it without reloading.
+
+This is the one sync not routed through sync_hypergraph.py, which writes
+the live tables batch by batch; use it when readers must never see a
+half-applied graph.
 """
 
-import json
-import subprocess
+import argparse
 import sys
 
+from hypergraph_checkpoint import SyncCheckpoint, checkpoint_path, snapshot_hash
+from hypergraph_db import DatabaseError, get_backend
+from hypergraph_diff import edge_row, node_row
+from hypergraph_pipeline import BatchFailed, SyncPipeline, call_with_retry, print_progress
+from hypergraph_staging import (CLEAR_STAGING, PREPARE_STAGING, publish_statements,
+                                staging_batches, staging_edge_sql, staging_node_sql)
+from hypergraph_stream import batched, iter_edges, iter_nodes, read_metadata
+from hypergraph_validate import print_report, validate_file
+from hypergraph_wal import HypergraphLog
+
+HYPERGRAPH_PATH = '/home/ubuntu/skin-zone/hypergraph_data.json'
 PROJECT_ID = "damp-brook-31747632"
 DATABASE_NAME = "neondb"
+BATCH_SIZE = 50
+BATCHES_PER_CALL = 10
 
-def run_mcp_command(tool_name, params):
-    """Execute MCP CLI command and return result"""
-    cmd = [
-        'manus-mcp-cli', 'tool', 'call', tool_name,
-        '--server', 'neon',
-        '--input', json.dumps({"params": params})
-    ]
-    
+def run_statements(statements):
+    """Run statements in one transaction on the shared database backend"""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing {tool_name}: {e.stderr}")
-        return None
+        call_with_retry(get_backend().execute_transaction, statements)
+    except DatabaseError as e:
+        print(f"Error executing SQL: {e}")
+        return False
+    return True
 
-def load_hypergraph():
-    """Load hypergraph data"""
-    with open('/home/ubuntu/skin-zone/hypergraph_data.json', 'r') as f:
-        return json.load(f)
+def load_metadata():
+    """Read the hypergraph metadata without loading nodes and edges"""
+    return read_metadata(HYPERGRAPH_PATH)
 
-def sync_to_neon():
-    """Sync hypergraph data to Neon"""
-    
-    print("Loading hypergraph data...")
-    data = load_hypergraph()
-    
-    print(f"Nodes: {len(data['nodes'])}")
-    print(f"Edges: {len(data['edges'])}")
-    print(f"Version: {data['metadata']['version']}")
+def skip_positions(rows, positions):
+    """Yield rows whose position is not in positions"""
+    for i, row in enumerate(rows):
+        if i not in positions:
+            yield row
+
+def send_statements(statements):
+    """Send one group of statements as a transaction (raises on failure)"""
+    get_backend().execute_transaction(statements)
+
+def group_batches(statements):
+    """Group (sql, row_count) pairs into BATCHES_PER_CALL-statement payloads"""
+    for group in batched(statements, BATCHES_PER_CALL):
+        yield [sql for sql, _ in group], sum(rows for _, rows in group)
+
+def node_batches(skip_nodes):
+    """Yield grouped nodes_staging INSERT statements streamed from the file"""
+    rows = (node_row(n) for n in skip_positions(iter_nodes(HYPERGRAPH_PATH), skip_nodes))
+    return group_batches(staging_batches(rows, staging_node_sql, BATCH_SIZE))
+
+def edge_batches(skip_edges):
+    """Yield grouped edges_staging INSERT statements streamed from the file"""
+    rows = (edge_row(e) for e in skip_positions(iter_edges(HYPERGRAPH_PATH), skip_edges))
+    return group_batches(staging_batches(rows, staging_edge_sql, BATCH_SIZE))
+
+def sync_to_neon(publish_only=False, restart=False):
+    """Sync hypergraph data to Neon through the staging tables"""
+    
+    # Batches stream the snapshot file itself, so fold pending WAL records in first
+    folded = HypergraphLog(HYPERGRAPH_PATH).compact_pending()
+    if folded:
+        print(f"✓ Compacted {folded} pending WAL records into the snapshot")
+    
+    print("Loading hypergraph metadata...")
+    graph_metadata = load_metadata()
+    
+    print(f"Nodes: {graph_metadata.get('node_count', 'unknown')}")
+    print(f"Edges: {graph_metadata.get('edge_count', 'unknown')}")
+    print(f"Version: {graph_metadata['version']}")
+    
+    # Validate before touching the database so one dangling or duplicate
+    # edge cannot fail a whole batch
+    print("\nValidating hypergraph...")
+    report = validate_file(HYPERGRAPH_PATH)
+    print_report(report)
+    skip_nodes = set(report['drop']['nodes'])
+    skip_edges = set(report['drop']['edges'])
+    if skip_nodes or skip_edges:
+        print(f"  Skipping {len(skip_nodes)} invalid nodes and {len(skip_edges)} invalid edges")
+    nodes_expected = report['node_count'] - len(skip_nodes)
+    edges_expected = report['edge_count'] - len(skip_edges)
     
     # Check if tables exist
     print("\nChecking database tables...")
-    tables_result = run_mcp_command('get_database_tables', {
-        'projectId': PROJECT_ID,
-        'databaseName': DATABASE_NAME
-    })
-    
-    if not tables_result:
-        print("Failed to get database tables")
+    try:
+        get_backend().list_tables()
+    except DatabaseError as e:
+        print(f"Failed to get database tables: {e}")
         return False
     
     print("✓ Connected to Neon database")
     
-    # Clear existing data
-    print("\nClearing existing data...")
-    
-    # Delete edges first (foreign key constraints)
-    delete_edges_sql = "DELETE FROM edges;"
-    run_mcp_command('run_sql', {
-        'projectId': PROJECT_ID,
-        'databaseName': DATABASE_NAME,
-        'sql': delete_edges_sql
-    })
-    
-    # Delete nodes
-    delete_nodes_sql = "DELETE FROM nodes;"
-    run_mcp_command('run_sql', {
-        'projectId': PROJECT_ID,
-        'databaseName': DATABASE_NAME,
-        'sql': delete_nodes_sql
-    })
-    
-    print("✓ Existing data cleared")
-    
-    # Insert nodes in batches
-    print(f"\nInserting {len(data['nodes'])} nodes...")
-    BATCH_SIZE = 50
-    nodes_inserted = 0
-    
-    for i in range(0, len(data['nodes']), BATCH_SIZE):
-        batch = data['nodes'][i:i+BATCH_SIZE]
-        
-        # Build INSERT statement
-        values = []
-        for node in batch:
-            # Extract metadata (everything except id, type, name)
-            metadata = {k: v for k, v in node.items() if k not in ['id', 'type', 'name']}
-            metadata_json = json.dumps(metadata).replace("'", "''")
-            
-            node_id = node['id'].replace("'", "''")
-            node_type = node['type'].replace("'", "''")
-            node_name = node['name'].replace("'", "''")
-            
-            values.append(f"('{node_id}', '{node_type}', '{node_name}', '{metadata_json}'::jsonb)")
-        
-        insert_sql = f"""
-        INSERT INTO nodes (id, type, name, metadata)
-        VALUES {', '.join(values)};
-        """
-        
-        result = run_mcp_command('run_sql', {
-            'projectId': PROJECT_ID,
-            'databaseName': DATABASE_NAME,
-            'sql': insert_sql
-        })
-        
-        if result:
-            nodes_inserted += len(batch)
-            print(f"  ✓ Batch {i//BATCH_SIZE + 1}/{(len(data['nodes']) + BATCH_SIZE - 1)//BATCH_SIZE} ({nodes_inserted} nodes)")
+    checkpoint = SyncCheckpoint.open(
+        checkpoint_path(HYPERGRAPH_PATH, 'neon-staging'), snapshot_hash(HYPERGRAPH_PATH),
+        {'batch_size': BATCH_SIZE, 'batches_per_call': BATCHES_PER_CALL})
+    if restart:
+        checkpoint.remove()
+    
+    if publish_only:
+        print("\nSkipping load, publishing the existing staging tables")
+    else:
+        # Empty (and create if needed) the staging tables; live data is untouched
+        if checkpoint.has_step('staging_prepared'):
+            print(f"\nResuming: {checkpoint.rows_done('nodes')} nodes and "
+                  f"{checkpoint.rows_done('edges')} edges already staged")
         else:
-            print(f"  ✗ Failed to insert batch {i//BATCH_SIZE + 1}")
-            return False
-    
-    print(f"✓ All {nodes_inserted} nodes inserted")
-    
-    # Insert edges in batches
-    print(f"\nInserting {len(data['edges'])} edges...")
-    edges_inserted = 0
-    
-    for i in range(0, len(data['edges']), BATCH_SIZE):
-        batch = data['edges'][i:i+BATCH_SIZE]
-        
-        # Build INSERT statement
-        values = []
-        for edge in batch:
-            source = edge['source'].replace("'", "''")
-            target = edge['target'].replace("'", "''")
-            edge_type = edge['type'].replace("'", "''")
-            metadata = json.dumps(edge.get('metadata', {})).replace("'", "''")
-            weight = edge.get('weight', 1.0)
-            
-            values.append(f"('{source}', '{target}', '{edge_type}', '{metadata}'::jsonb, {weight})")
-        
-        insert_sql = f"""
-        INSERT INTO edges (source, target, type, metadata, weight)
-        VALUES {', '.join(values)};
-        """
-        
-        result = run_mcp_command('run_sql', {
-            'projectId': PROJECT_ID,
-            'databaseName': DATABASE_NAME,
-            'sql': insert_sql
-        })
+            print("\nPreparing staging tables...")
+            if not run_statements(PREPARE_STAGING):
+                return False
+            checkpoint.mark_step('staging_prepared')
+            print("✓ Staging tables ready")
         
-        if result:
-            edges_inserted += len(batch)
-            print(f"  ✓ Batch {i//BATCH_SIZE + 1}/{(len(data['edges']) + BATCH_SIZE - 1)//BATCH_SIZE} ({edges_inserted} edges)")
-        else:
-            print(f"  ✗ Failed to insert batch {i//BATCH_SIZE + 1}")
+        # Stream batches from the file; staging has no foreign keys, but
+        # nodes still go first to keep the progress output readable
+        print("\nStaging nodes...")
+        try:
+            with SyncPipeline(send_statements, progress=print_progress,
+                              checkpoint=checkpoint) as pipeline:
+                stats = pipeline.run_phase('nodes', node_batches(skip_nodes))
+                print(f"✓ {stats['rows'] + stats['skipped']} nodes staged")
+                
+                print("\nStaging edges...")
+                stats = pipeline.run_phase('edges', edge_batches(skip_edges))
+        except BatchFailed as e:
+            print(f"  ✗ {e}")
+            print("  Live tables were not changed; rerun to resume from the failed batch")
             return False
+        
+        print(f"✓ {stats['rows'] + stats['skipped']} edges staged")
     
-    print(f"✓ All {edges_inserted} edges inserted")
+    # One transaction: readers see the old graph until it commits
+    print("\nPublishing staging tables...")
+    if not run_statements(publish_statements(nodes_expected, edges_expected)):
+        print("  Live tables were not changed; retry with --publish-only")
+        return False
+    print(f"✓ Published {nodes_expected} nodes and {edges_expected} edges")
+    checkpoint.remove()
+    
+    # Best effort: the next run truncates staging anyway
+    try:
+        get_backend().execute(CLEAR_STAGING)
+    except DatabaseError as e:
+        print(f"  Could not clear staging tables: {e}")
     
     # Verify counts
     print("\nVerifying data...")
-    
-    count_nodes_sql = "SELECT COUNT(*) as count FROM nodes;"
-    count_edges_sql = "SELECT COUNT(*) as count FROM edges;"
-    
-    run_mcp_command('run_sql', {
-        'projectId': PROJECT_ID,
-        'databaseName': DATABASE_NAME,
-        'sql': count_nodes_sql
-    })
-    
-    run_mcp_command('run_sql', {
-        'projectId': PROJECT_ID,
-        'databaseName': DATABASE_NAME,
-        'sql': count_edges_sql
-    })
+    try:
+        backend = get_backend()
+        print(f"  nodes: {backend.query('SELECT COUNT(*) as count FROM nodes;')}")
+        print(f"  edges: {backend.query('SELECT COUNT(*) as count FROM edges;')}")
+    except DatabaseError as e:
+        print(f"Verification error: {e}")
     
     print("\n" + "="*60)
     print("NEON DATABASE SYNC COMPLETE")
     print("="*60)
     print(f"Project: skin-zone-hypergraph ({PROJECT_ID})")
     print(f"Database: {DATABASE_NAME}")
-    print(f"Nodes inserted: {nodes_inserted}")
-    print(f"Edges inserted: {edges_inserted}")
-    print(f"Hypergraph version: {data['metadata']['version']}")
-    print(f"Last updated: {data['metadata']['last_updated']}")
+    print(f"Nodes published: {nodes_expected}")
+    print(f"Edges published: {edges_expected}")
+    print(f"Hypergraph version: {graph_metadata['version']}")
+    print(f"Last updated: {graph_metadata['last_updated']}")
     print("="*60)
     
     return True
 
+def main():
+    parser = argparse.ArgumentParser(description='Sync the hypergraph to Neon through staging tables')
+    parser.add_argument('--publish-only', action='store_true',
+                        help='Publish the already loaded staging tables without reloading them')
+    parser.add_argument('--restart', action='store_true',
+                        help='Ignore the checkpoint of an interrupted run and load from scratch')
+    args = parser.parse_args()
+    return 0 if sync_to_neon(args.publish_only, args.restart) else 1
+
 if __name__ == '__main__':
-    success = sync_to_neon()
-    sys.exit(0 if success else 1)
+    sys.exit(main())
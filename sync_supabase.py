@@ -1,25 +1,14 @@
-import os
-import json
-from supabase import create_client, Client
+#!/usr/bin/env python3
+"""
+Sync the Skin Zone hypergraph to Supabase
+Shortcut for sync_hypergraph.py --target supabase: rows are encoded like
+every other target and only changes since the last sync are sent. Needs
+SUPABASE_URL and SUPABASE_KEY.
+"""
 
-# Get Supabase credentials from environment variables
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_KEY")
-print(f"Supabase URL: {url}")
-print(f"Supabase Key: {key}")
-supabase: Client = create_client(url, key)
+import sys
 
+from sync_hypergraph import main
 
-# Load hypergraph data from JSON file
-with open("/home/ubuntu/skin-zone/hypergraph_data.json", "r") as f:
-    hypergraph_data = json.load(f)
-
-# Upsert nodes
-for node in hypergraph_data["nodes"]:
-    supabase.table("nodes").upsert(node).execute()
-
-# Upsert edges
-for edge in hypergraph_data["edges"]:
-    supabase.table("edges").upsert(edge).execute()
-
-print("Supabase sync completed successfully.")
+if __name__ == '__main__':
+    sys.exit(main(['--target', 'supabase', *sys.argv[1:]]))
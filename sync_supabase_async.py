@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Asynchronous Supabase sync for the Skin Zone hypergraph
+Talks to the Supabase REST (PostgREST) API directly with httpx, keeping up
+to N bulk requests in flight. The batch size adapts to the observed request
+time: it grows while requests finish well under the target and halves when
+they get slow, and a batch rejected as too large is split and resent
+
+Nodes are upserted in place, so rows referencing them (hypergraph_metrics,
+recommendations) survive, and edges are written once every node write has
+completed, so foreign keys always resolve. Each edge carries a
+deterministic id (hypergraph_diff.edge_id) and is upserted on it, so a
+batch retried after a lost response cannot duplicate rows. Only then are
+the edges and nodes the snapshot no longer has deleted, so a sync that
+fails part way leaves the previous rows in place rather than no edges. Use
+postgrest_stub.py to run it locally and compare rows/sec against the
+synchronous scripts.
+
+Requires httpx (pip install httpx).
+
+Usage:
+    python3 sync_supabase_async.py [--hypergraph PATH] [--concurrency 8] [--batch-size 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from itertools import islice
+
+from hypergraph_diff import edge_id, edge_row, node_row
+from hypergraph_validate import load_valid
+
+HYPERGRAPH_PATH = '/home/ubuntu/skin-zone/hypergraph_data.json'
+DEFAULT_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 200
+MIN_BATCH_SIZE = 10
+MAX_BATCH_SIZE = 5000
+TARGET_REQUEST_SECONDS = 1.0
+DEFAULT_RETRIES = 4
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+PAGE_SIZE = 1000
+DELETE_BATCH_SIZE = 100
+
+
+class SupabaseRequestError(Exception):
+    """A REST request failed with a non-retryable status or ran out of retries"""
+
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class AdaptiveBatchSize:
+    """Batch size that follows the observed request time"""
+
+    def __init__(self, initial=DEFAULT_BATCH_SIZE, minimum=MIN_BATCH_SIZE,
+                 maximum=MAX_BATCH_SIZE, target_seconds=TARGET_REQUEST_SECONDS):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+
+    def observe(self, seconds):
+        if seconds < self.target_seconds / 2:
+            self.size = min(self.maximum, int(self.size * 1.5) + 1)
+        elif seconds > self.target_seconds:
+            self.shrink()
+
+    def shrink(self):
+        self.size = max(self.minimum, self.size // 2)
+
+
+class AsyncSupabaseSync:
+    """Concurrent bulk writer for the nodes and edges tables"""
+
+    def __init__(self, url, key, concurrency=DEFAULT_CONCURRENCY,
+                 batch_size=DEFAULT_BATCH_SIZE, retries=DEFAULT_RETRIES, timeout=60.0):
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("sync_supabase_async requires httpx (pip install httpx)") from e
+        self.httpx = httpx
+        self.url = url.rstrip('/')
+        self.key = key
+        self.concurrency = concurrency
+        self.batch = AdaptiveBatchSize(batch_size)
+        self.retries = retries
+        self.timeout = timeout
+        self.client = None
+        self.stats = {}
+
+    async def __aenter__(self):
+        httpx = self.httpx
+        self.client = httpx.AsyncClient(
+            base_url=f"{self.url}/rest/v1",
+            headers={
+                'apikey': self.key,
+                'Authorization': f"Bearer {self.key}",
+                'Content-Type': 'application/json',
+            },
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency,
+                                max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def _request(self, method, table, **kwargs):
+        """Send one request, retrying transient failures with backoff"""
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, f"/{table}", **kwargs)
+            except self.httpx.TransportError as e:
+                status, message = None, str(e) or type(e).__name__
+            else:
+                if response.status_code < 400:
+                    return response
+                status, message = response.status_code, response.text
+                if status not in RETRY_STATUSES:
+                    raise SupabaseRequestError(status, message)
+            if attempt >= self.retries:
+                raise SupabaseRequestError(status, message)
+            delay = min(8.0, 0.5 * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            attempt += 1
+            print(f"  ↻ {method} {table}: retry {attempt} in {delay:.1f}s ({status or message})")
+            await asyncio.sleep(delay)
+
+    async def ids(self, table):
+        """Every id in a table, read a page at a time"""
+        ids, start = [], 0
+        while True:
+            response = await self._request(
+                'GET', table, params={'select': 'id', 'order': 'id'},
+                headers={'Range': f"{start}-{start + PAGE_SIZE - 1}"})
+            page = response.json()
+            ids.extend(row['id'] for row in page)
+            if len(page) < PAGE_SIZE:
+                return ids
+            start += PAGE_SIZE
+
+    async def prune(self, table, keep_ids):
+        """Delete the rows whose id is not in keep_ids; returns how many went"""
+        missing = [i for i in await self.ids(table) if i not in keep_ids]
+        for start in range(0, len(missing), DELETE_BATCH_SIZE):
+            quoted = ','.join('"{}"'.format(i.replace('\\', '\\\\').replace('"', '\\"'))
+                              for i in missing[start:start + DELETE_BATCH_SIZE])
+            await self._request('DELETE', table, params={'id': f"in.({quoted})"})
+        return len(missing)
+
+    async def count(self, table):
+        response = await self._request('GET', table, params={'select': 'id'},
+                                       headers={'Prefer': 'count=exact', 'Range': '0-0'})
+        content_range = response.headers.get('Content-Range', '')
+        total = content_range.rpartition('/')[2]
+        return int(total) if total.isdigit() else None
+
+    async def _write(self, table, rows, upsert):
+        prefer = 'resolution=merge-duplicates,return=minimal' if upsert else 'return=minimal'
+        start = time.perf_counter()
+        try:
+            await self._request('POST', table, content=json.dumps(rows), headers={'Prefer': prefer})
+        except SupabaseRequestError as e:
+            if e.status != 413 or len(rows) == 1:
+                raise
+            # Too large for the gateway: halve future batches and resend in two
+            self.batch.shrink()
+            middle = len(rows) // 2
+            await self._write(table, rows[:middle], upsert)
+            await self._write(table, rows[middle:], upsert)
+            return
+        self.batch.observe(time.perf_counter() - start)
+
+    async def write_phase(self, phase, table, rows, upsert=False):
+        """Write all rows with up to concurrency requests in flight
+
+        Batches are cut from the row iterator just before they are sent, so
+        each one uses the current adaptive size. The first failure stops new
+        batches and is raised once the in-flight ones finish.
+        """
+        stats = self.stats[phase] = {'rows': 0, 'requests': 0, 'seconds': 0.0}
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        failures = []
+        iterator = iter(rows)
+        start = time.perf_counter()
+
+        async def send(batch):
+            try:
+                await self._write(table, batch, upsert)
+                stats['rows'] += len(batch)
+                stats['requests'] += 1
+            except Exception as e:
+                failures.append(e)
+            finally:
+                slots.release()
+
+        while not failures:
+            await slots.acquire()
+            batch = list(islice(iterator, self.batch.size))
+            if not batch:
+                slots.release()
+                break
+            task = asyncio.create_task(send(batch))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        await asyncio.gather(*tasks)
+        stats['seconds'] = time.perf_counter() - start
+        if failures:
+            raise failures[0]
+        return stats
+
+
+def load_rows(filepath):
+    """Load the snapshot and WAL, drop invalid rows and encode table rows"""
+    data = load_valid(filepath)
+    edges = [edge_row(e) for e in data['edges']]
+    for row in edges:
+        row['id'] = edge_id(row['source'], row['target'], row['type'])
+    return data['metadata'], [node_row(n) for n in data['nodes']], edges
+
+
+async def sync_to_supabase(url, key, filepath, concurrency, batch_size):
+    print("Loading hypergraph data...")
+    metadata, nodes, edges = load_rows(filepath)
+    print(f"Nodes: {len(nodes)}")
+    print(f"Edges: {len(edges)}")
+
+    async with AsyncSupabaseSync(url, key, concurrency, batch_size) as sync:
+        print(f"\nUpserting nodes ({concurrency} in flight)...")
+        stats = await sync.write_phase('nodes', 'nodes', nodes, upsert=True)
+        print(f"✓ {stats['rows']} nodes in {stats['requests']} requests, "
+              f"{stats['rows'] / max(stats['seconds'], 1e-9):.0f} rows/sec")
+
+        print(f"\nUpserting edges ({concurrency} in flight)...")
+        stats = await sync.write_phase('edges', 'edges', edges, upsert=True)
+        print(f"✓ {stats['rows']} edges in {stats['requests']} requests, "
+              f"{stats['rows'] / max(stats['seconds'], 1e-9):.0f} rows/sec")
+        print(f"  Final batch size: {sync.batch.size}")
+
+        print("\nDeleting rows no longer in the snapshot...")
+        removed_edges = await sync.prune('edges', {row['id'] for row in edges})
+        removed_nodes = await sync.prune('nodes', {row['id'] for row in nodes})
+        print(f"✓ {removed_edges} edges and {removed_nodes} nodes deleted")
+
+        print("\nVerifying data...")
+        print(f"  Nodes in database: {await sync.count('nodes')}")
+        print(f"  Edges in database: {await sync.count('edges')}")
+
+    print("\n" + "="*60)
+    print("SUPABASE ASYNC SYNC COMPLETE")
+    print("="*60)
+    print(f"Hypergraph version: {metadata.get('version')}")
+    print(f"Last updated: {metadata.get('last_updated')}")
+    print("="*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Asynchronously sync the hypergraph to Supabase')
+    parser.add_argument('--hypergraph', default=HYPERGRAPH_PATH)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Initial batch size; adapts during the run')
+    args = parser.parse_args()
+
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+    if not url or not key:
+        print("Error: SUPABASE_URL and SUPABASE_KEY environment variables must be set")
+        return 1
+
+    try:
+        asyncio.run(sync_to_supabase(url, key, args.hypergraph, args.concurrency,
+                                     args.batch_size))
+    except ImportError as e:
+        print(f"✗ {e}")
+        return 1
+    except SupabaseRequestError as e:
+        print(f"✗ Sync failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
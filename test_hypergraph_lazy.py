@@ -0,0 +1,85 @@
+"""Mapping behaviour of lazy records over a binary snapshot"""
+
+import pytest
+
+from hypergraph_binary import write_binary
+from hypergraph_lazy import load_lazy_store
+
+DATA = {
+    'metadata': {'version': 'test'},
+    'nodes': [
+        {'id': 'a', 'type': 'salon', 'name': 'A'},
+        {'id': 'b', 'type': 'supplier', 'name': 'B', 'city': 'Austin'},
+        {'id': 'c', 'type': 'supplier'},
+    ],
+    'edges': [
+        {'source': 'a', 'target': 'b', 'type': 'purchases_from', 'weight': 3},
+        {'source': 'a', 'target': 'c', 'type': 'purchases_from', 'weight': None, 'metadata': {'x': 1}},
+        {'source': 'b', 'target': 'c', 'type': 'partners_with'},
+        {'source': 'c', 'target': 'a', 'type': 'supplies', 'weight': 0.25},
+    ],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / 'graph.hgb'
+    write_binary(DATA, path)
+    return load_lazy_store(path)
+
+
+def test_records_match_source(store):
+    assert [dict(n) for n in store.nodes()] == DATA['nodes']
+    assert [e.to_dict() for e in store.edges()] == DATA['edges']
+    for edge, original in zip(store.edges(), DATA['edges']):
+        assert len(edge) == len(original)
+        assert sorted(edge) == sorted(original)
+        for key, value in original.items():
+            assert key in edge
+            assert edge[key] == value
+            assert edge.get(key, 'missing') == value
+        assert ('weight' in edge) == ('weight' in original)
+
+
+def test_int_weight_update(store):
+    edge = store.update_edge('a', 'b', 'purchases_from', {'weight': 0.5})
+    assert edge['weight'] == 0.5
+    assert 'weight' in edge
+    assert list(edge).count('weight') == 1
+    assert len(edge) == 4
+    assert edge.to_dict() == {'source': 'a', 'target': 'b', 'type': 'purchases_from', 'weight': 0.5}
+    assert dict(edge) == edge.to_dict()
+
+
+def test_null_weight_update_and_delete(store):
+    edge = store.update_edge('a', 'c', 'purchases_from', {'weight': 2.0})
+    assert edge.to_dict()['weight'] == 2.0
+    assert edge['metadata'] == {'x': 1}
+    del edge['weight']
+    assert 'weight' not in edge
+    assert edge.get('weight') is None
+    with pytest.raises(KeyError):
+        edge['weight']
+    assert len(edge) == 4
+
+
+def test_missing_weight_set(store):
+    edge = store.update_edge('b', 'c', 'partners_with', {'weight': 7})
+    assert edge['weight'] == 7
+    assert dict(edge) == {'source': 'b', 'target': 'c', 'type': 'partners_with', 'weight': 7}
+
+
+def test_nested_edit_survives_cache_eviction(tmp_path):
+    path = tmp_path / 'tiers.hgb'
+    nodes = [{'id': f'n{i}', 'type': 'supplier', 'pricing_tiers': {'gold': i}} for i in range(5)]
+    write_binary({'metadata': {}, 'nodes': nodes, 'edges': []}, path)
+    store = load_lazy_store(path, cache_size=2)
+
+    node = store.get_node('n0')
+    node['pricing_tiers']['gold'] = 'CHANGED'
+    node.get('pricing_tiers')['silver'] = 1
+    for other in store.nodes():
+        assert 'pricing_tiers' in other
+    assert store.blob_cache.misses > 2
+    assert node['pricing_tiers'] == {'gold': 'CHANGED', 'silver': 1}
+    assert store.get_node('n1').to_dict()['pricing_tiers'] == {'gold': 1}
@@ -0,0 +1,34 @@
+"""Path queries over the CSR path index"""
+
+import pytest
+
+from hypergraph_paths import PathIndex
+
+
+def _index(edges):
+    node_ids = sorted({node for s, t, _ in edges for node in (s, t)})
+    return PathIndex.from_hypergraph({
+        'nodes': [{'id': node_id} for node_id in node_ids],
+        'edges': [{'source': s, 'target': t, 'type': 'link', 'weight': w} for s, t, w in edges],
+    })
+
+
+def test_k_shortest_paths_on_a_multigraph():
+    # Two parallel a->b edges, each continuing over two parallel b->c edges
+    index = _index([
+        ('a', 'b', 1.0), ('a', 'b', 1.5),
+        ('b', 'c', 1.0), ('b', 'c', 1.5),
+        ('a', 'c', 2.5),
+    ])
+    paths = index.k_shortest_paths('a', 'c', 5, weighted=True)
+    assert [p['cost'] for p in paths] == [2.0, 2.5, 2.5, 2.5, 3.0]
+
+
+def test_negative_weights_rejected_for_weighted_queries():
+    index = _index([('a', 'b', -1.0), ('b', 'c', 1.0)])
+    assert index.has_negative_weights
+    assert index.shortest_path('a', 'c')['length'] == 2
+    with pytest.raises(ValueError):
+        index.cheapest_path('a', 'c')
+    with pytest.raises(ValueError):
+        index.k_shortest_paths('a', 'c', 2, weighted=True)
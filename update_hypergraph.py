@@ -1,9 +1,11 @@
-import json
 from datetime import datetime
 
-# Load existing hypergraph data
-with open('/home/ubuntu/skin-zone/hypergraph_data.json', 'r') as f:
-    hypergraph = json.load(f)
+from hypergraph_wal import HypergraphLog
+
+# Current state (snapshot plus WAL); the update is appended to the WAL as
+# one changeset instead of rewriting the snapshot
+log = HypergraphLog('/home/ubuntu/skin-zone/hypergraph_data.json')
+store = log.open()
 
 # Track new additions
 new_nodes = []
@@ -281,30 +283,31 @@ new_platforms = [
     }
 ]
 
+node_updates = {}
+
 # Update GlossGenius with detailed pricing
-for node in hypergraph['nodes']:
-    if node['id'] == 'glossgenius':
-        node.update({
-            "pricing_tiers": {
-                "standard": {"monthly": 28, "annual_monthly": 24, "savings_pct": 14},
-                "gold": {"monthly": 56, "annual_monthly": 48, "savings_pct": 14},
-                "platinum": {"monthly": 168, "annual_monthly": 148, "savings_pct": 12}
-            },
-            "payment_processing_rate": 0.026,
-            "free_trial_days": 14,
-            "metrics": {
-                "avg_rebooking_rate_pct": 75,
-                "avg_booking_increase_pct": 22,
-                "avg_annual_savings_usd": 8000
-            },
-            "features_count": "100+"
-        })
-    elif node['id'] == 'vagaro':
-        node.update({
-            "user_base": "20000000+",
-            "professionals": "220000+",
-            "marketplace_fee": 0
-        })
+if store.has_node('glossgenius'):
+    node_updates['glossgenius'] = {
+        "pricing_tiers": {
+            "standard": {"monthly": 28, "annual_monthly": 24, "savings_pct": 14},
+            "gold": {"monthly": 56, "annual_monthly": 48, "savings_pct": 14},
+            "platinum": {"monthly": 168, "annual_monthly": 148, "savings_pct": 12}
+        },
+        "payment_processing_rate": 0.026,
+        "free_trial_days": 14,
+        "metrics": {
+            "avg_rebooking_rate_pct": 75,
+            "avg_booking_increase_pct": 22,
+            "avg_annual_savings_usd": 8000
+        },
+        "features_count": "100+"
+    }
+if store.has_node('vagaro'):
+    node_updates['vagaro'] = {
+        "user_base": "20000000+",
+        "professionals": "220000+",
+        "marketplace_fee": 0
+    }
 
 # Add professional type nodes
 professional_types = [
@@ -401,29 +404,25 @@ new_edges.extend(supplier_ingredient_edges)
 new_edges.extend(platform_feature_edges)
 new_edges.extend(platform_professional_edges)
 
-# Add new nodes to hypergraph (avoid duplicates)
-existing_ids = {node['id'] for node in hypergraph['nodes']}
-for node in new_nodes:
-    if node['id'] not in existing_ids:
-        hypergraph['nodes'].append(node)
-        existing_ids.add(node['id'])
-
-# Add new edges to hypergraph
-hypergraph['edges'].extend(new_edges)
-
-# Update metadata
-hypergraph['metadata']['version'] = '3.0'
-hypergraph['metadata']['last_updated'] = datetime.now().strftime('%Y-%m-%d')
-hypergraph['metadata']['description'] = 'Enhanced Skin Zone marketplace hypergraph with comprehensive supplier pricing, salon/spa platforms, and professional networks'
-hypergraph['metadata']['node_count'] = len(hypergraph['nodes'])
-hypergraph['metadata']['edge_count'] = len(hypergraph['edges'])
+# Existing nodes and edge triples are skipped when the changeset is
+# applied, and node/edge counts are refreshed
+changeset = {
+    "metadata": {
+        "version": "3.0",
+        "last_updated": datetime.now().strftime('%Y-%m-%d'),
+        "description": "Enhanced Skin Zone marketplace hypergraph with comprehensive supplier pricing, salon/spa platforms, and professional networks"
+    },
+    "nodes": {"update": node_updates, "add": new_nodes},
+    "edges": {"add": new_edges}
+}
 
-# Save updated hypergraph
-with open('/home/ubuntu/skin-zone/hypergraph_data.json', 'w') as f:
-    json.dump(hypergraph, f, indent=2)
+# Append to the WAL; compaction folds it into the snapshot later
+report = log.append(changeset)
+nodes_added = report['nodes_added']
+edges_added = report['edges_added']
 
 print(f"Hypergraph updated successfully!")
-print(f"Total nodes: {hypergraph['metadata']['node_count']}")
-print(f"Total edges: {hypergraph['metadata']['edge_count']}")
-print(f"New nodes added: {len([n for n in new_nodes if n['id'] not in existing_ids])}")
-print(f"New edges added: {len(new_edges)}")
+print(f"Total nodes: {log.store.metadata['node_count']}")
+print(f"Total edges: {log.store.metadata['edge_count']}")
+print(f"New nodes added: {nodes_added}")
+print(f"New edges added: {edges_added}")
@@ -7,56 +7,52 @@ Update Skin Zone Hypergraph with November 18, 2025 Research Data
 - Create new edges for marketplace relationships
 """
 
-import json
 from datetime import datetime
 
-def load_hypergraph(filepath):
-    """Load existing hypergraph data"""
-    with open(filepath, 'r') as f:
-        return json.load(f)
+from hypergraph_store import edge_key
+from hypergraph_wal import HypergraphLog
 
-def save_hypergraph(data, filepath):
-    """Save updated hypergraph data"""
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+def count_new_nodes(store, nodes):
+    """Number of nodes whose id is not in the store yet"""
+    return len({n['id'] for n in nodes if not store.has_node(n['id'])})
+
+def count_new_edges(store, edges):
+    """Number of edges whose triple is not in the store yet"""
+    return len({edge_key(e) for e in edges if not store.has_edge(*edge_key(e))})
 
 def update_hypergraph():
     """Main update function"""
     
-    # Load existing data
-    data = load_hypergraph('/home/ubuntu/skin-zone/hypergraph_data.json')
+    # Current state (snapshot plus WAL); the update itself is appended to the
+    # WAL as one changeset instead of rewriting the snapshot
+    log = HypergraphLog('/home/ubuntu/skin-zone/hypergraph_data.json')
+    store = log.open()
     
     today = datetime.now().strftime('%Y-%m-%d')
     
-    # Update metadata
-    data['metadata']['version'] = '6.0'
-    data['metadata']['last_updated'] = today
-    data['metadata']['description'] = 'Skin Zone marketplace hypergraph with November 18, 2025 bulk pricing and salon platform updates'
-    
     # Track updates
     nodes_added = 0
     edges_added = 0
-    nodes_updated = 0
+    node_updates = {}
     
     # Update Making Cosmetics node
-    for node in data['nodes']:
-        if node['id'] == 'making_cosmetics':
-            node['catalog_size'] = '1124+'
-            node['last_updated'] = today
-            node['reward_points'] = 200
-            nodes_updated += 1
-            break
+    if store.has_node('making_cosmetics'):
+        node_updates['making_cosmetics'] = {
+            'catalog_size': '1124+',
+            'last_updated': today,
+            'reward_points': 200
+        }
     
     # Update Lotion Crafter node
-    for node in data['nodes']:
-        if node['id'] == 'lotion_crafter':
-            node['discount_codes'] = {
+    if store.has_node('lotion_crafter'):
+        node_updates['lotion_crafter'] = {
+            'discount_codes': {
                 'SAVE10': '10% off orders <$150',
                 'SAVE15': '15% off orders $150+'
-            }
-            node['last_updated'] = today
-            nodes_updated += 1
-            break
+            },
+            'last_updated': today
+        }
+    nodes_updated = len(node_updates)
     
     # New bulk ingredients from Lotion Crafter research
     new_ingredients = [
@@ -239,12 +235,7 @@ def update_hypergraph():
     ]
     
     # Add new ingredient nodes
-    for ingredient in new_ingredients:
-        # Check if already exists
-        exists = any(n['id'] == ingredient['id'] for n in data['nodes'])
-        if not exists:
-            data['nodes'].append(ingredient)
-            nodes_added += 1
+    nodes_added += count_new_nodes(store, new_ingredients)
     
     # Add salon/spa platform nodes
     salon_platforms = [
@@ -320,15 +311,12 @@ def update_hypergraph():
     ]
     
     # Add salon platform nodes
-    for platform in salon_platforms:
-        exists = any(n['id'] == platform['id'] for n in data['nodes'])
-        if not exists:
-            data['nodes'].append(platform)
-            nodes_added += 1
+    nodes_added += count_new_nodes(store, salon_platforms)
     
     # Create edges for new ingredients
+    ingredient_edges = []
     for ingredient in new_ingredients:
-        edge = {
+        ingredient_edges.append({
             'source': 'lotion_crafter',
             'target': ingredient['id'],
             'type': 'supplies',
@@ -338,17 +326,8 @@ def update_hypergraph():
                 'last_updated': today
             },
             'weight': 1.0
-        }
-        # Check if edge exists
-        exists = any(
-            e['source'] == edge['source'] and 
-            e['target'] == edge['target'] and 
-            e['type'] == edge['type']
-            for e in data['edges']
-        )
-        if not exists:
-            data['edges'].append(edge)
-            edges_added += 1
+        })
+    edges_added += count_new_edges(store, ingredient_edges)
     
     # Create edges between salon platforms and services
     platform_service_edges = [
@@ -360,8 +339,9 @@ def update_hypergraph():
         ('mindbody', 'facial_basic', 'enables_booking'),
     ]
     
+    service_edges = []
     for source, target, edge_type in platform_service_edges:
-        edge = {
+        service_edges.append({
             'source': source,
             'target': target,
             'type': edge_type,
@@ -370,40 +350,45 @@ def update_hypergraph():
                 'last_updated': today
             },
             'weight': 1.0
-        }
-        exists = any(
-            e['source'] == edge['source'] and 
-            e['target'] == edge['target'] and 
-            e['type'] == edge['type']
-            for e in data['edges']
-        )
-        if not exists:
-            data['edges'].append(edge)
-            edges_added += 1
+        })
+    edges_added += count_new_edges(store, service_edges)
     
-    # Update metadata counts
-    data['metadata']['node_count'] = len(data['nodes'])
-    data['metadata']['edge_count'] = len(data['edges'])
-    data['metadata']['bulk_ingredients_added'] = len(new_ingredients)
-    data['metadata']['salon_platforms_added'] = len(salon_platforms)
-    data['metadata']['nodes_added_nov18'] = nodes_added
-    data['metadata']['edges_added_nov18'] = edges_added
-    data['metadata']['nodes_updated_nov18'] = nodes_updated
+    # node_count/edge_count are refreshed when the changeset is applied
+    changeset = {
+        'metadata': {
+            'version': '6.0',
+            'last_updated': today,
+            'description': 'Skin Zone marketplace hypergraph with November 18, 2025 bulk pricing and salon platform updates',
+            'bulk_ingredients_added': len(new_ingredients),
+            'salon_platforms_added': len(salon_platforms),
+            'nodes_added_nov18': nodes_added,
+            'edges_added_nov18': edges_added,
+            'nodes_updated_nov18': nodes_updated,
+        },
+        'nodes': {
+            'update': node_updates,
+            'add': new_ingredients + salon_platforms,
+        },
+        'edges': {
+            'add': ingredient_edges + service_edges,
+        },
+    }
     
-    # Save updated data
-    save_hypergraph(data, '/home/ubuntu/skin-zone/hypergraph_data.json')
+    # Append to the WAL; compaction folds it into the snapshot later
+    log.append(changeset)
+    store = log.store
     
     print(f"✅ Hypergraph updated successfully!")
-    print(f"   Version: {data['metadata']['version']}")
-    print(f"   Total nodes: {data['metadata']['node_count']}")
-    print(f"   Total edges: {data['metadata']['edge_count']}")
+    print(f"   Version: {store.metadata['version']}")
+    print(f"   Total nodes: {store.metadata['node_count']}")
+    print(f"   Total edges: {store.metadata['edge_count']}")
     print(f"   Nodes added: {nodes_added}")
     print(f"   Nodes updated: {nodes_updated}")
     print(f"   Edges added: {edges_added}")
     print(f"   Bulk ingredients: {len(new_ingredients)}")
     print(f"   Salon platforms: {len(salon_platforms)}")
     
-    return data
+    return store.to_dict()
 
 if __name__ == '__main__':
     update_hypergraph()
@@ -7,12 +7,12 @@ Includes updated pricing, new suppliers, and platform data
 import json
 from datetime import datetime
 
-# Load existing hypergraph data
-with open('/home/ubuntu/skin-zone/hypergraph_data.json', 'r') as f:
-    hypergraph = json.load(f)
+from hypergraph_store import edge_key
+from hypergraph_wal import HypergraphLog
 
-# Track updates
-updates_made = []
+# The update is appended to the WAL as one changeset instead of rewriting
+# the snapshot; compaction folds it in later
+log = HypergraphLog('/home/ubuntu/skin-zone/hypergraph_data.json')
 
 # Update existing supplier nodes with new data
 supplier_updates = {
@@ -303,73 +303,56 @@ new_platforms = [
     }
 ]
 
-# Apply supplier updates
-for node in hypergraph['nodes']:
-    if node['id'] in supplier_updates:
-        node.update(supplier_updates[node['id']])
-        updates_made.append(f"Updated supplier: {node['name']}")
-
-# Apply ingredient pricing updates
-for node in hypergraph['nodes']:
-    if node['id'] in ingredient_pricing_updates:
-        node.update(ingredient_pricing_updates[node['id']])
-        updates_made.append(f"Updated ingredient pricing: {node['name']}")
-
-# Apply platform updates
-for node in hypergraph['nodes']:
-    if node['id'] in platform_updates:
-        node.update(platform_updates[node['id']])
-        updates_made.append(f"Updated platform: {node['name']}")
-
-# Add new ingredients
-existing_ids = {node['id'] for node in hypergraph['nodes']}
-for ingredient in new_ingredients:
-    if ingredient['id'] not in existing_ids:
-        hypergraph['nodes'].append(ingredient)
-        updates_made.append(f"Added new ingredient: {ingredient['name']}")
-
-# Add new suppliers
-for supplier in new_suppliers:
-    if supplier['id'] not in existing_ids:
-        hypergraph['nodes'].append(supplier)
-        updates_made.append(f"Added new supplier: {supplier['name']}")
+# Supplier-ingredient edges for the new Lotion Crafter ingredients
+new_edges = [
+    {
+        "source": "lotion_crafter",
+        "target": ingredient['id'],
+        "type": "supplies",
+        "metadata": {
+            "price_per_kg_usd": ingredient.get('price_per_kg_usd'),
+            "availability": ingredient.get('availability', 'in_stock'),
+            "last_updated": "2025-11-10"
+        },
+        "weight": 1.0
+    }
+    for ingredient in new_ingredients
+    if ingredient.get('supplier') == 'lotion_crafter'
+]
 
-# Add new platforms
-for platform in new_platforms:
-    if platform['id'] not in existing_ids:
-        hypergraph['nodes'].append(platform)
-        updates_made.append(f"Added new platform: {platform['name']}")
+node_updates = {**supplier_updates, **ingredient_pricing_updates, **platform_updates}
+node_adds = new_ingredients + new_suppliers + new_platforms
 
-# Create new edges for supplier-ingredient relationships
-new_edges = []
-for ingredient in new_ingredients:
-    if 'supplier' in ingredient and ingredient['supplier'] == 'lotion_crafter':
-        edge = {
-            "source": "lotion_crafter",
-            "target": ingredient['id'],
-            "type": "supplies",
-            "metadata": {
-                "price_per_kg_usd": ingredient.get('price_per_kg_usd'),
-                "availability": ingredient.get('availability', 'in_stock'),
-                "last_updated": "2025-11-10"
-            },
-            "weight": 1.0
-        }
-        hypergraph['edges'].append(edge)
-        new_edges.append(edge)
-        updates_made.append(f"Added edge: lotion_crafter -> {ingredient['name']}")
+# Count what the changeset will change against the current state (snapshot
+# plus WAL), so the total is recorded in the same WAL record; existing nodes
+# and edge triples are skipped and missing update targets are ignored
+current = log.open()
+updates_applied = (
+    sum(1 for node_id in node_updates if current.has_node(node_id))
+    + len({n['id'] for n in node_adds if not current.has_node(n['id'])})
+    + len({edge_key(e) for e in new_edges if not current.has_edge(*edge_key(e))})
+)
 
-# Update metadata
-hypergraph['metadata']['version'] = "5.0"
-hypergraph['metadata']['last_updated'] = "2025-11-10"
-hypergraph['metadata']['node_count'] = len(hypergraph['nodes'])
-hypergraph['metadata']['edge_count'] = len(hypergraph['edges'])
-hypergraph['metadata']['description'] = "Skin Zone marketplace hypergraph with November 2025 pricing updates"
-hypergraph['metadata']['updates_applied'] = len(updates_made)
+changeset = {
+    "metadata": {
+        "version": "5.0",
+        "last_updated": "2025-11-10",
+        "description": "Skin Zone marketplace hypergraph with November 2025 pricing updates",
+        "updates_applied": updates_applied
+    },
+    "nodes": {
+        "update": node_updates,
+        "add": node_adds
+    },
+    "edges": {
+        "add": new_edges
+    }
+}
 
-# Save updated hypergraph
-with open('/home/ubuntu/skin-zone/hypergraph_data.json', 'w') as f:
-    json.dump(hypergraph, f, indent=2)
+# Apply all updates in one indexed pass and record them in the WAL
+report = log.append(changeset)
+updates_made = report['details']
+store = log.store
 
 # Save update log
 update_log = {
@@ -380,15 +363,15 @@ update_log = {
     "new_ingredients_count": len(new_ingredients),
     "new_suppliers_count": len(new_suppliers),
     "new_platforms_count": len(new_platforms),
-    "new_edges_count": len(new_edges)
+    "new_edges_count": report['edges_added']
 }
 
 with open('/home/ubuntu/skin-zone/hypergraph_update_log_nov2025.json', 'w') as f:
     json.dump(update_log, f, indent=2)
 
 print(f"✓ Hypergraph updated successfully!")
-print(f"✓ Version: {hypergraph['metadata']['version']}")
-print(f"✓ Total nodes: {hypergraph['metadata']['node_count']}")
-print(f"✓ Total edges: {hypergraph['metadata']['edge_count']}")
+print(f"✓ Version: {store.metadata['version']}")
+print(f"✓ Total nodes: {store.metadata['node_count']}")
+print(f"✓ Total edges: {store.metadata['edge_count']}")
 print(f"✓ Updates applied: {len(updates_made)}")
 print(f"\nUpdate log saved to: hypergraph_update_log_nov2025.json")